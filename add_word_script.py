@@ -1,101 +1,251 @@
+import argparse
 import csv
-import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
+from itertools import islice
 
-from manager import vocabulary_manager
-from manager import word_manager
+import ijson
 
-def process_json_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        try:
-            groups = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ Error parsing {filepath}: {e}")
+from manager import vocab_import_manager
+
+# Placeholder used by the CSV word banks for an empty field
+EMPTY_SENTINEL = '-'
+# Fields the words table requires; entries without them are rejected before COPY
+REQUIRED_FIELDS = ('group_name', 'word', 'meaning_en', 'meaning_th')
+# Rejected entries listed per file, the rest are only counted
+SHOW_REJECTED = 5
+
+def iter_json_records(filepath):
+    """Stream raw word entries from a JSON word bank without loading the whole file.
+
+    The file is a list of ``{"group_name": ..., "word_list": [...]}`` objects;
+    entries are yielded one at a time with their group name attached.
+    """
+    with open(filepath, 'rb') as f:
+        group_name = None
+        pending = []
+        builder = None
+        for prefix, event, value in ijson.parse(f):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == 'item.word_list.item' and event == 'end_map':
+                    record = builder.value
+                    builder = None
+                    record['_format'] = 'json'
+                    if group_name is None:
+                        # word_list came before group_name, hold the group's entries
+                        pending.append(record)
+                    else:
+                        record['group_name'] = group_name
+                        yield record
+            elif prefix == 'item.word_list.item' and event == 'start_map':
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix == 'item.group_name':
+                group_name = value
+                for record in pending:
+                    record['group_name'] = group_name
+                    yield record
+                pending = []
+            elif prefix == 'item' and event == 'end_map':
+                group_name = None
+                pending = []
+
+def iter_csv_records(filepath):
+    """Stream raw rows from a CSV word bank"""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            row['_format'] = 'csv'
+            yield row
+
+def _clean_text(value):
+    """Strip a scalar field and map the empty sentinel to None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value != EMPTY_SENTINEL else None
+
+def _clean_list(values):
+    """Strip list items and drop empty and sentinel items"""
+    return [v for v in (_clean_text(item) for item in values or []) if v is not None]
+
+def _split(value, separator):
+    """Split a delimited CSV field into a cleaned list"""
+    return _clean_list(value.split(separator)) if value else []
+
+def normalize_record(record):
+    """Turn a raw JSON entry or CSV row into a vocabulary entry dict"""
+    if record['_format'] == 'csv':
+        examples = _split(record.get('example'), '<br>')
+        synonyms = _split(record.get('synonyms'), ',')
+        antonyms = _split(record.get('antonyms'), ',')
+        word_forms = _split(record.get('variations'), ',')
+    else:
+        examples = _clean_list(record.get('examples'))
+        synonyms = _clean_list(record.get('synonyms'))
+        antonyms = _clean_list(record.get('antonyms'))
+        word_forms = _clean_list(record.get('word_forms'))
+
+    return {
+        'group_name': _clean_text(record['group_name']),
+        'word': _clean_text(record['word']),
+        'part_of_speech': _clean_text(record['part_of_speech']),
+        'meaning_en': _clean_text(record['meaning_en']),
+        'meaning_th': _clean_text(record['meaning_th']),
+        'examples': examples,
+        'synonyms': synonyms,
+        'antonyms': antonyms,
+        'word_forms': word_forms,
+        'difficulty': _clean_text(record.get('difficulty')),
+        'frequency': _clean_text(record.get('frequency'))
+    }
+
+def normalize_batch(records, first_entry=1):
+    """Worker entry point: normalize a batch of raw records into import rows.
+
+    Returns (rows, rejected). An entry missing a required field would fail the
+    staging table's NOT NULL and abort the whole file, so it is left out of
+    rows and reported in rejected as (entry number, word, missing fields).
+    """
+    rows = []
+    rejected = []
+    for number, record in enumerate(records, first_entry):
+        entry = normalize_record(record)
+        missing = [field for field in REQUIRED_FIELDS if entry[field] is None]
+        if missing:
+            rejected.append((number, entry['word'], missing))
+        else:
+            rows.append(vocab_import_manager.entry_to_row(entry))
+    return rows, rejected
+
+def _batched(iterable, size):
+    """Yield lists of up to ``size`` items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
             return
+        yield batch
+
+def normalized_rows(records, executor, batch_size=1000, max_inflight=8, rejected=None):
+    """Normalize a record stream on the worker pool, yielding rows in order.
+
+    At most ``max_inflight`` batches are parsed ahead of the writer, which
+    keeps memory bounded no matter how large the file is. Rejected entries
+    are appended to ``rejected`` when it is given.
+    """
+    def results(future):
+        rows, batch_rejected = future.result()
+        if rejected is not None:
+            rejected.extend(batch_rejected)
+        return rows
+
+    pending = deque()
+    for i, batch in enumerate(_batched(records, batch_size)):
+        pending.append(executor.submit(normalize_batch, batch, i * batch_size + 1))
+        if len(pending) >= max_inflight:
+            yield from results(pending.popleft())
+    while pending:
+        yield from results(pending.popleft())
+
+def _guarded(rows, errors):
+    """Pass rows through, remembering a parse error before re-raising it"""
+    try:
+        yield from rows
+    except (ijson.JSONError, csv.Error, KeyError, ValueError) as e:
+        errors.append(e)
+        raise
+
+def _report_rejected(rejected):
+    """Print the entries left out of a file for missing required fields"""
+    print(f"   ⚠️  {len(rejected)} entries rejected for missing required fields")
+    for number, word, missing in rejected[:SHOW_REJECTED]:
+        print(f"      entry {number} ({word or 'no word'}): missing {', '.join(missing)}")
+    if len(rejected) > SHOW_REJECTED:
+        print(f"      ... and {len(rejected) - SHOW_REJECTED} more")
+
+def import_file(filepath, rows, file_hash=None, prune=False, parse_errors=None, rejected=None):
+    """Load one file's rows in a single transaction and report the diff"""
+    try:
+        stats = vocab_import_manager.import_rows(rows, source_path=filepath,
+                                                    file_hash=file_hash, prune=prune)
+    except Exception:
+        # A parse error surfaces through COPY; skip the file like a bad JSON file
+        if parse_errors:
+            print(f"❌ Error parsing {filepath}: {parse_errors[0]!r}")
+            return None
+        raise
+
+    print(f"   ✅ +{stats['added']} added, ~{stats['changed']} changed, "
+          f"={stats['unchanged']} unchanged, -{stats['removed']} removed "
+          f"({stats['deleted']} deleted), {stats['groups_created']} new groups "
+          f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)")
+    stats['rejected'] = len(rejected or [])
+    if rejected:
+        _report_rejected(rejected)
+    return stats
+
+def load_all_vocab(vocab_dir="docs/vocab", force=False, prune=False, workers=None, batch_size=1000):
+    """Import every vocabulary file, skipping files whose content hash is unchanged.
+
+    Files are parsed as streams, normalized on a process pool and written by a
+    single writer (this process), one transaction per file.
+    """
+    total_rows = 0
+    total_seconds = 0.0
+    total_rejected = 0
+    skipped = 0
+    imported = vocab_import_manager.get_imported_files()
+
+    readers = [("📘 Processing JSON", "*.json", iter_json_records),
+                ("📄 Processing CSV", "*.csv", iter_csv_records)]
+    seen = set()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_inflight = 2 * workers
+        for label, pattern, reader in readers:
+            for filepath in sorted(glob(os.path.join(vocab_dir, pattern))):
+                filepath = os.path.normpath(filepath)
+                seen.add(filepath)
+                file_hash = vocab_import_manager.compute_file_hash(filepath)
+                if not force and imported.get(filepath) == file_hash:
+                    skipped += 1
+                    continue
+
+                print(f"{label}: {filepath}")
+                parse_errors = []
+                rejected = []
+                rows = _guarded(normalized_rows(reader(filepath), executor, batch_size, max_inflight,
+                                                rejected),
+                                parse_errors)
+                stats = import_file(filepath, rows, file_hash=file_hash, prune=prune,
+                                    parse_errors=parse_errors, rejected=rejected)
+                if stats:
+                    total_rows += stats['rows']
+                    total_seconds += stats['seconds']
+                    total_rejected += stats['rejected']
+
+    # Files that were imported before but no longer exist
+    for filepath in sorted(set(imported) - seen):
+        if os.path.dirname(filepath) != os.path.normpath(vocab_dir):
+            continue
+        stats = vocab_import_manager.remove_file(filepath, prune=prune)
+        print(f"🗑️  Missing file {filepath}: -{stats['removed']} removed ({stats['deleted']} deleted)")
 
-        for group in groups:
-            group_name = group.get("group_name")
-            word_list = group.get("word_list", [])
-            group_id = vocabulary_manager.get_or_create_group(group_name)["id"]
-
-            for entry in word_list:
-                word_manager.add_word(
-                    group_id=group_id,
-                    word=entry["word"],
-                    part_of_speech=entry["part_of_speech"],
-                    meaning_en=entry["meaning_en"],
-                    meaning_th=entry["meaning_th"],
-                    examples=entry.get("examples"),
-                    synonyms=entry.get("synonyms"),
-                    antonyms=entry.get("antonyms"),
-                    word_forms=entry.get("word_forms"),
-                    difficulty=entry.get("difficulty"),
-                    frequency=entry.get("frequency")
-                )
-
-def process_csv_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        # Group words by group_name
-        groups = {}
-        for row in reader:
-            group_name = row['group_name']
-            if group_name not in groups:
-                groups[group_name] = []
-            
-            # Split examples by <br> if they exist
-            examples = row.get('example', '').split('<br>') if row.get('example') else []
-            
-            # Split synonyms, antonyms, variations by comma if they exist
-            synonyms = [s.strip() for s in row.get('synonyms', '').split(',') if s.strip()] if row.get('synonyms') else []
-            antonyms = [a.strip() for a in row.get('antonyms', '').split(',') if a.strip()] if row.get('antonyms') else []
-            word_forms = [w.strip() for w in row.get('variations', '').split(',') if w.strip()] if row.get('variations') else []
-            
-            groups[group_name].append({
-                'word': row['word'],
-                'part_of_speech': row['part_of_speech'],
-                'meaning_en': row['meaning_en'],
-                'meaning_th': row['meaning_th'],
-                'examples': examples,
-                'synonyms': synonyms,
-                'antonyms': antonyms,
-                'word_forms': word_forms,
-                'difficulty': row.get('difficulty'),
-                'frequency': row.get('frequency')
-            })
-        
-        # Process each group
-        for group_name, word_list in groups.items():
-            group_id = vocabulary_manager.get_or_create_group(group_name)["id"]
-            
-            for entry in word_list:
-                word_manager.add_word(
-                    group_id=group_id,
-                    word=entry["word"],
-                    part_of_speech=entry["part_of_speech"],
-                    meaning_en=entry["meaning_en"],
-                    meaning_th=entry["meaning_th"],
-                    examples=entry.get("examples"),
-                    synonyms=entry.get("synonyms"),
-                    antonyms=entry.get("antonyms"),
-                    word_forms=entry.get("word_forms"),
-                    difficulty=entry.get("difficulty"),
-                    frequency=entry.get("frequency")
-                )
-
-def load_all_vocab():
-    # Process JSON files
-    json_files = glob("docs/vocab/*.json")
-    for filepath in json_files:
-        print(f"📘 Processing JSON: {filepath}")
-        process_json_file(filepath)
-    
-    # Process CSV files
-    csv_files = glob("docs/vocab/*.csv")
-    for filepath in csv_files:
-        print(f"📄 Processing CSV: {filepath}")
-        process_csv_file(filepath)
+    rate = total_rows / total_seconds if total_seconds > 0 else 0.0
+    print(f"📊 Loaded {total_rows} rows in {total_seconds:.2f}s ({rate:.0f} rows/s), "
+          f"{total_rejected} entries rejected, {skipped} unchanged files skipped")
 
 
 if __name__ == "__main__":
-    load_all_vocab()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import vocabulary files into the database")
+    parser.add_argument("--dir", default="docs/vocab", help="directory containing vocabulary files")
+    parser.add_argument("--force", action="store_true", help="re-import files even if unchanged")
+    parser.add_argument("--prune", action="store_true", help="delete words removed from their file")
+    parser.add_argument("--workers", type=int, default=None, help="normalizer processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records per normalizer batch")
+    args = parser.parse_args()
+    load_all_vocab(args.dir, force=args.force, prune=args.prune,
+                   workers=args.workers, batch_size=args.batch_size)
@@ -5,6 +5,13 @@ import logging
 
 # Import blueprint
 from flash_card_blueprint import flash_card_bp
+from request_profiler import init_profiler
+from manager.tracing import init_tracing
+from manager.metrics import init_metrics
+from manager import catalog_cache
+from manager.warmup import init_warmup
+from manager.records import RecordJSONProvider
+from manager.assets import init_assets
 
 # Load environment variables
 load_dotenv()
@@ -15,10 +22,36 @@ logger = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
+    # Lets jsonify serialize Record rows and word store views as objects
+    app.json = RecordJSONProvider(app)
     app.secret_key = os.getenv('SECRET_KEY', 'fallback_secret_key_for_development')
+    # Test-only login bypass used by load_test_script.py; never enable in production
+    app.config['TEST_LOGIN_ENABLED'] = os.getenv('ENABLE_TEST_LOGIN') == '1'
+    if app.config['TEST_LOGIN_ENABLED']:
+        logger.warning("Test login bypass is enabled")
         
     # Register blueprint
     app.register_blueprint(flash_card_bp)
+
+    # Fingerprinted static assets and the asset_url template helper
+    init_assets(app)
+
+    # Request tracing (no-op unless TRACE_EXPORT is set)
+    init_tracing(app)
+
+    # Opt-in request profiler (no-op unless PROFILE_SECRET or PROFILE_SAMPLE_RATE is set)
+    init_profiler(app)
+
+    # Prometheus metrics at /metrics
+    init_metrics(app)
+
+    # Invalidate this worker's catalog cache on catalog_changed notifications
+    if os.getenv('CATALOG_LISTEN', '1') != '0':
+        catalog_cache.start_listener()
+
+    # Open pools, prepare statements, compile templates and load the catalog
+    # in the background; /readyz answers 503 until that is done
+    init_warmup(app)
     
     return app
 
@@ -0,0 +1,66 @@
+import os
+import sys
+import gzip
+import json
+import shutil
+import argparse
+from manager.assets import ASSET_DIRS, DIST_DIR, MANIFEST, hashed_name
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+def _compressors(skip_brotli=False):
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        if not skip_brotli:
+            sys.exit("❌ brotli is not installed (pip install -r requirements.txt); "
+                     "pass --skip-brotli to build without .br files")
+        print("⚠️ brotli is not installed; skipping .br files")
+    else:
+        compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+def build(static_dir=STATIC_DIR, clean=False, skip_brotli=False):
+    """Write fingerprinted and precompressed copies of the static assets and their manifest"""
+    dist = os.path.join(static_dir, DIST_DIR)
+    if clean and os.path.isdir(dist):
+        shutil.rmtree(dist)
+    compressors = _compressors(skip_brotli)
+    manifest = {}
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, asset_dir)):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                path = os.path.relpath(source, static_dir).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    content = f.read()
+                hashed = manifest[path] = hashed_name(path, content)
+                target = os.path.join(dist, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                sizes = [f"{len(content)}B"]
+                with open(target, 'wb') as f:
+                    f.write(content)
+                for suffix, compress in compressors:
+                    compressed = compress(content)
+                    with open(target + suffix, 'wb') as f:
+                        f.write(compressed)
+                    sizes.append(f"{suffix[1:]} {len(compressed)}B")
+                print(f"📦 {path} -> {DIST_DIR}/{hashed} ({', '.join(sizes)})")
+    os.makedirs(dist, exist_ok=True)
+    with open(os.path.join(dist, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--static-dir", default=STATIC_DIR, help="static folder to build")
+    parser.add_argument("--clean", action="store_true", help="remove earlier builds first")
+    parser.add_argument("--skip-brotli", action="store_true",
+                        help="build without .br files when brotli is not installed")
+    args = parser.parse_args()
+
+    manifest = build(args.static_dir, args.clean, args.skip_brotli)
+    print(f"✅ Built {len(manifest)} assets into {os.path.join(args.static_dir, DIST_DIR)}")
+    sys.exit(0)
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from manager import practice_manager
+from manager import practice_session_manager
+from manager import user_progress_manager
+from manager import user_word_level_manager
+from manager import vocabulary_manager
+from manager import word_manager
+from manager.database_manager import get_db_connection, copy_rows
+from manager.records import record_type
+
+CATALOG_SIZES = (1_000, 10_000, 100_000)
+PROGRESS_SIZES = (0, 1_000, 100_000)
+CASES = ('get_next_word', 'generate_choices', 'get_distractors', 'submit_answer')
+PARTS_OF_SPEECH = ('Noun', 'Verb', 'Adjective', 'Adverb')
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+# Columns of the RecordCursor queries in user_word_level_manager
+WORD_LEVEL_COLUMNS = ('word_id', 'word', 'meaning_en', 'meaning_th', 'part_of_speech', 'difficulty', 'frequency',
+                      'level', 'last_practiced')
+USER_WORD_LEVEL_COLUMNS = ('id', 'user_id', 'word_id', 'level', 'last_practiced', 'created_at')
+
+def generate_catalog(size, seed=0):
+    """Generate ``size`` synthetic word dicts shaped like the words table"""
+    rng = random.Random(seed)
+    words = []
+    for n in range(size):
+        words.append({
+            'word': f"word{n:06d}",
+            'part_of_speech': rng.choice(PARTS_OF_SPEECH),
+            'meaning_en': f"Synthetic meaning number {n} used for benchmarking.",
+            'meaning_th': f"ความหมาย {n}",
+            'examples': [f"Example sentence {i} for word{n:06d}." for i in range(3)],
+            'synonyms': [f"syn{n}a", f"syn{n}b"],
+            'antonyms': [f"ant{n}"],
+            'word_forms': [f"word{n:06d}ly"],
+            'difficulty': rng.choice(('basic', 'intermediate', 'advanced')),
+            'frequency': rng.choice(('low', 'medium', 'high'))
+        })
+    return words
+
+def generate_levels(word_ids, progress, seed=0):
+    """Assign levels to up to ``progress`` words, skewed towards low levels"""
+    rng = random.Random(seed)
+    practiced = rng.sample(word_ids, min(progress, len(word_ids)))
+    return {word_id: min(int(rng.expovariate(0.6)), 10) for word_id in practiced}
+
+class StubDatabase:
+    """In-memory replacement for the manager functions the hot path calls.
+
+    Every call returns freshly built rows of the type the real cursor returns
+    (dicts, or Records from RecordCursor), so allocation and access costs of
+    the real code path are still measured.
+    """
+
+    PATCHES = (
+        (word_manager, 'get_word_by_id'),
+        (word_manager, 'get_words_by_group'),
+        (user_word_level_manager, 'get_user_words_with_levels'),
+        (user_word_level_manager, 'get_user_word_level'),
+        (user_word_level_manager, 'update_user_word_level'),
+        (user_progress_manager, 'record_progress'),
+        (practice_session_manager, 'create_session'),
+    )
+
+    def __init__(self, catalog_size, progress, seed=0):
+        self.group_id = 1
+        self.words = {}
+        for word_id, word in enumerate(generate_catalog(catalog_size, seed), start=1):
+            self.words[word_id] = dict(word, id=word_id, group_id=self.group_id,
+                                        created_at=datetime.now(timezone.utc))
+        self.ordered_ids = sorted(self.words, key=lambda word_id: self.words[word_id]['word'])
+        self.levels = generate_levels(list(self.words), progress, seed)
+        self.sessions = 0
+        self.activity = {}  # (user_id, date) -> [attempts, correct, score, seconds], as user_daily_activity
+        self.originals = {}
+
+    def get_word_by_id(self, word_id):
+        word = self.words.get(word_id)
+        return dict(word) if word else None
+
+    def get_words_by_group(self, group_id):
+        return [dict(self.words[word_id]) for word_id in self.ordered_ids]
+
+    def get_user_words_with_levels(self, user_id, group_id=None):
+        row = record_type(WORD_LEVEL_COLUMNS)
+        rows = []
+        for word_id in self.ordered_ids:
+            word = self.words[word_id]
+            rows.append(row((
+                word_id, word['word'], word['meaning_en'], word['meaning_th'], word['part_of_speech'],
+                word['difficulty'], word['frequency'], self.levels.get(word_id, 0), None
+            )))
+        return rows
+
+    def get_user_word_level(self, user_id, word_id):
+        if word_id not in self.levels:
+            return {'user_id': user_id, 'word_id': word_id, 'level': 0, 'last_practiced': None, 'created_at': None}
+        return record_type(USER_WORD_LEVEL_COLUMNS)((word_id, user_id, word_id, self.levels[word_id], None, None))
+
+    def update_user_word_level(self, user_id, word_id, is_correct):
+        level = self.levels.get(word_id, 0)
+        self.levels[word_id] = level + 1 if is_correct else max(level - 1, 0)
+        return self.levels[word_id]
+
+    def create_session(self, user_id):
+        self.sessions += 1
+        return {'id': self.sessions, 'user_id': user_id, 'start_time': datetime.now(timezone.utc), 'end_time': None,
+                'total_score': 0, 'words_attempted': 0, 'words_correct': 0}
+
+    def record_progress(self, user_id, word_id, session_id, level_at_time, is_correct, time_taken):
+        day = self.activity.setdefault((user_id, datetime.now(timezone.utc).date()), [0, 0, 0, 0])
+        day[0] += 1
+        day[1] += int(is_correct)
+        day[2] += level_at_time + 1 if is_correct else 0
+        day[3] += time_taken or 0
+        return {'id': 1, 'user_id': user_id, 'word_id': word_id, 'session_id': session_id,
+                'level_at_time': level_at_time, 'is_correct': is_correct, 'time_taken': time_taken,
+                'attempted_at': datetime.now(timezone.utc)}
+
+    def __enter__(self):
+        for module, name in self.PATCHES:
+            self.originals[(module, name)] = getattr(module, name)
+            setattr(module, name, getattr(self, name))
+        return self
+
+    def __exit__(self, *exc):
+        for (module, name), original in self.originals.items():
+            setattr(module, name, original)
+        self.originals.clear()
+
+def seed_postgres(catalog_size, progress, seed=0):
+    """Create (once) a benchmark group, user and progress rows in the configured database.
+
+    Returns (user_id, group_id, word_ids). Data is tagged with "bench-" names
+    so it never collides with real groups or users.
+    """
+    group_name = f"bench-catalog-{catalog_size}"
+    google_id = f"bench-user-{catalog_size}-{progress}"
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute("SELECT id FROM word_groups WHERE name = %s", (group_name,))
+    row = cur.fetchone()
+    if row:
+        group_id = row[0]
+    else:
+        cur.execute("INSERT INTO word_groups (name) VALUES (%s) RETURNING id", (group_name,))
+        group_id = cur.fetchone()[0]
+        copy_rows(cur, 'words',
+                    ('group_id', 'word', 'part_of_speech', 'meaning_en', 'meaning_th', 'examples',
+                    'synonyms', 'antonyms', 'word_forms', 'difficulty', 'frequency'),
+                    ((group_id, w['word'], w['part_of_speech'], w['meaning_en'], w['meaning_th'],
+                    w['examples'], w['synonyms'], w['antonyms'], w['word_forms'],
+                    w['difficulty'], w['frequency']) for w in generate_catalog(catalog_size, seed)))
+
+    cur.execute("SELECT id FROM words WHERE group_id = %s ORDER BY id", (group_id,))
+    word_ids = [r[0] for r in cur.fetchall()]
+
+    cur.execute("SELECT id FROM users WHERE google_id = %s", (google_id,))
+    row = cur.fetchone()
+    if row:
+        user_id = row[0]
+    else:
+        cur.execute("""
+            INSERT INTO users (google_id, email, given_name, family_name, name)
+            VALUES (%s, %s, 'Bench', 'User', 'Bench User')
+            RETURNING id
+        """, (google_id, f"{google_id}@bench.invalid"))
+        user_id = cur.fetchone()[0]
+
+        now = datetime.now(timezone.utc)
+        levels = generate_levels(word_ids, progress, seed)
+        copy_rows(cur, 'user_word_levels', ('user_id', 'word_id', 'level', 'last_practiced'),
+                    ((user_id, word_id, level, now) for word_id, level in levels.items()))
+
+        rng = random.Random(seed)
+        copy_rows(cur, 'user_progress',
+                    ('user_id', 'word_id', 'level_at_time', 'is_correct', 'time_taken', 'attempted_at'),
+                    ((user_id, rng.choice(word_ids), rng.randint(0, 5), rng.random() < 0.7,
+                    rng.randint(1, 60), now - timedelta(minutes=n)) for n in range(progress)))
+
+    conn.commit()
+    cur.close()
+    conn.close()
+    return user_id, group_id, word_ids
+
+def _measure(fn, min_seconds, min_iterations):
+    """Run fn repeatedly and return per-call timings in milliseconds"""
+    fn()  # warm up
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < min_iterations or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def run_case(case, user_id, group_id, word_ids, args):
+    """Benchmark one hot-path function and return its timing summary"""
+    rng = random.Random(args.seed)
+    correct_word = None
+    if case in ('generate_choices', 'get_distractors'):
+        correct_word = word_manager.get_word_by_id(word_ids[len(word_ids) // 2])
+    # A session makes submit_answer record progress and the daily rollup, as answers in practice do
+    session_id = practice_session_manager.create_session(user_id)['id'] if case == 'submit_answer' else None
+
+    calls = {
+        'get_next_word': lambda: practice_manager.get_next_word(user_id, group_id),
+        'generate_choices': lambda: practice_manager.generate_choices(
+            correct_word, rng.randint(0, 5), user_id, group_id),
+        'get_distractors': lambda: vocabulary_manager.get_distractors(correct_word, 3, group_id),
+        'submit_answer': lambda: practice_manager.submit_answer(
+            user_id, rng.choice(word_ids), rng.randint(0, 3), 0, rng.randint(1, 30), session_id=session_id),
+    }
+    timings = _measure(calls[case], args.min_seconds, args.min_iterations)
+    return {
+        'iterations': len(timings),
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(0.95 * (len(timings) - 1))],
+        'min_ms': min(timings)
+    }
+
+def run(args):
+    results = {}
+    for catalog_size in args.sizes:
+        for progress in args.progress:
+            if args.mode == 'stub':
+                context = StubDatabase(catalog_size, progress, args.seed)
+                user_id, group_id = 1, context.group_id
+                word_ids = list(context.words)
+            else:
+                context = None
+                user_id, group_id, word_ids = seed_postgres(catalog_size, progress, args.seed)
+
+            if context:
+                context.__enter__()
+            try:
+                for case in args.cases:
+                    key = f"{args.mode}/{case}/catalog={catalog_size}/progress={progress}"
+                    results[key] = run_case(case, user_id, group_id, word_ids, args)
+                    print(f"⏱️  {key:60} median={results[key]['median_ms']:9.3f}ms "
+                          f"p95={results[key]['p95_ms']:9.3f}ms n={results[key]['iterations']}")
+            finally:
+                if context:
+                    context.__exit__(None, None, None)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return the cases whose median regressed beyond the tolerance"""
+    regressions = []
+    for key, stats in results.items():
+        if key not in baseline:
+            continue
+        limit = baseline[key]['median_ms'] * (1 + tolerance)
+        if stats['median_ms'] > limit:
+            regressions.append((key, baseline[key]['median_ms'], stats['median_ms']))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the practice hot path")
+    parser.add_argument("--mode", choices=('stub', 'postgres'), default='stub',
+                        help="stub the DB layer in memory or run against the configured Postgres")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(CATALOG_SIZES), help="catalog sizes")
+    parser.add_argument("--progress", type=int, nargs='+', default=list(PROGRESS_SIZES),
+                        help="progress rows per user")
+    parser.add_argument("--cases", nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="minimum time per case")
+    parser.add_argument("--min-iterations", type=int, default=5, help="minimum calls per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="stored baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown relative to the baseline median (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline updated in {args.baseline}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for key, before, after in regressions:
+        print(f"❌ {key}: {before:.3f}ms -> {after:.3f}ms (+{(after / before - 1):.0%})")
+    if not baseline:
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+    elif not regressions:
+        print(f"✅ No regressions beyond {args.tolerance:.0%}")
+    sys.exit(1 if regressions else 0)
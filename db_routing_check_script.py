@@ -0,0 +1,55 @@
+import sys
+import time
+
+from manager import database_manager
+from manager.database_manager import get_db_connection, read_only, read_write
+
+def _server_identity():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT inet_server_addr()::TEXT, inet_server_port(), current_database(), pg_is_in_recovery()")
+    identity = cur.fetchone()
+    cur.close()
+    conn.close()
+    return identity
+
+@read_only
+def read_server():
+    return _server_identity()
+
+@read_write
+def write_server():
+    return _server_identity()
+
+def check(name, identity, expect_primary, primary):
+    on_primary = identity[:3] == primary[:3]
+    ok = on_primary == expect_primary
+    where = 'primary' if on_primary else f"replica {identity[0]}:{identity[1]}"
+    print(f"{'✅' if ok else '❌'} {name:48} -> {where}")
+    return ok
+
+
+if __name__ == "__main__":
+    if not database_manager.has_replicas():
+        print("Set PRIMARY_DSN and REPLICA_DSNS (e.g. two local Postgres instances on different ports)")
+        sys.exit(1)
+
+    database_manager.begin_request()
+    primary = _server_identity()
+    print(f"Primary: {primary[0]}:{primary[1]}/{primary[2]} (in recovery: {primary[3]})")
+
+    results = [check("unmarked function", primary, True, primary)]
+    results.append(check("@read_only function", read_server(), False, primary))
+    for status in database_manager.replica_status():
+        print(f"   replica {status['replica']}: lag={status['lag']}s available={status['available']}")
+
+    results.append(check("@read_write function", write_server(), True, primary))
+    results.append(check("@read_only after a write in the same request", read_server(), True, primary))
+
+    database_manager.begin_request(time.time() + database_manager.READ_YOUR_WRITES_SECONDS)
+    results.append(check("@read_only in a sticky request", read_server(), True, primary))
+
+    database_manager.begin_request(time.time() - 1)
+    results.append(check("@read_only after stickiness expired", read_server(), False, primary))
+
+    sys.exit(0 if all(results) else 1)
@@ -1,13 +1,14 @@
 import random
-from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, make_response, current_app
 import logging
 import requests
 import json
 import os
-from google.oauth2 import id_token
-from google.auth.transport.requests import Request
+import time
 
-from manager import auth_manager, practice_manager, practice_session_manager, synonym_game_manager, user_progress_manager, vocabulary_manager
+from manager import admission, auth_manager, catalog_cache, database_manager, pagination, vocabulary_manager, word_search_manager
+from manager.aio import database as async_database
+from manager.aio import practice_manager, practice_session_manager, synonym_game_manager, user_progress_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,35 +17,133 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 flash_card_bp = Blueprint('flash_card', __name__, url_prefix='/flash_card')
 
+# Per-user token buckets (requests per second, burst) of the DB-bound endpoints,
+# checked before any other hook so rejected requests never reach the database
+admission.init_admission(flash_card_bp, {
+    'flash_card.dashboard': (1, 10),
+    'flash_card.search_words': (5, 20),
+    'flash_card.start_practice_session': (1, 10),
+    'flash_card.end_practice_session': (1, 10),
+    'flash_card.get_next_word': (5, 30),
+    'flash_card.submit_answer': (5, 30),
+    'flash_card.start_synonym_game': (1, 10),
+    'flash_card.get_next_synonym_round': (2, 10),
+    'flash_card.submit_synonym_round': (2, 10),
+    'flash_card.end_synonym_game': (1, 10),
+    'flash_card.get_session_history': (2, 10),
+    'flash_card.get_game_history': (2, 10),
+    'flash_card.get_activity': (2, 10),
+})
+
+@flash_card_bp.before_request
+def _route_queries():
+    """Route per-user queries to the user's shard and keep their reads on the primary right after a write"""
+    user_id = session['user']['id'] if 'user' in session else None
+    database_manager.begin_request(session.get('db_primary_until', 0), user_id)
+
+@flash_card_bp.after_request
+def _remember_writes(response):
+    if database_manager.has_replicas() and database_manager.wrote_in_request():
+        session['db_primary_until'] = time.time() + database_manager.READ_YOUR_WRITES_SECONDS
+    return response
+
+def _is_not_modified(etag, last_modified):
+    """Check the request's conditional headers against the given validators"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+def _conditional_response(etag, last_modified, build, vary_cookie=False):
+    """Answer 304 when the client's copy is current, otherwise build the response"""
+    if _is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if vary_cookie:
+        response.cache_control.private = True
+        response.vary.add('Cookie')
+    return response
+
 @flash_card_bp.route('/')
 def index():
     """Main dashboard page"""
-    groups = vocabulary_manager.get_all_groups()
-    return render_template('index.html', groups=groups)
+    catalog = catalog_cache.get_group_catalog()
+    # The page shows the signed-in user, so the validator is per user
+    user_id = session['user']['id'] if 'user' in session else 'anonymous'
+    etag = f"{catalog['etag']}-{user_id}"
+    return _conditional_response(
+        etag,
+        catalog['last_modified'],
+        lambda: render_template('index.html', groups=catalog['groups']),
+        vary_cookie=True
+    )
+
+@flash_card_bp.route('/api/groups', methods=['GET'])
+def get_groups():
+    """Get word groups with word counts and part-of-speech breakdowns"""
+    try:
+        catalog = catalog_cache.get_group_catalog()
+        return _conditional_response(
+            catalog['etag'],
+            catalog['last_modified'],
+            lambda: jsonify({'groups': catalog['groups']})
+        )
+    except Exception as e:
+        logger.error(f"Error getting groups: {e}")
+        return jsonify({'error': 'Failed to get groups'}), 500
+
+@flash_card_bp.route('/api/search', methods=['GET'])
+def search_words():
+    """Search words with prefix autocomplete and typo-tolerant matching"""
+    query = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'auto')
+    if not query:
+        return jsonify({'error': 'Missing query'}), 400
+    if mode not in word_search_manager.SEARCH_MODES:
+        return jsonify({'error': 'Invalid search mode'}), 400
+
+    try:
+        limit = int(request.args.get('limit', 10))
+        group_id = request.args.get('group_id')
+        group_id = int(group_id) if group_id else None
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or group_id'}), 400
+
+    try:
+        results = word_search_manager.search_words(query, mode, limit, group_id)
+        return jsonify({'query': query, 'mode': mode, 'results': results})
+    except Exception as e:
+        logger.error(f"Error searching words: {e}")
+        return jsonify({'error': 'Failed to search words'}), 500
 
 @flash_card_bp.route('/dashboard')
-def dashboard():
+async def dashboard():
     """User dashboard with statistics"""
     if 'user' not in session:
         return redirect(url_for('flash_card.index'))
     
-    # Get user statistics
-    stats = user_progress_manager.get_or_update_weekly_stats(session['user']['id'])
-    
-    # Get group performance
-    group_performance = user_progress_manager.get_user_group_performance(session['user']['id'])
-    
-    # Get recent sessions
-    recent_sessions = practice_session_manager.get_user_sessions(session['user']['id'], limit=5)
-    
-    # Get synonym game history
-    game_history = synonym_game_manager.get_game_history(session['user']['id'], limit=5)
+    # The widgets are independent, so load them concurrently
+    user_id = session['user']['id']
+    stats, group_performance, recent_sessions, game_history, activity = await async_database.run(async_database.gather(
+        user_progress_manager.get_or_update_weekly_stats(user_id),
+        user_progress_manager.get_user_group_performance(user_id),
+        practice_session_manager.get_user_sessions(user_id, limit=5),
+        synonym_game_manager.get_game_history(user_id, limit=5),
+        user_progress_manager.get_activity_calendar(user_id)
+    ))
 
     return render_template('dashboard.html', 
                             stats=stats, 
                             group_performance=group_performance,
                             recent_sessions=recent_sessions,
-                            game_history=game_history)
+                            game_history=game_history,
+                            activity=activity)
 
 @flash_card_bp.route('/practice')
 def practice():
@@ -83,7 +182,7 @@ def auth_callback():
 
     print(request.headers["Referer"])
     try:
-        user = id_token.verify_oauth2_token(request.form['credential'], Request(), os.getenv('GOOGLE_CLIENT_ID'))
+        user = auth_manager.verify_google_id_token(request.form['credential'])
         # Prepare user data for our system
         google_user_data = {
             'google_id':  user["email"],
@@ -106,6 +205,25 @@ def auth_callback():
         logger.error(f"Error during authentication: {e}")
         return redirect(url_for('flash_card.index'))
 
+@flash_card_bp.route('/auth/test-login', methods=['POST'])
+def test_login():
+    """Sign in as a synthetic user without Google (load testing only)"""
+    if not current_app.config.get('TEST_LOGIN_ENABLED'):
+        return jsonify({'error': 'Not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    name = str(data.get('name', 'loadtest-user'))
+    email = f"{name}@loadtest.invalid"
+    session_user = auth_manager.handle_google_callback({
+        'google_id': email,
+        'email': email,
+        'given_name': name,
+        'family_name': 'Loadtest',
+        'name': f"{name} Loadtest",
+        'picture': None
+    })
+    return jsonify({'status': 'Logged in', 'user_id': session_user['id']})
+
 @flash_card_bp.route('/auth/logout')
 def logout():
     """Logout user"""
@@ -113,7 +231,7 @@ def logout():
     return redirect(url_for('flash_card.index'))
 
 @flash_card_bp.route('/api/start_session', methods=['POST'])
-def start_practice_session():
+async def start_practice_session():
     """Start a new practice session"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -123,7 +241,7 @@ def start_practice_session():
         group_id = data.get('group_id') if data else None
         
         user_id = session['user']['id']
-        session_record = practice_session_manager.create_session(user_id)
+        session_record = await async_database.run(practice_session_manager.create_session(user_id))
         
         # Store session ID and group ID in user session
         session['current_session_id'] = session_record['id']
@@ -140,7 +258,7 @@ def start_practice_session():
         return jsonify({'error': 'Failed to start session'}), 500
 
 @flash_card_bp.route('/api/end_session', methods=['POST'])
-def end_practice_session():
+async def end_practice_session():
     """End the current practice session"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -155,12 +273,12 @@ def end_practice_session():
         words_attempted = data.get('words_attempted', 0)
         words_correct = data.get('words_correct', 0)
         
-        session_record = practice_session_manager.end_session(
+        session_record = await async_database.run(practice_session_manager.end_session(
             session_id,
             total_score,
             words_attempted,
             words_correct
-        )
+        ))
         
         # Clear session from user session
         session.pop('current_session_id', None)
@@ -179,7 +297,7 @@ def end_practice_session():
         return jsonify({'error': 'Failed to end session'}), 500
 
 @flash_card_bp.route('/api/next_word', methods=['GET'])
-def get_next_word():
+async def get_next_word():
     """Get the next word for practice based on adaptive difficulty"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -196,7 +314,7 @@ def get_next_word():
             group_id = session.get('current_group_id')
         
         # Get next word using practice manager
-        word_response = practice_manager.get_next_word(user_id, group_id)
+        word_response = await async_database.run(practice_manager.get_next_word(user_id, group_id))
         
         if not word_response:
             return jsonify({'error': 'No words available'}), 404
@@ -225,7 +343,7 @@ def get_next_word():
         return jsonify({'error': 'Failed to get next word'}), 500
 
 @flash_card_bp.route('/api/submit_answer', methods=['POST'])
-def submit_answer():
+async def submit_answer():
     """Submit an answer and update user progress"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -242,14 +360,14 @@ def submit_answer():
         session_id = session.get('current_session_id')
         
         # Submit answer using practice manager
-        result = practice_manager.submit_answer(
+        result = await async_database.run(practice_manager.submit_answer(
             user_id=session['user']['id'],
             word_id=session['current_word']['word_id'],
             selected_choice_index=selected_choice_index,
             correct_choice_index=session['current_word']['correct_choice_index'],
             time_taken=time_taken,
             session_id=session_id
-        )
+        ))
         
         # Clear current word from session
         session.pop('current_word', None)
@@ -261,7 +379,7 @@ def submit_answer():
         return jsonify({'error': 'Failed to submit answer'}), 500
 
 @flash_card_bp.route('/api/synonym-game/start', methods=['POST'])
-def start_synonym_game():
+async def start_synonym_game():
     """Start a new synonym game"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -269,7 +387,7 @@ def start_synonym_game():
     user_id = session['user']['id']
     
     # Start a new game
-    game = synonym_game_manager.start_new_game(user_id)
+    game = await async_database.run(synonym_game_manager.start_new_game(user_id))
     
     # Store game ID in session
     session['current_synonym_game_id'] = game['id']
@@ -283,7 +401,7 @@ def start_synonym_game():
 
 
 @flash_card_bp.route('/api/synonym-game/next-round', methods=['GET'])
-def get_next_synonym_round():
+async def get_next_synonym_round():
     """Get the next round of the synonym game"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -293,7 +411,7 @@ def get_next_synonym_round():
     
     try:
         # Get two random synonym pairs
-        synonym_pairs = synonym_game_manager.get_random_synonym_pairs(2)
+        synonym_pairs = await async_database.run(synonym_game_manager.get_random_synonym_pairs(2))
         
         if len(synonym_pairs) < 2:
             return jsonify({'error': 'Not enough synonym data available'}), 404
@@ -335,7 +453,7 @@ def get_next_synonym_round():
         return jsonify({'error': 'Failed to get next round'}), 500
 
 @flash_card_bp.route('/api/synonym-game/submit-round', methods=['POST'])
-def submit_synonym_round():
+async def submit_synonym_round():
     """Submit answers for a round of the synonym game"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -371,6 +489,7 @@ def submit_synonym_round():
         round_number = session.get('current_synonym_game_round', 1)
         
         total_round_score = 0
+        score_writes = []
         for meaning, stats in meaning_scores.items():
             if stats['total'] > 0:
                 percentage = (stats['correct'] / stats['total']) * 100
@@ -382,9 +501,9 @@ def submit_synonym_round():
                 })
                 
                 # Record score in database
-                score_record = synonym_game_manager.record_round_score(
+                score_writes.append(synonym_game_manager.record_round_score(
                     game_id, round_number, meaning, percentage
-                )
+                ))
                 total_round_score += percentage
             else:
                 round_scores.append({
@@ -395,9 +514,12 @@ def submit_synonym_round():
                 })
                 
                 # Record score in database
-                score_record = synonym_game_manager.record_round_score(
+                score_writes.append(synonym_game_manager.record_round_score(
                     game_id, round_number, meaning, 0
-                )
+                ))
+        
+        # The meanings' scores are separate rows, so write them concurrently
+        await async_database.run(async_database.gather(*score_writes))
         
         # Update round number in session
         session['current_synonym_game_round'] = round_number + 1
@@ -417,7 +539,7 @@ def submit_synonym_round():
         return jsonify({'error': 'Failed to submit round'}), 500
 
 @flash_card_bp.route('/api/synonym-game/end', methods=['POST'])
-def end_synonym_game():
+async def end_synonym_game():
     """End the current synonym game"""
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
@@ -429,7 +551,7 @@ def end_synonym_game():
         game_id = session['current_synonym_game_id']
         
         # Get total game score
-        game_details = synonym_game_manager.get_game_details(game_id)
+        game_details = await async_database.run(synonym_game_manager.get_game_details(game_id))
         if game_details:
             total_score = sum(
                 score['score'] 
@@ -453,4 +575,70 @@ def end_synonym_game():
         
     except Exception as e:
         logger.error(f"Error ending synonym game: {e}")
-        return jsonify({'error': 'Failed to end game'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to end game'}), 500
+
+def _page_args():
+    """The limit and cursor of a history page request; raises ValueError when either is invalid"""
+    limit = int(request.args.get('limit', pagination.DEFAULT_PAGE_SIZE))
+    if not 1 <= limit <= pagination.MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {pagination.MAX_PAGE_SIZE}")
+    cursor = request.args.get('cursor') or None
+    if cursor:
+        pagination.decode_cursor(cursor)
+    return limit, cursor
+
+@flash_card_bp.route('/api/history/sessions', methods=['GET'])
+async def get_session_history():
+    """Page through the user's practice sessions, newest first"""
+    if 'user' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    
+    try:
+        return jsonify(await async_database.run(
+            practice_session_manager.get_user_sessions_page(session['user']['id'], limit, cursor)))
+    except Exception as e:
+        logger.error(f"Error getting session history: {e}")
+        return jsonify({'error': 'Failed to get session history'}), 500
+
+@flash_card_bp.route('/api/history/games', methods=['GET'])
+async def get_game_history():
+    """Page through the user's synonym games, newest first"""
+    if 'user' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    
+    try:
+        return jsonify(await async_database.run(
+            synonym_game_manager.get_game_history_page(session['user']['id'], limit, cursor)))
+    except Exception as e:
+        logger.error(f"Error getting game history: {e}")
+        return jsonify({'error': 'Failed to get game history'}), 500
+
+@flash_card_bp.route('/api/activity', methods=['GET'])
+async def get_activity():
+    """Current and longest streaks and the daily activity calendar of the user"""
+    if 'user' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    try:
+        days = int(request.args.get('days', user_progress_manager.ACTIVITY_DAYS))
+    except ValueError:
+        return jsonify({'error': 'Invalid days'}), 400
+    if not 1 <= days <= user_progress_manager.ACTIVITY_DAYS:
+        return jsonify({'error': 'Invalid days'}), 400
+    
+    try:
+        return jsonify(await async_database.run(
+            user_progress_manager.get_activity_calendar(session['user']['id'], days)))
+    except Exception as e:
+        logger.error(f"Error getting activity: {e}")
+        return jsonify({'error': 'Failed to get activity'}), 500
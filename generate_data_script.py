@@ -0,0 +1,344 @@
+import argparse
+import math
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmark_script import generate_catalog
+from manager import database_manager
+from manager import shard_manager
+from manager.database_manager import get_db_connection, copy_rows, use_shard
+
+# Tables in foreign-key order with the columns the generator writes
+TABLES = {
+    'practice_sessions': ('id', 'user_id', 'start_time', 'end_time', 'total_score',
+                            'words_attempted', 'words_correct'),
+    'user_progress': ('id', 'user_id', 'word_id', 'session_id', 'level_at_time', 'is_correct',
+                        'time_taken', 'attempted_at'),
+    'user_word_levels': ('user_id', 'word_id', 'level', 'last_practiced', 'created_at'),
+    'synonym_games': ('id', 'user_id', 'played_at'),
+    'synonym_scores': ('game_id', 'subgame_order', 'meaning', 'score'),
+}
+# The migration 0007 backfill, limited to the generated users
+DAILY_ACTIVITY_SQL = """
+    INSERT INTO user_daily_activity (user_id, activity_date, attempts, correct, score, practice_seconds)
+    SELECT user_id,
+           (attempted_at AT TIME ZONE 'UTC')::date,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE is_correct),
+           COALESCE(SUM(level_at_time + 1) FILTER (WHERE is_correct), 0),
+           COALESCE(SUM(time_taken), 0)
+    FROM user_progress
+    WHERE user_id BETWEEN %s AND %s AND attempted_at IS NOT NULL
+    GROUP BY user_id, (attempted_at AT TIME ZONE 'UTC')::date
+    ON CONFLICT (user_id, activity_date) DO UPDATE SET
+        attempts = EXCLUDED.attempts,
+        correct = EXCLUDED.correct,
+        score = EXCLUDED.score,
+        practice_seconds = EXCLUDED.practice_seconds
+"""
+SERIAL_TABLES = ('users', 'word_groups', 'words', 'practice_sessions', 'user_progress',
+                 'user_word_levels', 'synonym_games', 'synonym_scores')
+CATALOG_SERIAL_TABLES = ('users', 'word_groups', 'words')
+USER_COLUMNS = ('id', 'google_id', 'email', 'given_name', 'family_name', 'name', 'created_at', 'last_login')
+
+def zipf_weights(count, exponent):
+    """Power-law weights for ranks 1..count"""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+def allocate(total, weights):
+    """Split ``total`` into integer shares proportional to ``weights``"""
+    scale = total / sum(weights)
+    shares = [int(w * scale) for w in weights]
+    for i in range(total - sum(shares)):
+        shares[i % len(shares)] += 1
+    return shares
+
+def _ts(value):
+    return value.isoformat()
+
+class Simulator:
+    """Simulate learner histories and write them as COPY text into spool files.
+
+    Rows are spooled per destination database: None for the primary, or a
+    shard number, each with its own explicit ids continuing from ``id_offsets``.
+    """
+
+    def __init__(self, args, word_ids, now, id_offsets, meanings):
+        self.args = args
+        self.word_ids = word_ids
+        self.word_weights = zipf_weights(len(word_ids), args.word_skew)
+        self.now = now
+        self.meanings = meanings
+        self.next_id = {destination: dict(offsets) for destination, offsets in id_offsets.items()}
+        self.files = {destination: {table: tempfile.TemporaryFile('w+', encoding='utf-8') for table in TABLES}
+                      for destination in id_offsets}
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def _id(self, destination, table):
+        self.next_id[destination][table] += 1
+        return self.next_id[destination][table]
+
+    def simulate_user(self, rng, user_id, attempts, games, seniority, destination=None):
+        """Write one learner's sessions, attempts, levels and games; ``seniority`` is in [0, 1]"""
+        args = self.args
+        files = self.files[destination]
+        sessions_out = files['practice_sessions']
+        progress_out = files['user_progress']
+
+        # Heavier users joined earlier and study a larger working set
+        span_days = args.days * (0.05 + 0.95 * seniority) * rng.uniform(0.8, 1.0)
+        joined = self.now - timedelta(days=max(span_days, 1))
+        working_size = max(5, min(len(self.word_ids), int(3 * attempts ** 0.6)))
+        working_set = list(set(rng.choices(self.word_ids, weights=self.word_weights, k=working_size)))
+
+        levels = {}
+        last_practiced = {}
+        first_practiced = {}
+        remaining = attempts
+        session_count = max(1, round(attempts / args.session_length)) if attempts else 0
+        active_seconds = (self.now - joined).total_seconds()
+        starts = sorted(rng.uniform(0, active_seconds) for _ in range(session_count))
+
+        for n, offset in enumerate(starts):
+            if remaining <= 0:
+                break
+            if n == len(starts) - 1:
+                size = remaining
+            else:
+                size = min(remaining, max(1, int(rng.expovariate(1 / args.session_length))))
+            remaining -= size
+            session_id = self._id(destination, 'practice_sessions')
+            moment = joined + timedelta(seconds=offset)
+            session_start = moment
+            score = correct_count = 0
+
+            for _ in range(size):
+                word_id = rng.choice(working_set)
+                level = levels.get(word_id, 0)
+                is_correct = rng.random() < min(0.95, 0.55 + 0.08 * level)
+                time_taken = rng.randint(2, 45)
+                moment += timedelta(seconds=time_taken + rng.randint(1, 5))
+                progress_out.write(
+                    f"{self._id(destination, 'user_progress')}\t{user_id}\t{word_id}\t{session_id}\t{level}\t"
+                    f"{'t' if is_correct else 'f'}\t{time_taken}\t{_ts(moment)}\n")
+                if is_correct:
+                    score += level + 1
+                    correct_count += 1
+                    levels[word_id] = level + 1
+                else:
+                    levels[word_id] = max(level - 1, 0)
+                last_practiced[word_id] = moment
+                first_practiced.setdefault(word_id, moment)
+
+            sessions_out.write(
+                f"{session_id}\t{user_id}\t{_ts(session_start)}\t{_ts(moment)}\t{score}\t"
+                f"{size}\t{correct_count}\n")
+            self.counts['practice_sessions'] += 1
+            self.counts['user_progress'] += size
+
+        # Levels decay with the time since a word was last practiced
+        levels_out = files['user_word_levels']
+        for word_id, level in levels.items():
+            idle_days = (self.now - last_practiced[word_id]).days
+            level = max(0, level - idle_days // args.decay_days)
+            levels_out.write(f"{user_id}\t{word_id}\t{level}\t{_ts(last_practiced[word_id])}\t"
+                             f"{_ts(first_practiced[word_id])}\n")
+            self.counts['user_word_levels'] += 1
+
+        games_out = files['synonym_games']
+        scores_out = files['synonym_scores']
+        for _ in range(games):
+            game_id = self._id(destination, 'synonym_games')
+            played_at = joined + timedelta(seconds=rng.uniform(0, active_seconds))
+            games_out.write(f"{game_id}\t{user_id}\t{_ts(played_at)}\n")
+            self.counts['synonym_games'] += 1
+            for round_number in range(1, rng.randint(1, 5) + 1):
+                for meaning in rng.sample(self.meanings, 2):
+                    score = round(rng.betavariate(4, 2) * 100, 1)
+                    scores_out.write(f"{game_id}\t{round_number}\t{meaning}\t{score}\n")
+                    self.counts['synonym_scores'] += 1
+
+def _max_ids(cur):
+    offsets = {}
+    for table in ('users', 'practice_sessions', 'user_progress', 'synonym_games'):
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        offsets[table] = cur.fetchone()[0]
+    return offsets
+
+def _label(destination):
+    return 'primary' if destination is None else f"shard {destination}"
+
+def _shard_offsets(shards):
+    """Explicit ids continue after the last id taken in each shard's own id range"""
+    offsets = {}
+    for shard in shards:
+        with use_shard(shard):
+            conn = get_db_connection()
+        cur = conn.cursor()
+        offsets[shard] = shard_manager.last_ids(cur, shard)
+        conn.rollback()
+        cur.close()
+        conn.close()
+    return offsets
+
+def _wait_for_words(cur, destination, word_id, timeout):
+    """Wait until the catalog subscription has copied the generated words to a shard"""
+    deadline = time.monotonic() + timeout
+    while True:
+        cur.execute("SELECT 1 FROM words WHERE id = %s", (word_id,))
+        if cur.fetchone() is not None:
+            return
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Word {word_id} did not reach {_label(destination)} within {timeout}s; "
+                               f"is its catalog subscription running?")
+        time.sleep(1)
+
+def _load_user_rows(cur, simulator, destination, user_ids):
+    """COPY the spooled per-user rows of one destination and roll up their daily activity"""
+    for table, columns in TABLES.items():
+        table_start = time.perf_counter()
+        spool = simulator.files[destination][table]
+        spool.seek(0)
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", spool, size=1 << 20)
+        spool.close()
+        print(f"   ⬆️  {_label(destination)} {table}: {time.perf_counter() - table_start:.1f}s")
+
+    # Daily rollup of the progress just loaded, as record_progress keeps it
+    table_start = time.perf_counter()
+    if user_ids:
+        cur.execute(DAILY_ACTIVITY_SQL, (min(user_ids), max(user_ids)))
+        simulator.counts['user_daily_activity'] = simulator.counts.get('user_daily_activity', 0) + cur.rowcount
+        print(f"   ⬆️  {_label(destination)} user_daily_activity: {cur.rowcount} rows "
+              f"in {time.perf_counter() - table_start:.1f}s")
+
+def _set_sequences(cur, tables):
+    """Move sequences past the explicit ids"""
+    for table in tables:
+        cur.execute(f"""
+            SELECT setval(pg_get_serial_sequence('{table}', 'id'),
+                            GREATEST((SELECT COALESCE(MAX(id), 0) FROM {table}), 1))
+        """)
+
+def generate(args):
+    started = time.perf_counter()
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    tag = now.strftime('%Y%m%d%H%M%S')
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    offsets = _max_ids(cur)
+
+    # Catalog: groups and words
+    cur.execute("""
+        INSERT INTO word_groups (name)
+        SELECT 'Synthetic ' || %s || ' #' || n FROM generate_series(1, %s) n
+        RETURNING id
+    """, (tag, args.groups))
+    group_ids = [row[0] for row in cur.fetchall()]
+    catalog = generate_catalog(args.words, args.seed)
+    copy_rows(cur, 'words',
+                ('group_id', 'word', 'part_of_speech', 'meaning_en', 'meaning_th', 'examples',
+                'synonyms', 'antonyms', 'word_forms', 'difficulty', 'frequency'),
+                ((group_ids[i % len(group_ids)], w['word'], w['part_of_speech'], w['meaning_en'],
+                w['meaning_th'], w['examples'], w['synonyms'], w['antonyms'], w['word_forms'],
+                w['difficulty'], w['frequency']) for i, w in enumerate(catalog)))
+    cur.execute("SELECT id FROM words WHERE group_id = ANY(%s) ORDER BY id", (group_ids,))
+    word_ids = [row[0] for row in cur.fetchall()]
+    print(f"📚 {len(group_ids)} groups and {len(word_ids)} words ({time.perf_counter() - started:.1f}s)")
+
+    # Users, with join times implied by their activity
+    first_user = offsets['users'] + 1
+    user_ids = list(range(first_user, first_user + args.users))
+    user_rows = {user_id: (user_id, f"synthetic-{tag}-{user_id}", f"synthetic-{tag}-{user_id}@example.invalid",
+                           'Synthetic', str(user_id), f"Synthetic {user_id}",
+                           _ts(now - timedelta(days=args.days)), _ts(now))
+                 for user_id in user_ids}
+    copy_rows(cur, 'users', USER_COLUMNS, user_rows.values())
+
+    # Per-user rows go where the app will look for them: each user's shard
+    # (with ids from that shard's own range), or the primary when unsharded
+    if database_manager.is_sharded():
+        destinations = {user_id: database_manager.shard_for_user(user_id) for user_id in user_ids}
+        id_offsets = _shard_offsets(sorted(set(destinations.values())))
+    else:
+        destinations = dict.fromkeys(user_ids)
+        id_offsets = {None: offsets}
+    users_by_destination = {destination: [] for destination in id_offsets}
+    for user_id, destination in destinations.items():
+        users_by_destination[destination].append(user_id)
+
+    cur.execute("SELECT meaning FROM synonyms")
+    meanings = [row[0] for row in cur.fetchall()] or [f"Meaning {n}" for n in range(40)]
+
+    # Power-law activity: a few heavy learners, a long tail of light ones
+    activity = zipf_weights(args.users, args.user_skew)
+    rng.shuffle(activity)
+    attempts = allocate(args.progress_rows, activity)
+    games = allocate(args.games, activity)
+
+    max_attempts = max(attempts) or 1
+
+    simulator = Simulator(args, word_ids, now, id_offsets, meanings)
+    for i, user_id in enumerate(user_ids):
+        seniority = math.sqrt(attempts[i] / max_attempts)
+        simulator.simulate_user(random.Random(args.seed * 1_000_003 + user_id), user_id,
+                                attempts[i], games[i], seniority, destinations[user_id])
+        if (i + 1) % max(1, args.users // 10) == 0:
+            print(f"   👥 simulated {i + 1}/{args.users} users "
+                  f"({simulator.counts['user_progress']} attempts, {time.perf_counter() - started:.1f}s)")
+
+    if not database_manager.is_sharded():
+        _load_user_rows(cur, simulator, None, user_ids)
+        _set_sequences(cur, SERIAL_TABLES)
+    else:
+        _set_sequences(cur, CATALOG_SERIAL_TABLES)
+    conn.commit()
+    cur.execute("ANALYZE")
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    for shard in (destination for destination in id_offsets if destination is not None):
+        with use_shard(shard):
+            conn = get_db_connection()
+        cur = conn.cursor()
+        if word_ids:
+            _wait_for_words(cur, shard, word_ids[-1], args.catalog_timeout)
+        # The shard's users rows back the foreign keys of its per-user rows
+        copy_rows(cur, 'users', USER_COLUMNS, (user_rows[user_id] for user_id in users_by_destination[shard]))
+        _load_user_rows(cur, simulator, shard, users_by_destination[shard])
+        conn.commit()
+        # setval is not transactional, so it follows the commit of the rows it covers
+        shard_manager.advance_sequences(cur, shard)
+        conn.commit()
+        cur.execute("ANALYZE")
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    for table in TABLES:
+        print(f"   📦 {table}: {simulator.counts[table]} rows")
+    total = sum(simulator.counts.values()) + len(word_ids) + len(user_ids)
+    elapsed = time.perf_counter() - started
+    print(f"📊 Generated {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the database with synthetic learners at scale")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--words", type=int, default=20_000)
+    parser.add_argument("--progress-rows", type=int, default=1_000_000, help="total user_progress rows")
+    parser.add_argument("--games", type=int, default=50_000, help="total synonym games")
+    parser.add_argument("--days", type=int, default=365, help="history length")
+    parser.add_argument("--session-length", type=int, default=20, help="mean attempts per session")
+    parser.add_argument("--user-skew", type=float, default=1.1, help="Zipf exponent of user activity")
+    parser.add_argument("--word-skew", type=float, default=0.8, help="Zipf exponent of word popularity")
+    parser.add_argument("--decay-days", type=int, default=14, help="days without practice per level lost")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--catalog-timeout", type=int, default=300,
+                        help="seconds to wait for the words to replicate to each shard")
+    generate(parser.parse_args())
@@ -0,0 +1,16 @@
+import os
+
+# gunicorn settings: gunicorn "app:create_app()"
+# The gthread worker parks idle keep-alive connections in a selector and only
+# hands a connection to a thread while a request is being handled, so idle
+# learners do not hold threads. Each request runs on its own thread; async
+# views block only that thread while their queries run on the aio loop.
+bind = os.getenv('BIND', '0.0.0.0:8087')
+workers = int(os.getenv('WEB_WORKERS', '4'))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '32'))
+worker_connections = int(os.getenv('WEB_CONNECTIONS', '2000'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '75'))
+# create_app starts threads (catalog listener, aio loop, warm-up), so every
+# worker builds its own app after the fork
+preload_app = False
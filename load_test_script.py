@@ -0,0 +1,232 @@
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+
+# URL prefix of the flash card blueprint
+API = '/flash_card'
+
+def setup_database():
+    """Apply the schema migrations (including the synonym seed) and load docs/vocab"""
+    from manager import migration_manager
+    migration_manager.migrate()
+
+    import add_word_script
+    add_word_script.load_all_vocab()
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and status codes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, status):
+        with self.lock:
+            self.latencies[name].append(seconds * 1000)
+            self.statuses[name][str(status)] += 1
+
+    def error(self, name):
+        with self.lock:
+            self.errors[name] += 1
+
+class Learner:
+    """One simulated learner with its own cookie session"""
+
+    def __init__(self, number, base_url, recorder, args, stop_at):
+        self.number = number
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.args = args
+        self.stop_at = stop_at
+        self.http = requests.Session()
+        self.rng = random.Random(args.seed + number)
+
+    def call(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.recorder.error(name)
+            return None
+        self.recorder.record(name, time.perf_counter() - start, response.status_code)
+        return response
+
+    def think(self):
+        if self.args.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+    def running(self):
+        return time.monotonic() < self.stop_at
+
+    def login(self):
+        response = self.call('auth_test_login', 'POST', f'{API}/auth/test-login',
+                                json={'name': f'learner{self.number}'})
+        if response is None or response.status_code != 200:
+            raise RuntimeError("Test login failed; start the app with ENABLE_TEST_LOGIN=1")
+
+    def practice(self, group_ids):
+        group_id = self.rng.choice(group_ids) if group_ids else None
+        self.call('start_session', 'POST', f'{API}/api/start_session', json={'group_id': group_id})
+        attempted = correct = score = 0
+        for _ in range(self.args.words_per_session):
+            if not self.running():
+                break
+            response = self.call('next_word', 'GET', f'{API}/api/next_word', params={'group_id': group_id})
+            if response is None or response.status_code != 200:
+                break
+            word = response.json()
+            self.think()
+
+            choices = word.get('choices', [])
+            correct_index = next((i for i, c in enumerate(choices) if c.get('is_correct')), 0)
+            if self.rng.random() < self.args.accuracy or len(choices) < 2:
+                selected = correct_index
+            else:
+                selected = self.rng.choice([i for i in range(len(choices)) if i != correct_index])
+            response = self.call('submit_answer', 'POST', f'{API}/api/submit_answer',
+                                    json={'selected_choice_index': selected,
+                                        'time_taken': self.rng.randint(2, 30)})
+            if response is not None and response.status_code == 200:
+                result = response.json()
+                attempted += 1
+                correct += result.get('is_correct', False)
+                score += result.get('points_earned', 0)
+        self.call('end_session', 'POST', f'{API}/api/end_session',
+                    json={'total_score': score, 'words_attempted': attempted, 'words_correct': correct})
+
+    def synonym_game(self):
+        self.call('synonym_start', 'POST', f'{API}/api/synonym-game/start')
+        for _ in range(self.args.synonym_rounds):
+            if not self.running():
+                break
+            response = self.call('synonym_next_round', 'GET', f'{API}/api/synonym-game/next-round')
+            if response is None or response.status_code != 200:
+                break
+            round_data = response.json()
+            self.think()
+
+            answers = {}
+            for category in round_data.get('categories', []):
+                for word in category['words']:
+                    if self.rng.random() < self.args.accuracy:
+                        answers[word] = category['meaning']
+                    else:
+                        answers[word] = self.rng.choice(round_data['meanings'])
+            self.call('synonym_submit_round', 'POST', f'{API}/api/synonym-game/submit-round',
+                        json={'answers': answers})
+        self.call('synonym_end', 'POST', f'{API}/api/synonym-game/end')
+
+    def run(self, group_ids):
+        self.login()
+        scenarios = [
+            (self.args.weight_practice, lambda: self.practice(group_ids)),
+            (self.args.weight_synonym, self.synonym_game),
+            (self.args.weight_dashboard, lambda: self.call('dashboard', 'GET', f'{API}/dashboard')),
+            (self.args.weight_index, lambda: self.call('index', 'GET', f'{API}/')),
+        ]
+        weights = [weight for weight, _ in scenarios]
+        while self.running():
+            self.rng.choices(scenarios, weights=weights)[0][1]()
+            self.think()
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    recorder = Recorder()
+    group_response = requests.get(args.base_url.rstrip('/') + f'{API}/api/groups', timeout=30)
+    group_ids = [g['id'] for g in group_response.json().get('groups', []) if g.get('word_count')]
+
+    stop_at = time.monotonic() + args.ramp_up + args.duration
+    threads = []
+    started = time.monotonic()
+    for number in range(args.learners):
+        learner = Learner(number, args.base_url, recorder, args, stop_at)
+        thread = threading.Thread(target=learner.run, args=(group_ids,), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.learners)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    endpoints = {}
+    total_requests = 0
+    for name, samples in sorted(recorder.latencies.items()):
+        total_requests += len(samples)
+        endpoints[name] = {
+            'requests': len(samples),
+            'throughput_rps': len(samples) / elapsed,
+            'p50_ms': _percentile(samples, 50),
+            'p95_ms': _percentile(samples, 95),
+            'p99_ms': _percentile(samples, 99),
+            'max_ms': max(samples),
+            'statuses': dict(recorder.statuses[name]),
+            'errors': recorder.errors.get(name, 0)
+        }
+
+    results = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'elapsed_seconds': elapsed,
+        'total_requests': total_requests,
+        'throughput_rps': total_requests / elapsed,
+        'endpoints': endpoints
+    }
+
+    print(f"{'endpoint':24} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  statuses")
+    for name, stats in endpoints.items():
+        print(f"{name:24} {stats['requests']:7d} {stats['throughput_rps']:8.1f} "
+              f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}  {stats['statuses']}")
+    print(f"📊 {total_requests} requests in {elapsed:.1f}s ({results['throughput_rps']:.1f} req/s) "
+          f"with {args.learners} learners")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Drive the flash card endpoints with simulated learners. "
+                    "The app must run with ENABLE_TEST_LOGIN=1.")
+    parser.add_argument("--base-url", default="http://localhost:8087")
+    parser.add_argument("--learners", type=int, default=20, help="concurrent simulated learners")
+    parser.add_argument("--duration", type=float, default=60, help="seconds at full load")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds to start all learners")
+    parser.add_argument("--think-ms", type=float, default=500, help="mean pause between actions")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="probability of a correct answer")
+    parser.add_argument("--words-per-session", type=int, default=20)
+    parser.add_argument("--synonym-rounds", type=int, default=5)
+    parser.add_argument("--weight-practice", type=float, default=6)
+    parser.add_argument("--weight-synonym", type=float, default=2)
+    parser.add_argument("--weight-dashboard", type=float, default=1)
+    parser.add_argument("--weight-index", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load_test_results.json", help="JSON results file")
+    parser.add_argument("--setup-db", action="store_true",
+                        help="apply the schema migrations and load docs/vocab first")
+    args = parser.parse_args()
+
+    if args.setup_db:
+        setup_database()
+    run(args)
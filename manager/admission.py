@@ -0,0 +1,161 @@
+import os
+import math
+import time
+import logging
+import threading
+from flask import g, jsonify, request, session
+from manager import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-user token buckets: (tokens per second, burst) for each limited endpoint.
+# RATE_LIMITS overrides them as "endpoint=rate:burst,..." and RATE_LIMIT=0 turns
+# the buckets off. RATE_LIMIT_REDIS_URL shares the buckets between workers and
+# hosts through Redis (needs the redis package); otherwise each worker keeps its own.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT', '1') != '0'
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL')
+BUCKET_IDLE_SECONDS = 600  # in-process buckets untouched this long are dropped
+
+# Requests of DB-bound endpoints a worker runs at once; later ones wait up to
+# DB_QUEUE_TIMEOUT seconds for a slot and are then shed with 503. 0 disables the cap.
+DB_CONCURRENCY_LIMIT = int(os.getenv('DB_CONCURRENCY_LIMIT', '32'))
+DB_QUEUE_TIMEOUT = float(os.getenv('DB_QUEUE_TIMEOUT', '0.5'))
+SHED_RETRY_AFTER = 1  # seconds
+
+def _parse_limits(value):
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        endpoint, _, spec = item.partition('=')
+        rate, _, burst = spec.partition(':')
+        limits[endpoint.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+class MemoryBuckets:
+    """Token buckets held in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}  # key -> [tokens, updated_at]
+        self._swept_at = time.monotonic()
+
+    def take(self, key, rate, burst):
+        """Take one token; return 0 when allowed, otherwise seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._swept_at > BUCKET_IDLE_SECONDS:
+                self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def _sweep(self, now):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items()
+                         if now - bucket[1] < BUCKET_IDLE_SECONDS}
+        self._swept_at = now
+
+# KEYS[1] bucket hash; ARGV rate, burst, ttl. Uses the Redis clock so workers
+# with skewed clocks share one timeline.
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated_at, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return tostring(wait)
+"""
+
+class RedisBuckets:
+    """Token buckets shared through Redis; allows requests when Redis is unreachable"""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._errors = redis.RedisError
+
+    def take(self, key, rate, burst):
+        try:
+            return float(self._take(keys=[f"ratelimit:{key}"], args=[rate, burst, BUCKET_IDLE_SECONDS]))
+        except self._errors as e:
+            metrics.inc('admission_store_errors_total', 1, 'Rate limit store errors (requests were allowed)')
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return 0
+
+def _reject(status, message, retry_after, endpoint, decision):
+    metrics.inc('admission_decisions_total', 1, 'Admission decisions by endpoint', endpoint=endpoint, decision=decision)
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def init_admission(bp, limits):
+    """Rate-limit and cap the concurrency of a blueprint's DB-bound endpoints.
+
+    ``limits`` maps endpoint names to (tokens per second, burst). Each
+    signed-in user (or client address) gets a bucket per endpoint; an empty
+    bucket answers 429. All listed endpoints share DB_CONCURRENCY_LIMIT slots
+    per worker; a request that cannot get one in time answers 503. Both carry
+    Retry-After.
+    """
+    limits = dict(limits, **_parse_limits(os.getenv('RATE_LIMITS', '')))
+    store = None
+    if RATE_LIMIT_ENABLED:
+        store = RedisBuckets(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBuckets()
+    slots = threading.BoundedSemaphore(DB_CONCURRENCY_LIMIT) if DB_CONCURRENCY_LIMIT > 0 else None
+    in_flight = [0]
+    in_flight_lock = threading.Lock()
+
+    def _set_in_flight(delta):
+        with in_flight_lock:
+            in_flight[0] += delta
+            metrics.set_gauge('admission_in_flight', in_flight[0], 'DB-bound requests running in this worker')
+
+    @bp.before_request
+    def _admit():
+        endpoint = request.endpoint
+        if endpoint not in limits:
+            return None
+        if store is not None:
+            client = session['user']['id'] if 'user' in session else request.remote_addr
+            rate, burst = limits[endpoint]
+            wait = store.take(f"{endpoint}:{client}", rate, burst)
+            if wait > 0:
+                return _reject(429, 'Too many requests', math.ceil(wait), endpoint, 'rate_limited')
+        if slots is not None:
+            start = time.perf_counter()
+            if not slots.acquire(timeout=DB_QUEUE_TIMEOUT):
+                return _reject(503, 'Server busy', SHED_RETRY_AFTER, endpoint, 'shed')
+            metrics.observe('admission_wait_seconds', time.perf_counter() - start,
+                            'Seconds DB-bound requests waited for a concurrency slot')
+            g.admission_slot = True
+            _set_in_flight(1)
+        metrics.inc('admission_decisions_total', 1, 'Admission decisions by endpoint', endpoint=endpoint, decision='allowed')
+        return None
+
+    @bp.teardown_request
+    def _release(exc):
+        if g.pop('admission_slot', False):
+            _set_in_flight(-1)
+            slots.release()
+
+    logger.info(f"Admission control on {len(limits)} endpoints "
+                f"(store={'redis' if RATE_LIMIT_REDIS_URL else 'memory' if store else 'off'}, "
+                f"concurrency={DB_CONCURRENCY_LIMIT or 'unlimited'})")
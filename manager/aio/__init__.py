@@ -0,0 +1,4 @@
+"""
+Async data-access layer: asyncpg mirrors of the manager modules used by the
+JSON API, sharing one event loop and connection pool per process.
+"""
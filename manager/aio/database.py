@@ -0,0 +1,169 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import asyncpg
+from psycopg2.extensions import parse_dsn
+from manager import database_manager
+from manager import tracing
+from manager.aio.statements import Statement, StatementConnection
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One event loop per process runs every async query, so its connection pools
+# are shared by all requests whatever thread or loop they come from
+ASYNC_POOL_MIN = int(os.getenv('ASYNC_POOL_MIN', '1'))
+ASYNC_POOL_MAX = int(os.getenv('ASYNC_POOL_MAX', '20'))
+ASYNC_POOL_IDLE_SECONDS = float(os.getenv('ASYNC_POOL_IDLE_SECONDS', '300'))
+
+_lock = threading.Lock()
+_loop_state = {'loop': None}
+_pools = {}  # DSN (None for DB_CONFIG) -> asyncpg pool future; only used on the loop thread
+
+def get_loop():
+    """The process-wide event loop of the async data-access layer, started on first use"""
+    loop = _loop_state['loop']
+    if loop is not None:
+        return loop
+    with _lock:
+        if _loop_state['loop'] is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='aio-db-loop', daemon=True).start()
+            _loop_state['loop'] = loop
+    return _loop_state['loop']
+
+async def run(coro):
+    """Await a manager coroutine on the shared loop from any other loop (e.g. a Flask async view)"""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    # The coroutine runs in a copy of the caller's context, so routing and tracing state carry over
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def run_sync(coro):
+    """Run a manager coroutine on the shared loop and wait for its result (scripts, sync code)"""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+async def gather(*coros):
+    """Run independent manager coroutines concurrently"""
+    return await asyncio.gather(*coros)
+
+def _connect_kwargs(dsn):
+    if not dsn:
+        return {key: value for key, value in database_manager.DB_CONFIG.items() if value}
+    params = parse_dsn(dsn)
+    kwargs = {key: params[key] for key in ('host', 'port', 'user', 'password') if key in params}
+    if 'dbname' in params:
+        kwargs['database'] = params['dbname']
+    if 'sslmode' in params:
+        kwargs['ssl'] = params['sslmode']
+    return kwargs
+
+async def _pool(dsn):
+    future = _pools.get(dsn)
+    if future is None:
+        future = _pools[dsn] = asyncio.ensure_future(asyncpg.create_pool(
+            min_size=ASYNC_POOL_MIN, max_size=ASYNC_POOL_MAX, connection_class=StatementConnection,
+            max_inactive_connection_lifetime=ASYNC_POOL_IDLE_SECONDS, **_connect_kwargs(dsn)))
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        if _pools.get(dsn) is future:
+            del _pools[dsn]
+        raise
+
+async def _replica_pool():
+    """A pool of a random replica within the lag limit, or None"""
+    for dsn in database_manager.replica_candidates():
+        try:
+            pool = await _pool(dsn)
+            if database_manager.replica_needs_lag_check(dsn):
+                database_manager.record_replica_lag(dsn, await pool.fetchval(database_manager.REPLICA_LAG_SQL))
+        except (OSError, asyncpg.PostgresError) as e:
+            database_manager.mark_replica_down(dsn, e)
+            continue
+        if database_manager.replica_within_lag(dsn):
+            return pool
+    return None
+
+async def get_pool():
+    """The pool for the current route, chosen like database_manager.get_db_connection"""
+    try:
+        shard = database_manager.routed_shard()
+        if shard is not None:
+            return await _pool(database_manager.SHARD_DSNS[shard])
+        if database_manager.reads_from_replica():
+            pool = await _replica_pool()
+            if pool is not None:
+                return pool
+        return await _pool(database_manager.PRIMARY_DSN)
+    except Exception as e:
+        logger.error(f"Database connection failed: {e}")
+        raise
+
+async def _run(method, query, args):
+    pool = await get_pool()
+    if not isinstance(query, Statement):
+        return await getattr(pool, method)(query, *args)
+    async with pool.acquire() as conn:
+        return await conn.execute_statement(method, query, *args)
+
+async def _timed(method, query, args):
+    start = time.perf_counter()
+    result = await _run(method, query, args)
+    rows = len(result) if isinstance(result, list) else int(result is not None)
+    tracing.record_query((time.perf_counter() - start) * 1000, rows)
+    return result
+
+async def fetch(query, *args):
+    """Rows of a query (SQL text or a registered Statement) as asyncpg Records (row['col'], row.get, dict(row))"""
+    return await _timed('fetch', query, args)
+
+async def fetchrow(query, *args):
+    """The first row of a query, or None"""
+    return await _timed('fetchrow', query, args)
+
+async def fetchval(query, *args):
+    """The first column of the first row of a query"""
+    return await _timed('fetchval', query, args)
+
+async def warm_up(statements=()):
+    """Open the pool of every configured database and prepare the given Statements on each of its connections.
+
+    Returns the number of connections warmed.
+    """
+    warmed = 0
+    for dsn in [database_manager.PRIMARY_DSN] + database_manager.REPLICA_DSNS + database_manager.SHARD_DSNS:
+        try:
+            pool = await _pool(dsn)
+        except (OSError, asyncpg.PostgresError) as e:
+            # A missing replica only means reads go elsewhere
+            if dsn in database_manager.REPLICA_DSNS:
+                database_manager.mark_replica_down(dsn, e)
+                continue
+            raise
+        connections = [await pool.acquire() for _ in range(pool.get_idle_size())]
+        try:
+            for conn in connections:
+                for statement in statements:
+                    await conn.prepare_statement(statement)
+        finally:
+            for conn in connections:
+                await pool.release(conn)
+        warmed += len(connections)
+    return warmed
+
+async def close():
+    """Close every pool (at shutdown)"""
+    pools = list(_pools.values())
+    _pools.clear()
+    for future in pools:
+        if future.done() and not future.exception():
+            await future.result().close()
@@ -0,0 +1,90 @@
+import logging
+from manager import practice_manager
+from manager import vocabulary_manager as sync_vocabulary_manager
+from manager.aio import database
+from manager.aio import user_progress_manager
+from manager.aio import user_word_level_manager
+from manager.aio import vocabulary_manager
+from manager.aio import word_manager
+from manager.database_manager import read_write
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@traced
+async def get_next_word(user_id, group_id=None):
+    """Get the next word for practice based on adaptive difficulty"""
+    try:
+        # Get user's word levels for the specified group or all words if no group specified
+        words_with_levels = await user_word_level_manager.get_user_words_with_levels(user_id, group_id)
+        selected_word = practice_manager.select_word(words_with_levels)
+        if selected_word is None:
+            return None
+
+        # With a known group the word and its distractor candidates load concurrently
+        if group_id is not None:
+            word_details, words_in_group = await database.gather(
+                word_manager.get_word_by_id(selected_word['word_id']),
+                word_manager.get_words_by_group(group_id))
+        else:
+            word_details, words_in_group = await word_manager.get_word_by_id(selected_word['word_id']), None
+        
+        if not word_details:
+            return None
+        
+        # Generate choices based on level and group
+        level = selected_word['level']
+        if words_in_group is not None:
+            try:
+                distractors = sync_vocabulary_manager.choose_distractors(word_details, words_in_group, 3)
+                choices = practice_manager.build_choices(word_details, level, distractors)
+            except Exception as e:
+                logger.error(f"Error generating choices: {e}")
+                choices = practice_manager.fallback_choices(word_details)
+        else:
+            choices = await generate_choices(word_details, level, user_id)
+        return practice_manager.word_response(word_details, level, choices)
+        
+    except Exception as e:
+        logger.error(f"Error getting next word: {e}")
+        raise
+
+@traced
+async def generate_choices(correct_word, level, user_id, group_id=None):
+    """Generate multiple choice options based on difficulty level"""
+    try:
+        # Distractors (incorrect choices) come from the same group
+        distractors = await vocabulary_manager.get_distractors(correct_word, 3, group_id)
+        return practice_manager.build_choices(correct_word, level, distractors)
+        
+    except Exception as e:
+        logger.error(f"Error generating choices: {e}")
+        # Fallback to simple choices
+        return practice_manager.fallback_choices(correct_word)
+
+@traced
+@read_write
+async def submit_answer(user_id, word_id, selected_choice_index, correct_choice_index, time_taken, session_id=None):
+    """Submit an answer and update user progress"""
+    try:
+        # Check if answer is correct
+        is_correct = (selected_choice_index == correct_choice_index)
+        
+        # Get current level for this word
+        current_level_record = await user_word_level_manager.get_user_word_level(user_id, word_id)
+        current_level = current_level_record['level']
+        
+        # Update the level and record progress concurrently
+        updates = [user_word_level_manager.update_user_word_level(user_id, word_id, is_correct)]
+        if session_id:
+            updates.append(user_progress_manager.record_progress(
+                user_id, word_id, session_id, current_level, is_correct, time_taken))
+        new_level = (await database.gather(*updates))[0]
+        
+        return practice_manager.answer_result(is_correct, current_level, new_level)
+        
+    except Exception as e:
+        logger.error(f"Error submitting answer: {e}")
+        raise
@@ -0,0 +1,95 @@
+import logging
+from manager import pagination
+from manager.aio import database
+from manager.aio.statements import statement
+from manager.database_manager import read_only, read_write, user_scoped
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SESSION_COLUMNS = "id, user_id, start_time, end_time, total_score, words_attempted, words_correct"
+CREATE_SESSION = statement('create_session', f"""
+    INSERT INTO practice_sessions (user_id)
+    VALUES ($1)
+    RETURNING {SESSION_COLUMNS}
+""")
+# The totals come from the client, so accept any number for the INTEGER columns
+END_SESSION = statement('end_session', f"""
+    UPDATE practice_sessions
+    SET end_time = CURRENT_TIMESTAMP,
+        total_score = $1::FLOAT8,
+        words_attempted = $2::FLOAT8,
+        words_correct = $3::FLOAT8
+    WHERE id = $4
+    RETURNING {SESSION_COLUMNS}
+""")
+USER_SESSIONS = statement('user_sessions', f"""
+    SELECT {SESSION_COLUMNS}
+    FROM practice_sessions
+    WHERE user_id = $1
+    ORDER BY start_time DESC
+    LIMIT $2
+""")
+
+@traced
+@read_write
+@user_scoped
+async def create_session(user_id):
+    """Create a new practice session"""
+    try:
+        return await database.fetchrow(CREATE_SESSION, int(user_id))
+        
+    except Exception as e:
+        logger.error(f"Error in create_session: {e}")
+        raise
+
+@traced
+@read_write
+@user_scoped
+async def end_session(session_id, total_score, words_attempted, words_correct):
+    """End a practice session"""
+    try:
+        return await database.fetchrow(END_SESSION, total_score, words_attempted, words_correct, int(session_id))
+        
+    except Exception as e:
+        logger.error(f"Error in end_session: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_user_sessions(user_id, limit=10):
+    """Get recent practice sessions for a user"""
+    try:
+        return await database.fetch(USER_SESSIONS, int(user_id), limit)
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_sessions: {e}")
+        raise
+
+SESSIONS_PAGE_SQL = f"""
+    SELECT {SESSION_COLUMNS}
+    FROM practice_sessions
+    WHERE user_id = $1 {{after}}
+    ORDER BY start_time DESC, id DESC
+    LIMIT $2
+"""
+SESSIONS_AFTER = "AND (start_time, id) < ($3, $4)"
+
+@traced
+@read_only
+@user_scoped
+async def get_user_sessions_page(user_id, limit=pagination.DEFAULT_PAGE_SIZE, cursor=None):
+    """Get one page of a user's practice sessions and the cursor of the next page"""
+    try:
+        args = [int(user_id), limit + 1]
+        if cursor:
+            args.extend(pagination.decode_cursor(cursor))
+        sessions = await database.fetch(SESSIONS_PAGE_SQL.format(after=SESSIONS_AFTER if cursor else ''), *args)
+        return pagination.page(sessions, limit, 'start_time')
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_sessions_page: {e}")
+        raise
@@ -0,0 +1,87 @@
+import itertools
+import asyncpg
+from manager import metrics
+
+# Registry of named hot statements. Each pooled connection PREPAREs a
+# statement the first time it runs it there and then EXECUTEs it by name,
+# so the server parses and plans it once per connection instead of per call.
+_registry = {}  # name -> Statement
+_server_names = itertools.count(1)
+
+# Errors meaning the connection's prepared statement is gone or its plan is
+# stale (schema change); the statement is prepared again and retried once
+_REPREPARE_ERRORS = (asyncpg.exceptions.InvalidCachedStatementError,
+                     asyncpg.exceptions.InvalidSQLStatementNameError)
+
+class Statement:
+    """A named query; pass it to manager.aio.database.fetch/fetchrow/fetchval instead of the SQL text"""
+
+    __slots__ = ('name', 'query')
+
+    def __init__(self, name, query):
+        self.name = name
+        self.query = query
+
+    def __repr__(self):
+        return f"Statement({self.name!r})"
+
+def statement(name, query):
+    """Register a hot query under a unique name"""
+    existing = _registry.get(name)
+    if existing is not None and existing.query != query:
+        raise ValueError(f"Statement {name!r} is already registered with a different query")
+    _registry[name] = existing or Statement(name, query)
+    return _registry[name]
+
+def registered():
+    """All registered statements"""
+    return list(_registry.values())
+
+def hit_rates():
+    """Share of executions per statement that found it already prepared on the connection"""
+    rates = {}
+    for name in _registry:
+        hits = metrics.get_value('prepared_statement_calls_total', cache='hit', statement=name) or 0
+        misses = metrics.get_value('prepared_statement_calls_total', cache='miss', statement=name) or 0
+        if hits + misses:
+            rates[name] = hits / (hits + misses)
+    return rates
+
+def _count(statement, cache):
+    metrics.inc('prepared_statement_calls_total', 1, 'Registered statement executions by whether the connection had it prepared',
+                cache=cache, statement=statement.name)
+
+class StatementConnection(asyncpg.Connection):
+    """asyncpg connection keeping the registered statements it has prepared.
+
+    A reconnect gives the pool a new connection with none prepared, so
+    statements are prepared again on first use there.
+    """
+
+    __slots__ = ('_prepared',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prepared = {}  # statement name -> asyncpg PreparedStatement
+
+    async def prepare_statement(self, statement):
+        """PREPARE a registered statement on this connection unless it already is"""
+        prepared = self._prepared.get(statement.name)
+        if prepared is None:
+            # Server-side names are unique per process so a re-prepare never collides
+            prepared = await self.prepare(statement.query, name=f"vf_{statement.name}_{next(_server_names)}")
+            self._prepared[statement.name] = prepared
+        return prepared
+
+    async def execute_statement(self, method, statement, *args):
+        """Run a registered statement with a PreparedStatement method (fetch, fetchrow or fetchval)"""
+        _count(statement, 'hit' if statement.name in self._prepared else 'miss')
+        prepared = await self.prepare_statement(statement)
+        try:
+            return await getattr(prepared, method)(*args)
+        except _REPREPARE_ERRORS:
+            metrics.inc('prepared_statement_reprepares_total', 1, 'Registered statements prepared again after invalidation',
+                        statement=statement.name)
+            self._prepared.pop(statement.name, None)
+            prepared = await self.prepare_statement(statement)
+            return await getattr(prepared, method)(*args)
@@ -0,0 +1,181 @@
+import logging
+from manager import pagination
+from manager.aio import database
+from manager.synonym_game_manager import history_item
+from manager.database_manager import read_only, read_write, user_scoped
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@traced
+@read_only
+async def get_random_synonym_pairs(count=2):
+    """Get random pairs of synonyms from the database"""
+    try:
+        # First, get the total count of synonym records
+        total_count = await database.fetchval("SELECT COUNT(*) FROM synonyms")
+        
+        if total_count < count:
+            logger.warning(f"Not enough synonym records. Found {total_count}, need {count}")
+            return []
+        
+        # Get random synonym records
+        synonym_pairs = await database.fetch("""
+            SELECT id, category, meaning, words 
+            FROM synonyms 
+            ORDER BY RANDOM() 
+            LIMIT $1
+        """, count)
+        
+        # Convert to dictionary format
+        return [{
+            'id': row['id'],
+            'category': row['category'],
+            'meaning': row['meaning'],
+            'words': row['words'] if row['words'] else []
+        } for row in synonym_pairs]
+        
+    except Exception as e:
+        logger.error(f"Error getting random synonym pairs: {e}")
+        return []
+
+@traced
+@read_write
+@user_scoped
+async def start_new_game(user_id):
+    """Start a new synonym game session"""
+    try:
+        # Insert a new game record
+        game_record = await database.fetchrow("""
+            INSERT INTO synonym_games (user_id)
+            VALUES ($1)
+            RETURNING id, user_id, played_at
+        """, int(user_id))
+        return dict(game_record)
+        
+    except Exception as e:
+        logger.error(f"Error starting new game: {e}")
+        raise
+
+@traced
+@read_write
+@user_scoped
+async def record_round_score(game_id, subgame_order, meaning, score):
+    """Record the score for a round of the game"""
+    try:
+        # Insert a new score record
+        score_record = await database.fetchrow("""
+            INSERT INTO synonym_scores (game_id, subgame_order, meaning, score)
+            VALUES ($1, $2, $3, $4)
+            RETURNING id, game_id, subgame_order, meaning, score
+        """, int(game_id), int(subgame_order), meaning, float(score))
+        return dict(score_record)
+        
+    except Exception as e:
+        logger.error(f"Error recording round score: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_game_history(user_id, limit=10):
+    """Get game history for a user"""
+    try:
+        # Get recent games with their total scores
+        games = await database.fetch("""
+            SELECT 
+                sg.id,
+                sg.played_at,
+                string_agg(ss.meaning, ', ') AS meanings, 
+                COALESCE(SUM(ss.score), 0) as total_score
+            FROM synonym_games sg
+            LEFT JOIN synonym_scores ss ON sg.id = ss.game_id
+            WHERE sg.user_id = $1
+            GROUP BY sg.id, sg.played_at
+            ORDER BY sg.played_at DESC
+            LIMIT $2
+        """, int(user_id), limit)
+        
+        return [history_item(game) for game in games]
+        
+    except Exception as e:
+        logger.error(f"Error getting game history: {e}")
+        return []
+
+GAMES_PAGE_SQL = """
+    SELECT 
+        sg.id,
+        sg.played_at,
+        string_agg(ss.meaning, ', ') AS meanings, 
+        COALESCE(SUM(ss.score), 0) as total_score
+    FROM (
+        SELECT id, played_at
+        FROM synonym_games
+        WHERE user_id = $1 {after}
+        ORDER BY played_at DESC, id DESC
+        LIMIT $2
+    ) sg
+    LEFT JOIN synonym_scores ss ON sg.id = ss.game_id
+    GROUP BY sg.id, sg.played_at
+    ORDER BY sg.played_at DESC, sg.id DESC
+"""
+GAMES_AFTER = "AND (played_at, id) < ($3, $4)"
+
+@traced
+@read_only
+@user_scoped
+async def get_game_history_page(user_id, limit=pagination.DEFAULT_PAGE_SIZE, cursor=None):
+    """Get one page of a user's game history and the cursor of the next page"""
+    try:
+        args = [int(user_id), limit + 1]
+        if cursor:
+            args.extend(pagination.decode_cursor(cursor))
+        games = await database.fetch(GAMES_PAGE_SQL.format(after=GAMES_AFTER if cursor else ''), *args)
+        return pagination.page([history_item(game) for game in games], limit, 'played_at')
+        
+    except Exception as e:
+        logger.error(f"Error getting game history page: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_game_details(game_id):
+    """Get detailed information about a specific game"""
+    try:
+        # Get game details and its rounds
+        game_record, rounds = await database.gather(
+            database.fetchrow("""
+                SELECT id, user_id, played_at
+                FROM synonym_games
+                WHERE id = $1
+            """, int(game_id)),
+            database.fetch("""
+                SELECT subgame_order, meaning, score
+                FROM synonym_scores
+                WHERE game_id = $1
+                ORDER BY subgame_order, id
+            """, int(game_id)))
+        if not game_record:
+            return None
+        
+        # Group scores by subgame_order
+        round_dict = {}
+        for subgame_order, meaning, score in rounds:
+            if subgame_order not in round_dict:
+                round_dict[subgame_order] = {
+                    'subgame_order': subgame_order,
+                    'scores': []
+                }
+            round_dict[subgame_order]['scores'].append({
+                'meaning': meaning,
+                'score': float(score)
+            })
+        
+        return dict(game_record, rounds=list(round_dict.values()))
+        
+    except Exception as e:
+        logger.error(f"Error getting game details: {e}")
+        return None
@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timezone
+from manager import user_progress_manager
+from manager.aio import database
+from manager.aio.statements import statement
+from manager.database_manager import read_only, read_write, user_scoped
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ACTIVITY_DAYS = user_progress_manager.ACTIVITY_DAYS
+
+# time_taken comes from the client and may be fractional, the column is an INTEGER
+RECORD_PROGRESS = statement('record_progress', user_progress_manager.RECORD_PROGRESS_SQL.format(
+    values="$1, $2, $3, $4, $5, $6::FLOAT8"))
+ACTIVITY = statement('activity', """
+    SELECT activity_date, attempts, correct, score, practice_seconds
+    FROM user_daily_activity
+    WHERE user_id = $1
+    ORDER BY activity_date
+""")
+
+@traced
+@read_write
+@user_scoped
+async def record_progress(user_id, word_id, session_id, level_at_time, is_correct, time_taken):
+    """Record user progress for a word"""
+    try:
+        return await database.fetchrow(RECORD_PROGRESS, int(user_id), int(word_id), session_id,
+                                       level_at_time, is_correct, time_taken)
+        
+    except Exception as e:
+        logger.error(f"Error in record_progress: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_user_weekly_stats(user_id):
+    """Get user statistics for the past week"""
+    try:
+        # Call the PostgreSQL function
+        stats = await database.fetchrow("SELECT * FROM get_user_weekly_stats($1)", int(user_id))
+        
+        # If no stats found, return defaults
+        if not stats:
+            return {
+                'correct_words': 0,
+                'total_words': 0,
+                'accuracy_rate': 0.0,
+                'total_score': 0
+            }
+        
+        return stats
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_weekly_stats: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_user_group_performance(user_id):
+    """Get user performance by word group"""
+    try:
+        return await database.fetch("""
+            SELECT group_id, group_name, total_words_practiced, correct_answers, accuracy_rate, last_practiced
+            FROM user_group_performance
+            WHERE user_id = $1
+            ORDER BY correct_answers DESC
+        """, int(user_id))
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_group_performance: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_or_update_weekly_stats(user_id):
+    """Get or update user statistics for the current week"""
+    # The sync version also reads this week's user_statistics row but returns
+    # the stats from the progress table, so only that query is mirrored
+    return await get_user_weekly_stats(user_id)
+
+@traced
+@read_only
+@user_scoped
+async def get_activity_calendar(user_id, days=ACTIVITY_DAYS):
+    """Get the user's current and longest streaks and their daily activity for the last ``days`` days"""
+    try:
+        rows = await database.fetch(ACTIVITY, int(user_id))
+        return user_progress_manager.activity_summary(rows, datetime.now(timezone.utc).date(), days)
+        
+    except Exception as e:
+        logger.error(f"Error in get_activity_calendar: {e}")
+        raise
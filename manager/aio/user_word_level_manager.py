@@ -0,0 +1,82 @@
+import logging
+from manager.aio import database
+from manager.aio.statements import statement
+from manager.database_manager import read_only, read_write, user_scoped
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USER_WORD_LEVEL = statement('user_word_level', """
+    SELECT id, user_id, word_id, level, last_practiced, created_at
+    FROM user_word_levels 
+    WHERE user_id = $1 AND word_id = $2
+""")
+UPDATE_USER_WORD_LEVEL = statement('update_user_word_level', "SELECT update_user_word_level($1, $2, $3)")
+_WORDS_WITH_LEVELS_SQL = """
+    SELECT w.id as word_id, w.word, w.meaning_en, w.meaning_th,
+            w.part_of_speech, w.difficulty, w.frequency,
+            COALESCE(uwl.level, 0) as level,
+            uwl.last_practiced
+    FROM words w
+    LEFT JOIN user_word_levels uwl ON w.id = uwl.word_id AND uwl.user_id = $1
+"""
+WORDS_WITH_LEVELS_IN_GROUP = statement('words_with_levels_in_group', _WORDS_WITH_LEVELS_SQL + """
+    WHERE w.group_id = $2
+    ORDER BY w.word
+""")
+WORDS_WITH_LEVELS = statement('words_with_levels', _WORDS_WITH_LEVELS_SQL + """
+    ORDER BY w.word
+""")
+
+@traced
+@read_only
+@user_scoped
+async def get_user_word_level(user_id, word_id):
+    """Get user's current level for a word"""
+    try:
+        level = await database.fetchrow(USER_WORD_LEVEL, int(user_id), int(word_id))
+        
+        # If no record exists, return default level 0
+        if not level:
+            return {
+                'user_id': user_id,
+                'word_id': word_id,
+                'level': 0,
+                'last_practiced': None,
+                'created_at': None
+            }
+        
+        return level
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_word_level: {e}")
+        raise
+
+@traced
+@read_write
+@user_scoped
+async def update_user_word_level(user_id, word_id, is_correct):
+    """Update user's level for a word based on correctness"""
+    try:
+        # Call the PostgreSQL function to update the level
+        return await database.fetchval(UPDATE_USER_WORD_LEVEL, int(user_id), int(word_id), bool(is_correct))
+        
+    except Exception as e:
+        logger.error(f"Error in update_user_word_level: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
+async def get_user_words_with_levels(user_id, group_id=None):
+    """Get all words with user's current levels"""
+    try:
+        if group_id:
+            return await database.fetch(WORDS_WITH_LEVELS_IN_GROUP, int(user_id), int(group_id))
+        return await database.fetch(WORDS_WITH_LEVELS, int(user_id))
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_words_with_levels: {e}")
+        raise
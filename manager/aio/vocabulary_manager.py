@@ -0,0 +1,13 @@
+from manager import vocabulary_manager
+from manager.aio import word_manager
+from manager.database_manager import read_only
+from manager.tracing import traced
+
+@traced
+@read_only
+async def get_distractors(correct_word, count, group_id=None):
+    """Get distractor words from the same group with some similarity"""
+    # Use the provided group_id or fallback to the word's group_id
+    target_group_id = group_id if group_id is not None else correct_word['group_id']
+    words_in_group = await word_manager.get_words_by_group(target_group_id)
+    return vocabulary_manager.choose_distractors(correct_word, words_in_group, count)
@@ -0,0 +1,57 @@
+import logging
+from manager import word_store
+from manager.aio import database
+from manager.aio.statements import statement
+from manager.database_manager import read_only
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD_COLUMNS = """id, group_id, word, part_of_speech, meaning_en, meaning_th,
+                    examples, synonyms, antonyms, word_forms, difficulty, frequency,
+                    created_at"""
+WORD_BY_ID = statement('word_by_id', f"""
+    SELECT {WORD_COLUMNS}
+    FROM words 
+    WHERE id = $1
+""")
+WORDS_BY_GROUP = statement('words_by_group', f"""
+    SELECT {WORD_COLUMNS}
+    FROM words 
+    WHERE group_id = $1
+    ORDER BY word
+""")
+
+@traced
+@read_only
+async def get_word_by_id(word_id):
+    """Get word by ID"""
+    try:
+        store = word_store.get_store()
+        if store is not None:
+            word = store.get(word_id)
+            if word is not None:
+                return word
+
+        return await database.fetchrow(WORD_BY_ID, int(word_id))
+        
+    except Exception as e:
+        logger.error(f"Error in get_word_by_id: {e}")
+        raise
+
+@traced
+@read_only
+async def get_words_by_group(group_id):
+    """Get all words in a group"""
+    try:
+        store = word_store.get_store()
+        if store is not None:
+            return store.words_in_group(group_id)
+
+        return await database.fetch(WORDS_BY_GROUP, int(group_id))
+        
+    except Exception as e:
+        logger.error(f"Error in get_words_by_group: {e}")
+        raise
@@ -0,0 +1,70 @@
+import os
+import json
+import hashlib
+import logging
+import mimetypes
+from flask import request, send_from_directory, url_for
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# asset_build_script.py copies the css/ and js/ files under static/ to
+# static/dist/ with a content hash in their names, next to .gz and .br
+# copies, and writes manifest.json mapping source paths to hashed paths
+ASSET_DIRS = ('css', 'js')
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = {}
+
+def hashed_name(path, content):
+    """The fingerprinted name of an asset: css/app.css -> css/app.<hash>.css"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+def load_manifest(static_folder):
+    """Read the manifest of the built assets (empty when they have not been built)"""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def asset_url(path):
+    """URL of the fingerprinted build of a static asset, or of the source file when it is not built"""
+    hashed = _manifest.get(path)
+    if hashed is None:
+        return url_for('static', filename=path)
+    return url_for('asset', filename=hashed)
+
+def init_assets(app):
+    """Serve built assets with immutable caching and expose asset_url to templates"""
+    dist = os.path.join(app.static_folder, DIST_DIR)
+    _manifest.clear()
+    _manifest.update(load_manifest(app.static_folder))
+    if _manifest:
+        logger.info(f"Serving {len(_manifest)} fingerprinted assets from {dist}")
+    else:
+        logger.warning("No built assets found; run asset_build_script.py for cached, compressed assets")
+
+    @app.route(f"{app.static_url_path}/{DIST_DIR}/<path:filename>", endpoint='asset')
+    def asset(filename):
+        # Hashed names change with the content, so a cached copy never goes stale
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(dist, filename + suffix)):
+                response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(dist, filename, mimetype=mimetype)
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.jinja_env.globals['asset_url'] = asset_url
@@ -1,8 +1,17 @@
 import os
+import re
+import time
+import base64
 import logging
+import threading
 from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
 from flask import session
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt as google_jwt
 from manager import user_manager
+from manager.tracing import traced
 
 
 # Configure logging
@@ -26,6 +35,135 @@ def get_google_auth_url(redirect_uri):
     auth_url = f"{google_auth_url}?{urlencode(params)}"
     return auth_url
 
+# Google ID token verification settings
+GOOGLE_CERTS_URL = os.getenv('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+CERTS_DEFAULT_MAX_AGE = 300  # seconds, used when the response has no max-age
+CERTS_REFRESH_MARGIN = 0.1  # refresh in the background in the last 10% of max-age
+CERTS_FETCH_TIMEOUT = float(os.getenv('GOOGLE_CERTS_TIMEOUT', '5'))
+# Minimum seconds between refreshes forced by an unknown key id; tokens with
+# unknown key ids in between are rejected without another fetch
+CERTS_MIN_FORCED_REFRESH_INTERVAL = float(os.getenv('GOOGLE_CERTS_MIN_FORCED_REFRESH', '60'))
+
+_MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+# Pooled HTTP session shared by every certificate fetch
+_http = requests.Session()
+_http.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+_http.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+_certs_lock = threading.Lock()
+_certs = {
+    'keys': {},
+    'fetched_at': 0.0,
+    'expires_at': 0.0,
+    'forced_at': float('-inf'),
+    'refreshing': False
+}
+
+def _jwk_to_pem(jwk):
+    """Convert an RSA JSON Web Key into a PEM public key"""
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives import serialization
+
+    def _b64_int(value):
+        return int.from_bytes(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)), 'big')
+
+    public_key = rsa.RSAPublicNumbers(_b64_int(jwk['e']), _b64_int(jwk['n'])).public_key()
+    return public_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('ascii')
+
+def _fetch_certs():
+    """Fetch Google's signing keys and store them with their Cache-Control lifetime.
+
+    Both the PEM certificate map served by the v1 endpoint and a JWKS document
+    (``{"keys": [...]}``) are accepted, so a local stand-in server can be used.
+    """
+    response = _http.get(GOOGLE_CERTS_URL, timeout=CERTS_FETCH_TIMEOUT)
+    response.raise_for_status()
+    payload = response.json()
+
+    if 'keys' in payload:
+        keys = {jwk['kid']: _jwk_to_pem(jwk) for jwk in payload['keys'] if jwk.get('kty') == 'RSA'}
+    else:
+        keys = payload
+
+    match = _MAX_AGE_PATTERN.search(response.headers.get('Cache-Control', ''))
+    max_age = int(match.group(1)) if match else CERTS_DEFAULT_MAX_AGE
+
+    now = time.monotonic()
+    with _certs_lock:
+        _certs['keys'] = keys
+        _certs['fetched_at'] = now
+        _certs['expires_at'] = now + max_age
+    logger.info(f"Fetched {len(keys)} Google signing keys, cached for {max_age}s")
+    return keys
+
+def _background_refresh():
+    """Refresh the certificate cache without blocking a login"""
+    try:
+        _fetch_certs()
+    except Exception as e:
+        logger.error(f"Error refreshing Google certificates: {e}")
+    finally:
+        with _certs_lock:
+            _certs['refreshing'] = False
+
+def get_google_certs(force_refresh=False):
+    """Get Google's signing keys from the cache, fetching them when expired.
+
+    ``force_refresh`` fetches at most once per CERTS_MIN_FORCED_REFRESH_INTERVAL
+    (counted from the last fetch); otherwise the cached keys are returned.
+    """
+    now = time.monotonic()
+    with _certs_lock:
+        if force_refresh:
+            last = max(_certs['fetched_at'], _certs['forced_at'])
+            force_refresh = now - last >= CERTS_MIN_FORCED_REFRESH_INTERVAL
+            if force_refresh:
+                _certs['forced_at'] = now
+        keys = _certs['keys']
+        expires_at = _certs['expires_at']
+        lifetime = expires_at - _certs['fetched_at']
+        start_refresh = (
+            keys and not force_refresh and now < expires_at
+            and now >= expires_at - lifetime * CERTS_REFRESH_MARGIN
+            and not _certs['refreshing']
+        )
+        if start_refresh:
+            _certs['refreshing'] = True
+
+    if start_refresh:
+        threading.Thread(target=_background_refresh, name='google-certs-refresh', daemon=True).start()
+
+    if force_refresh or not keys or now >= expires_at:
+        return _fetch_certs()
+    return keys
+
+@traced
+def verify_google_id_token(token):
+    """Verify a Google ID token against the cached signing keys and return its claims"""
+    client_id = os.getenv('GOOGLE_CLIENT_ID')
+    certs = get_google_certs()
+    try:
+        claims = google_jwt.decode(token, certs=certs, audience=client_id)
+    except google_exceptions.MalformedError as e:
+        # An unknown key id means Google rotated its keys before our cache
+        # expired, or a forged token; the refresh is throttled against the latter
+        if 'key id' not in str(e):
+            raise
+        certs = get_google_certs(force_refresh=True)
+        claims = google_jwt.decode(token, certs=certs, audience=client_id)
+
+    if claims['iss'] not in GOOGLE_ISSUERS:
+        raise google_exceptions.GoogleAuthError(
+            f"Wrong issuer. 'iss' should be one of the following: {GOOGLE_ISSUERS}"
+        )
+    return claims
+
+@traced
 def handle_google_callback(google_user_data):
     """Handle Google OAuth callback and get or create user"""
     print(google_user_data)
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import select
+import hashlib
+import logging
+import threading
+from datetime import timezone
+from manager import metrics
+from manager import vocabulary_manager
+from manager.database_manager import get_db_connection, use_primary
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a loaded catalog is trusted before it is re-read; a safety net for
+# when the NOTIFY listener is disconnected
+CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', '60'))
+CATALOG_CHANNEL = 'catalog_changed'
+LISTEN_POLL_SECONDS = 5
+LISTEN_MAX_BACKOFF = 60
+
+_lock = threading.Lock()
+_state = {
+    'version': 0,           # local generation, bumped on every invalidation
+    'db_version': None,     # last catalog_state.version seen by the listener
+    'loaded_version': None,
+    'loaded_at': 0.0,
+    'catalog': None,
+    'dirty_groups': set(),  # groups to reload lazily
+    'full_reload': False
+}
+_listener = {'thread': None, 'connected': False}
+
+def get_catalog_version():
+    """Get this process's catalog version"""
+    return _state['version']
+
+def is_listening():
+    """Whether the NOTIFY listener is connected, so invalidations arrive without waiting for a TTL"""
+    return _listener['connected']
+
+def get_db_version():
+    """Get the last catalog_state version seen by the listener (None when it is not running)"""
+    return _state['db_version']
+
+def bump_catalog_version(group_ids=None):
+    """Invalidate cached catalog data after a word or group write.
+
+    With ``group_ids`` only those groups are reloaded on the next read,
+    otherwise the whole catalog is.
+    """
+    with _lock:
+        if group_ids is None:
+            _state['full_reload'] = True
+        else:
+            _state['dirty_groups'].update(group_ids)
+        _state['version'] += 1
+        return _state['version']
+
+def _apply_change(version, group_ids, table, sent_at=None):
+    """Apply a catalog_changed notification (or a catch-up version read after reconnecting)"""
+    with _lock:
+        seen = _state['db_version']
+        if seen is not None and version <= seen:
+            return
+        # A gap means notifications were missed, so the affected groups are unknown
+        missed = seen is None or version != seen + 1
+        _state['db_version'] = version
+    if sent_at is not None:
+        metrics.observe('catalog_invalidation_lag_seconds', max(time.time() - sent_at, 0.0),
+                        'Seconds from a catalog write statement to this worker applying its NOTIFY')
+    metrics.inc('catalog_invalidations_total', 1, 'Catalog change notifications applied', table=table or 'unknown')
+    metrics.set_gauge('catalog_version', version, 'Latest catalog_state version seen by this worker')
+    if table == 'synonyms' and not missed:
+        bump_catalog_version([])
+    else:
+        bump_catalog_version(None if missed else group_ids)
+
+def _listen(conn):
+    cur = conn.cursor()
+    cur.execute(f"LISTEN {CATALOG_CHANNEL}")
+    # Catch up on changes made while disconnected
+    cur.execute("SELECT version FROM catalog_state")
+    row = cur.fetchone()
+    if row is not None and (_state['db_version'] is None or row[0] > _state['db_version']):
+        with _lock:
+            first = _state['db_version'] is None
+            _state['db_version'] = row[0]
+        if not first:
+            bump_catalog_version()
+    _listener['connected'] = True
+    metrics.set_gauge('catalog_listener_connected', 1, 'Whether the catalog NOTIFY listener is connected')
+    logger.info(f"Listening for {CATALOG_CHANNEL} notifications")
+
+    while True:
+        if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+            continue
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                _apply_change(int(payload['version']), payload.get('groups'), payload.get('table'),
+                              payload.get('sent_at'))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring malformed {CATALOG_CHANNEL} payload {notify.payload!r}: {e}")
+
+def _listen_forever():
+    backoff = 1
+    while True:
+        conn = None
+        try:
+            conn = get_db_connection()
+            conn.autocommit = True
+            backoff = 1
+            _listen(conn)
+        except Exception as e:
+            _listener['connected'] = False
+            metrics.set_gauge('catalog_listener_connected', 0, 'Whether the catalog NOTIFY listener is connected')
+            logger.warning(f"Catalog listener disconnected, retrying in {backoff}s: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, LISTEN_MAX_BACKOFF)
+        finally:
+            if conn is not None and not conn.closed:
+                conn.close()
+
+def start_listener():
+    """Start this worker's catalog NOTIFY listener thread (once per process)"""
+    with _lock:
+        thread = _listener['thread']
+        if thread is not None and thread.is_alive():
+            return
+        _listener['thread'] = threading.Thread(target=_listen_forever, name='catalog-listener', daemon=True)
+        _listener['thread'].start()
+
+def _validators(groups, updated_at):
+    # Content hash so every worker hands out the same ETag for the same data
+    payload = json.dumps(groups, sort_keys=True, separators=(',', ':'), default=str)
+    etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    # The catalog's write time also moves on word updates and deletes, which
+    # the groups' created_at columns do not show
+    last_modified = updated_at.astimezone(timezone.utc).replace(microsecond=0) if updated_at else None
+    return etag, last_modified
+
+def _read_groups(group_ids=None):
+    # A replica may not have replayed the change a NOTIFY announced yet, and
+    # what is read here is cached until the next invalidation or the TTL
+    with use_primary():
+        summaries = vocabulary_manager.get_group_summaries(group_ids)
+    groups = []
+    for group in summaries:
+        group = dict(group)
+        group['created_at'] = group['created_at'].isoformat() if group['created_at'] else None
+        group['last_modified'] = group['last_modified'].isoformat() if group['last_modified'] else None
+        groups.append(group)
+    return groups
+
+def _load_catalog(version, previous=None, group_ids=None):
+    """Read group summaries and derive their validators.
+
+    With a previous catalog and ``group_ids`` only those groups are re-read
+    and merged into it.
+    """
+    # Read before the groups, so a write in between moves it past what is cached
+    with use_primary():
+        updated_at = vocabulary_manager.get_catalog_updated_at()
+    if previous is not None and group_ids is not None:
+        groups = [group for group in previous['groups'] if group['id'] not in group_ids]
+        if group_ids:
+            groups.extend(_read_groups(list(group_ids)))
+        groups.sort(key=lambda group: group['name'])
+    else:
+        groups = _read_groups()
+
+    etag, last_modified = _validators(groups, updated_at)
+    return {
+        'version': version,
+        'groups': groups,
+        'etag': etag,
+        'last_modified': last_modified
+    }
+
+def _is_fresh(catalog, now):
+    return (catalog is not None and _state['loaded_version'] == _state['version']
+            and now - _state['loaded_at'] < CATALOG_CACHE_TTL)
+
+@traced
+def get_group_catalog():
+    """Get cached group metadata with word counts, POS breakdowns and validators.
+
+    Returns a dict with ``groups``, ``etag``, ``last_modified`` and ``version``.
+    The database is only read after an invalidation, for the affected groups
+    only when they are known, or when the TTL expired.
+    """
+    now = time.monotonic()
+    catalog = _state['catalog']
+    if _is_fresh(catalog, now):
+        return catalog
+
+    with _lock:
+        # Another thread may have reloaded while we waited for the lock
+        catalog = _state['catalog']
+        if _is_fresh(catalog, now):
+            return catalog
+
+        version = _state['version']
+        expired = now - _state['loaded_at'] >= CATALOG_CACHE_TTL
+        group_ids = None if (_state['full_reload'] or expired) else set(_state['dirty_groups'])
+        try:
+            catalog = _load_catalog(version, catalog, group_ids)
+        except Exception as e:
+            logger.error(f"Error loading group catalog: {e}")
+            if _state['catalog'] is None:
+                raise
+            # Keep serving the stale catalog rather than failing the page
+            return _state['catalog']
+
+        _state['catalog'] = catalog
+        _state['loaded_version'] = version
+        _state['loaded_at'] = time.monotonic() if group_ids is None else _state['loaded_at']
+        _state['dirty_groups'].clear()
+        _state['full_reload'] = False
+        metrics.inc('catalog_reloads_total', 1, 'Catalog reloads by kind',
+                    kind='full' if group_ids is None else 'groups')
+        return catalog
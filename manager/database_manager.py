@@ -1,7 +1,16 @@
 import psycopg2
 import os
+import asyncio
+import time
+import random
+import threading
+import inspect
+import functools
+import contextlib
+import contextvars
 from dotenv import load_dotenv
 import logging
+from manager import tracing
 
 # Load environment variables
 load_dotenv()
@@ -19,11 +28,369 @@ DB_CONFIG = {
     'database': os.getenv('DB_DB')
 }
 
+# Optional routing: PRIMARY_DSN overrides DB_CONFIG, REPLICA_DSNS is a
+# comma-separated list of read replicas used by @read_only functions
+PRIMARY_DSN = os.getenv('PRIMARY_DSN')
+REPLICA_DSNS = [dsn.strip() for dsn in os.getenv('REPLICA_DSNS', '').split(',') if dsn.strip()]
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', '5'))  # seconds
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '2'))  # seconds
+REPLICA_RETRY_INTERVAL = 30  # seconds before retrying a replica that failed to connect
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', '10'))
+
+# Optional sharding: SHARD_DSNS is a comma-separated list of shard databases
+# holding the per-user tables; the primary stays the directory for users,
+# user_shards overrides and the catalog
+SHARD_DSNS = [dsn.strip() for dsn in os.getenv('SHARD_DSNS', '').split(',') if dsn.strip()]
+SHARD_OVERRIDE_TTL = float(os.getenv('SHARD_OVERRIDE_TTL', '5'))  # seconds
+MAX_SHARDS = 16
+SHARD_ID_SPAN = 2 ** 31 // MAX_SHARDS  # per-shard id range of the per-user SERIAL columns
+
+# psycopg2 connection subclass used for new connections (see set_connection_factory)
+_connection_factory = tracing.TracedConnection if tracing.is_enabled() else None
+
+# Route of the innermost @read_only/@read_write function, and whether the
+# current request (or thread, outside requests) has written or must read from the primary
+_route = contextvars.ContextVar('db_route', default=None)
+_wrote = contextvars.ContextVar('db_wrote', default=None)
+_primary_until = contextvars.ContextVar('db_primary_until', default=0.0)
+
+# Shard chosen by the innermost @user_scoped function, and the signed-in user
+# used by per-user functions whose arguments carry no user_id
+_shard = contextvars.ContextVar('db_shard', default=None)
+_current_user = contextvars.ContextVar('db_current_user', default=None)
+
+# user_id -> shard for users moved off their hash shard, reloaded every SHARD_OVERRIDE_TTL
+_overrides = {'loaded_at': float('-inf'), 'shards': {}}
+_overrides_lock = threading.Lock()
+
+# dsn -> {'lag': seconds or None, 'checked_at': monotonic, 'down_until': monotonic}
+_replica_state = {dsn: {'lag': None, 'checked_at': 0.0, 'down_until': 0.0} for dsn in REPLICA_DSNS}
+_replica_lock = threading.Lock()
+
+def set_connection_factory(factory):
+    """Create new connections with a psycopg2 connection subclass; None restores the default"""
+    global _connection_factory
+    _connection_factory = factory or (tracing.TracedConnection if tracing.is_enabled() else None)
+
+def has_replicas():
+    return bool(REPLICA_DSNS)
+
+def _with_route(fn, route):
+    # Coroutine functions (manager/aio) get an async wrapper so the route
+    # stays set while the coroutine runs, not just while it is created
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            token = _enter_route(route)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                if token is not None:
+                    _route.reset(token)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _enter_route(route)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if token is not None:
+                _route.reset(token)
+    return wrapper
+
+def _enter_route(route):
+    if route == 'write':
+        _mark_written()
+    elif _route.get() in ('write', 'primary'):
+        return None
+    return _route.set(route)
+
+def _mark_written():
+    # The flag is a shared list so writes made in child tasks are seen by the request
+    flag = _wrote.get()
+    if flag is None:
+        _wrote.set([True])
+    else:
+        flag[0] = True
+
+def read_only(fn):
+    """Mark a manager function as read-only so its queries may be served by a replica"""
+    return _with_route(fn, 'read')
+
+def read_write(fn):
+    """Mark a manager function as writing; it and later reads in the request use the primary"""
+    return _with_route(fn, 'write')
+
+def begin_request(primary_until=0.0, user_id=None):
+    """Reset routing state for a new request; reads stay on the primary until ``primary_until``"""
+    _wrote.set([False])
+    _primary_until.set(primary_until or 0.0)
+    _current_user.set(user_id)
+
+def is_sharded():
+    return bool(SHARD_DSNS)
+
+def jump_hash(key, buckets):
+    """Jump consistent hash: a stable bucket in [0, buckets) that moves few keys when buckets grow"""
+    key &= 0xFFFFFFFFFFFFFFFF
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+def _shard_overrides():
+    now = time.monotonic()
+    if now - _overrides['loaded_at'] < SHARD_OVERRIDE_TTL:
+        return _overrides['shards']
+    with _overrides_lock:
+        if now - _overrides['loaded_at'] >= SHARD_OVERRIDE_TTL:
+            conn = _connect(PRIMARY_DSN)
+            cur = conn.cursor()
+            cur.execute("SELECT user_id, shard FROM user_shards")
+            _overrides['shards'] = dict(cur.fetchall())
+            cur.close()
+            conn.close()
+            _overrides['loaded_at'] = now
+    return _overrides['shards']
+
+def home_shard(user_id):
+    """The hash shard of a user, ignoring overrides"""
+    return jump_hash(int(user_id), len(SHARD_DSNS))
+
+def shard_for_user(user_id):
+    """The shard holding a user's rows: an override from user_shards or the hash shard"""
+    shard = _shard_overrides().get(int(user_id))
+    return shard if shard is not None else home_shard(user_id)
+
+@contextlib.contextmanager
+def use_shard(shard):
+    """Send connections opened in this block to one shard (for maintenance tools)"""
+    token = _shard.set(shard)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
+
+@contextlib.contextmanager
+def use_primary():
+    """Send reads in this block to the primary without marking the request as written"""
+    token = _route.set('primary')
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+def user_scoped(fn):
+    """Mark a manager function that reads or writes per-user tables.
+
+    With SHARD_DSNS set its connections go to the shard of the ``user_id``
+    argument, or of the signed-in user when the function takes no user_id.
+    """
+    parameters = list(inspect.signature(fn).parameters)
+    position = parameters.index('user_id') if 'user_id' in parameters else None
+
+    def scoped_user(args, kwargs):
+        if 'user_id' in kwargs:
+            user_id = kwargs['user_id']
+        elif position is not None and position < len(args):
+            user_id = args[position]
+        else:
+            user_id = _current_user.get()
+        if user_id is None:
+            raise RuntimeError(f"{fn.__qualname__} needs a user_id to pick a shard")
+        return user_id
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not SHARD_DSNS:
+                return await fn(*args, **kwargs)
+            # The override table may need a (blocking) reload, keep it off the event loop
+            shard = await asyncio.to_thread(shard_for_user, scoped_user(args, kwargs))
+            with use_shard(shard):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not SHARD_DSNS:
+            return fn(*args, **kwargs)
+        with use_shard(shard_for_user(scoped_user(args, kwargs))):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def wrote_in_request():
+    flag = _wrote.get()
+    return bool(flag and flag[0])
+
+def routed_shard():
+    """The shard connections are currently sent to, or None"""
+    return _shard.get()
+
+def reads_from_replica():
+    """Whether a connection opened now may go to a replica"""
+    return bool(REPLICA_DSNS and _route.get() == 'read' and not wrote_in_request()
+                and _primary_until.get() <= time.time())
+
+def _connect(dsn=None):
+    kwargs = {'connection_factory': _connection_factory} if _connection_factory else {}
+    if dsn:
+        return psycopg2.connect(dsn, **kwargs)
+    return psycopg2.connect(**kwargs, **DB_CONFIG)
+
+# Seconds a replica is behind the primary: 0 when its WAL receiver is streaming
+# and it has replayed everything received, NULL (unknown) when the receiver is
+# not streaming, since a disconnected replica looks caught up with itself
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+def _replica_lag(conn):
+    cur = conn.cursor()
+    cur.execute(REPLICA_LAG_SQL)
+    lag = cur.fetchone()[0]
+    cur.close()
+    conn.rollback()
+    return lag
+
+def replica_candidates():
+    """Replicas worth trying, in random order: reachable, and within the lag limit or due a lag check"""
+    now = time.monotonic()
+    with _replica_lock:
+        candidates = [dsn for dsn, state in _replica_state.items()
+                      if state['down_until'] <= now and (replica_within_lag(dsn)
+                                                        or now - state['checked_at'] >= REPLICA_LAG_CHECK_INTERVAL)]
+    random.shuffle(candidates)
+    return candidates
+
+def replica_needs_lag_check(dsn):
+    return time.monotonic() - _replica_state[dsn]['checked_at'] >= REPLICA_LAG_CHECK_INTERVAL
+
+def record_replica_lag(dsn, lag):
+    """Cache a replica's lag in seconds; None means unknown and keeps reads off it"""
+    lag = None if lag is None else float(lag)
+    with _replica_lock:
+        _replica_state[dsn]['lag'], _replica_state[dsn]['checked_at'] = lag, time.monotonic()
+
+def replica_within_lag(dsn):
+    lag = _replica_state[dsn]['lag']
+    return lag is not None and lag <= REPLICA_MAX_LAG
+
+def mark_replica_down(dsn, error):
+    logger.warning(f"Replica unavailable, using another server: {error}")
+    with _replica_lock:
+        _replica_state[dsn]['down_until'] = time.monotonic() + REPLICA_RETRY_INTERVAL
+
+def _replica_connection():
+    """Connect to a random replica within the lag limit, or return None"""
+    for dsn in replica_candidates():
+        try:
+            conn = _connect(dsn)
+        except psycopg2.OperationalError as e:
+            mark_replica_down(dsn, e)
+            continue
+        if replica_needs_lag_check(dsn):
+            record_replica_lag(dsn, _replica_lag(conn))
+        if replica_within_lag(dsn):
+            return conn
+        conn.close()
+    return None
+
+def replica_status():
+    """Return the cached lag and availability of each replica"""
+    now = time.monotonic()
+    with _replica_lock:
+        return [{'replica': i, 'lag': state['lag'], 'available': state['down_until'] <= now}
+                for i, state in enumerate(_replica_state.values())]
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Create and return a database connection.
+
+    Inside a @user_scoped function (or use_shard block) the connection goes
+    to that shard. Inside a @read_only function, with replicas configured and
+    no recent write by this request or user, it goes to a replica whose lag
+    is within REPLICA_MAX_LAG. Otherwise it goes to the primary.
+    """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        shard = _shard.get()
+        if shard is not None:
+            return _connect(SHARD_DSNS[shard])
+        if reads_from_replica():
+            conn = _replica_connection()
+            if conn is not None:
+                return conn
+        conn = _connect(PRIMARY_DSN)
         return conn
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def _copy_escape(value):
+    """Format a Python value as a field of PostgreSQL's COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (list, tuple)):
+        value = _to_pg_array(value)
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    else:
+        value = str(value)
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+def _to_pg_array(values):
+    """Format a list of strings as a PostgreSQL array literal"""
+    items = []
+    for item in values:
+        if item is None:
+            items.append('NULL')
+        else:
+            item = str(item).replace('\\', '\\\\').replace('"', '\\"')
+            items.append(f'"{item}"')
+    return '{' + ','.join(items) + '}'
+
+class _CopySource:
+    """Read-only file-like object that streams COPY text lines to cursor.copy_expert"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+        self.rowcount = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.rowcount += 1
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+def copy_text(cur, table, columns, lines):
+    """Stream lines already in COPY text format (tab-separated, newline-terminated) into a table"""
+    source = _CopySource(lines)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        source,
+        size=65536
+    )
+    return source.rowcount
+
+def copy_rows(cur, table, columns, rows):
+    """Stream an iterable of row tuples into a table with COPY, return the row count"""
+    lines = ('\t'.join(_copy_escape(v) for v in row) + '\n' for row in rows)
+    return copy_text(cur, table, columns, lines)
@@ -0,0 +1,79 @@
+import threading
+from flask import Response
+
+# In-process metrics in the Prometheus text format. With several gunicorn
+# workers each worker reports its own values; scrape them per worker or
+# aggregate in the scraper.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}  # name -> {'type', 'help', 'buckets', 'series': {labels: value}}
+
+def _series(name, kind, help_text, labels, buckets=None):
+    metric = _metrics.get(name)
+    if metric is None:
+        metric = _metrics[name] = {'type': kind, 'help': help_text, 'buckets': buckets, 'series': {}}
+    return metric['series'], tuple(sorted(labels.items()))
+
+def inc(name, value=1, help_text='', **labels):
+    """Add to a counter"""
+    with _lock:
+        series, key = _series(name, 'counter', help_text, labels)
+        series[key] = series.get(key, 0) + value
+
+def set_gauge(name, value, help_text='', **labels):
+    """Set a gauge to a value"""
+    with _lock:
+        series, key = _series(name, 'gauge', help_text, labels)
+        series[key] = value
+
+def observe(name, value, help_text='', buckets=DEFAULT_BUCKETS, **labels):
+    """Record a histogram observation"""
+    with _lock:
+        series, key = _series(name, 'histogram', help_text, labels, buckets)
+        state = series.get(key)
+        if state is None:
+            state = series[key] = {'counts': [0] * len(_metrics[name]['buckets']), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(_metrics[name]['buckets']):
+            if value <= bound:
+                state['counts'][i] += 1
+        state['sum'] += value
+        state['count'] += 1
+
+def get_value(name, **labels):
+    """Current value of a counter or gauge (None when never set)"""
+    with _lock:
+        metric = _metrics.get(name)
+        return metric['series'].get(tuple(sorted(labels.items()))) if metric else None
+
+def _labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + '}'
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for name, metric in sorted(_metrics.items()):
+            if metric['help']:
+                lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric['series'].items()):
+                if metric['type'] != 'histogram':
+                    lines.append(f"{name}{_labels(key)} {value}")
+                    continue
+                for bound, count in zip(metric['buckets'], value['counts']):
+                    lines.append(f"{name}_bucket{_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{_labels(key, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_labels(key)} {value['sum']}")
+                lines.append(f"{name}_count{_labels(key)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """Expose the metrics at /metrics"""
+    @app.route('/metrics')
+    def metrics():
+        return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import hashlib
+import logging
+from manager.database_manager import get_db_connection
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+LOCK_ID = 727_001  # pg_advisory_lock key held while migrating
+
+class MigrationError(Exception):
+    pass
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Return the migration files as dicts ordered by version"""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append({
+            'version': int(match.group(1)),
+            'name': match.group(2),
+            'sql': sql,
+            'checksum': hashlib.sha256(sql.encode('utf-8')).hexdigest(),
+            'transactional': NO_TRANSACTION_MARKER not in sql.splitlines()[:5]
+        })
+    versions = [m['version'] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+def _split_statements(sql):
+    """Split a no-transaction migration into statements (one per ';'-terminated block)"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [s.strip() for s in '\n'.join(lines).split(';') if s.strip()]
+
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            execution_ms INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+def get_applied_versions(cur):
+    """Return {version: checksum} of the migrations recorded in schema_version"""
+    cur.execute("SELECT version, checksum FROM schema_version")
+    return dict(cur.fetchall())
+
+def _invalid_indexes(cur):
+    cur.execute("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid
+    """)
+    return [row[0] for row in cur.fetchall()]
+
+def _record(cur, migration, elapsed_ms):
+    cur.execute("""
+        INSERT INTO schema_version (version, name, checksum, execution_ms)
+        VALUES (%s, %s, %s, %s)
+    """, (migration['version'], migration['name'], migration['checksum'], elapsed_ms))
+
+def _apply(conn, migration):
+    """Run one migration; transactional ones commit atomically with their schema_version row"""
+    start = time.perf_counter()
+    cur = conn.cursor()
+    if migration['transactional']:
+        conn.autocommit = False
+        try:
+            cur.execute(migration['sql'])
+            _record(cur, migration, int((time.perf_counter() - start) * 1000))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.autocommit = True
+    else:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so
+        # each statement runs on its own; they must be safe to re-run
+        for statement in _split_statements(migration['sql']):
+            cur.execute(statement)
+        invalid = _invalid_indexes(cur)
+        if invalid:
+            raise MigrationError(f"Invalid indexes left behind (drop them and re-run): {', '.join(invalid)}")
+        _record(cur, migration, int((time.perf_counter() - start) * 1000))
+    cur.close()
+    return time.perf_counter() - start
+
+def migrate(target=None, baseline=None, dry_run=False, directory=MIGRATIONS_DIR):
+    """Apply pending migrations up to ``target`` and return the versions applied.
+
+    ``baseline`` records migrations up to that version as applied without
+    running them, for databases created from the schema before migrations
+    existed. Checksums of applied migrations must match their files.
+    """
+    migrations = load_migrations(directory)
+    conn = get_db_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_ID,))
+        _ensure_version_table(cur)
+        applied = get_applied_versions(cur)
+
+        for migration in migrations:
+            version = migration['version']
+            if version in applied and applied[version].strip() != migration['checksum']:
+                raise MigrationError(
+                    f"Migration {version:04d}_{migration['name']} was changed after it was applied")
+
+        if baseline is not None:
+            for migration in migrations:
+                if migration['version'] <= baseline and migration['version'] not in applied and not dry_run:
+                    _record(cur, migration, 0)
+                    applied[migration['version']] = migration['checksum']
+                    logger.info(f"Baselined migration {migration['version']:04d}_{migration['name']}")
+
+        done = []
+        for migration in migrations:
+            version = migration['version']
+            if version in applied or (target is not None and version > target):
+                continue
+            label = f"{version:04d}_{migration['name']}"
+            if dry_run:
+                logger.info(f"Pending migration {label}")
+                done.append(version)
+                continue
+            logger.info(f"Applying migration {label}"
+                        f"{'' if migration['transactional'] else ' (no transaction)'}")
+            elapsed = _apply(conn, migration)
+            logger.info(f"Applied migration {label} in {elapsed:.2f}s")
+            done.append(version)
+        return done
+
+    except Exception as e:
+        logger.error(f"Error in migrate: {e}")
+        raise
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_ID,))
+        cur.close()
+        conn.close()
+
+def get_status(directory=MIGRATIONS_DIR):
+    """Return each migration with its applied timestamp (None when pending)"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        _ensure_version_table(cur)
+        cur.execute("SELECT version, applied_at FROM schema_version")
+        applied_at = dict(cur.fetchall())
+        conn.commit()
+        cur.close()
+        conn.close()
+        return [dict(m, applied_at=applied_at.get(m['version'])) for m in load_migrations(directory)]
+
+    except Exception as e:
+        logger.error(f"Error in get_status: {e}")
+        raise
@@ -0,0 +1,36 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+
+# Keyset pagination: a page is read with WHERE (sort_key, id) < (cursor) ORDER BY
+# sort_key DESC, id DESC LIMIT n + 1 on a matching (user_id, sort_key DESC, id DESC)
+# index, so every page costs the same whatever its depth. Cursors are opaque to
+# clients: base64url JSON of the last row's (timestamp, id).
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(timestamp, row_id):
+    """The cursor pointing after a row with this sort timestamp and id"""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """The (timestamp, id) of a cursor; raises ValueError for a malformed cursor"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(payload)
+        timestamp = datetime.fromisoformat(timestamp)
+    except (binascii.Error, TypeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+    if timestamp.tzinfo is None or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return timestamp, row_id
+
+def page(rows, limit, sort_key):
+    """Split the limit + 1 rows of a page query into the page's items and the next cursor (None on the last page)"""
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return {'items': items, 'next_cursor': None}
+    last = items[-1]
+    return {'items': items, 'next_cursor': encode_cursor(last[sort_key], last['id'])}
@@ -4,44 +4,80 @@ from manager import user_word_level_manager
 from manager import word_manager
 from manager import vocabulary_manager
 from manager import user_progress_manager
+from manager.database_manager import read_write
+from manager.records import column
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def select_word(words_with_levels):
+    """Pick the row to practice from get_user_words_with_levels rows, or None"""
+    # Filter to words that have been practiced at least once or are at level 0
+    # For new users, we'll select words at level 0
+    # The levels are read once per row; with Record rows column() reads them at C speed
+    levels = column(words_with_levels, 'level')
+    unpracticed_words = [w for w, level in zip(words_with_levels, levels) if level == 0]
+    practiced_words = [w for w, level in zip(words_with_levels, levels) if level > 0]
+    
+    # Select a word based on our adaptive algorithm:
+    # 1. If user has unpracticed words, select from those first
+    # 2. Otherwise, select based on a weighted distribution favoring lower levels
+    if unpracticed_words:
+        return random.choice(unpracticed_words)
+    elif practiced_words:
+        # Weighted selection - words at lower levels are more likely to be selected
+        # This is a simplified version of the adaptive algorithm
+        levels = [level for level in levels if level > 0]
+        max_level = max(levels) if levels else 0
+        
+        # Create weights that favor lower levels
+        weights = [max_level - level + 1 for level in levels]
+        return random.choices(practiced_words, weights=weights)[0]
+    else:
+        # Fallback - select any word
+        if words_with_levels:
+            return random.choice(words_with_levels)
+        # If no words in database, return error
+        return None
+
+def time_limit_for_level(level):
+    """Seconds allowed to answer at a level (0 = no limit)"""
+    # Level 0: No time limit (represented as 0)
+    # Level 1: 60 seconds
+    # Level 2: 60 seconds
+    # Level 3+: 60 seconds - (level - 2) * 5 seconds
+    if level == 0:
+        return 0  # No time limit
+    elif level in [1, 2]:
+        return 60  # 1 minute
+    else:
+        return max(60 - (level - 2) * 5, 10)  # Minimum 10 seconds
+
+def word_response(word_details, level, choices):
+    """Format a practice word for the API"""
+    return {
+        'word_id': word_details['id'],
+        'word': word_details['word'],
+        'part_of_speech': word_details['part_of_speech'],
+        'meaning_en': word_details['meaning_en'],
+        'meaning_th': word_details['meaning_th'],
+        'level': level,
+        'time_limit': time_limit_for_level(level),  # seconds (0 = no limit)
+        'choices': choices
+    }
+
+@traced
 def get_next_word(user_id, group_id=None):
     """Get the next word for practice based on adaptive difficulty"""
     try:
         # Get user's word levels for the specified group or all words if no group specified
         words_with_levels = user_word_level_manager.get_user_words_with_levels(user_id, group_id)
-        
-        # Filter to words that have been practiced at least once or are at level 0
-        # For new users, we'll select words at level 0
-        unpracticed_words = [w for w in words_with_levels if w['level'] == 0]
-        practiced_words = [w for w in words_with_levels if w['level'] > 0]
-        
-        # Select a word based on our adaptive algorithm:
-        # 1. If user has unpracticed words, select from those first
-        # 2. Otherwise, select based on a weighted distribution favoring lower levels
-        if unpracticed_words:
-            selected_word = random.choice(unpracticed_words)
-        elif practiced_words:
-            # Weighted selection - words at lower levels are more likely to be selected
-            # This is a simplified version of the adaptive algorithm
-            levels = [w['level'] for w in practiced_words]
-            max_level = max(levels) if levels else 0
-            
-            # Create weights that favor lower levels
-            weights = [max_level - w['level'] + 1 for w in practiced_words]
-            selected_word = random.choices(practiced_words, weights=weights)[0]
-        else:
-            # Fallback - select any word
-            if words_with_levels:
-                selected_word = random.choice(words_with_levels)
-            else:
-                # If no words in database, return error
-                return None
+        selected_word = select_word(words_with_levels)
+        if selected_word is None:
+            return None
         
         # Get the word details
         word_details = word_manager.get_word_by_id(selected_word['word_id'])
@@ -49,123 +85,74 @@ def get_next_word(user_id, group_id=None):
         if not word_details:
             return None
         
-        # Determine difficulty level and time limit based on user's level for this word
-        level = selected_word['level']
-        
-        # Calculate time limit based on level
-        # Level 0: No time limit (represented as 0)
-        # Level 1: 60 seconds
-        # Level 2: 60 seconds
-        # Level 3+: 60 seconds - (level - 2) * 5 seconds
-        if level == 0:
-            time_limit = 0  # No time limit
-        elif level in [1, 2]:
-            time_limit = 60  # 1 minute
-        else:
-            time_limit = max(60 - (level - 2) * 5, 10)  # Minimum 10 seconds
-        
         # Generate choices based on level and group
+        level = selected_word['level']
         choices = generate_choices(word_details, level, user_id, group_id)
-        
-        # Format the response
-        word_response = {
-            'word_id': word_details['id'],
-            'word': word_details['word'],
-            'part_of_speech': word_details['part_of_speech'],
-            'meaning_en': word_details['meaning_en'],
-            'meaning_th': word_details['meaning_th'],
-            'level': level,
-            'time_limit': time_limit,  # seconds (0 = no limit)
-            'choices': choices
-        }
-        
-        return word_response
+        return word_response(word_details, level, choices)
         
     except Exception as e:
         logger.error(f"Error getting next word: {e}")
         raise
 
+def build_choices(correct_word, level, distractors):
+    """Multiple choice options for a word at a level, shuffled"""
+    # The first choice is always the correct answer
+    choices = []
+    
+    # Format based on level
+    if level in [0, 1, 2]:
+        # Levels 0-2: Show both English and Thai meanings
+        choices.append({
+            'text_en': correct_word['meaning_en'],
+            'text_th': correct_word['meaning_th'],
+            'is_correct': True
+        })
+        for distractor in distractors:
+            choices.append({
+                'text_en': distractor['meaning_en'],
+                'text_th': distractor['meaning_th'],
+                'is_correct': False
+            })
+    else:
+        # Level 3+: Show only English meanings
+        choices.append({
+            'text_en': correct_word['meaning_en'],
+            'is_correct': True
+        })
+        for distractor in distractors:
+            choices.append({
+                'text_en': distractor['meaning_en'],
+                'is_correct': False
+            })
+    
+    # Shuffle choices
+    random.shuffle(choices)
+    
+    return choices
+
+def fallback_choices(correct_word):
+    """Placeholder choices used when distractors cannot be loaded"""
+    return [
+        {'text_en': correct_word['meaning_en'], 'text_th': correct_word['meaning_th']},
+        {'text_en': 'Incorrect meaning 1', 'text_th': 'ความหมายที่ไม่ถูกต้อง 1'},
+        {'text_en': 'Incorrect meaning 2', 'text_th': 'ความหมายที่ไม่ถูกต้อง 2'},
+        {'text_en': 'Incorrect meaning 3', 'text_th': 'ความหมายที่ไม่ถูกต้อง 3'}
+    ]
+
+@traced
 def generate_choices(correct_word, level, user_id, group_id=None):
     """Generate multiple choice options based on difficulty level"""
     try:
-        # The first choice is always the correct answer
-        choices = []
-        
-        # Format based on level
-        if level == 0:
-            # Level 0: Show both English and Thai meanings, include hints
-            correct_choice = {
-                'text_en': correct_word['meaning_en'],
-                'text_th': correct_word['meaning_th'],
-                'is_correct': True
-            }
-            choices.append(correct_choice)
-            
-            # Add distractors (incorrect choices) from the same group
-            distractors = vocabulary_manager.get_distractors(correct_word, 3, group_id)
-            for distractor in distractors:
-                choices.append({
-                    'text_en': distractor['meaning_en'],
-                    'text_th': distractor['meaning_th'],
-                    'is_correct': False
-                })
-            
-            # Add hints for level 0 (synonyms and antonyms)
-            hints = []
-            if correct_word['synonyms']:
-                hints.extend([f"Synonym: {s}" for s in correct_word['synonyms'][:2]])
-            if correct_word['antonyms']:
-                hints.extend([f"Antonym: {a}" for a in correct_word['antonyms'][:2]])
-            
-        elif level in [1, 2]:
-            # Level 1 & 2: Show both English and Thai meanings
-            correct_choice = {
-                'text_en': correct_word['meaning_en'],
-                'text_th': correct_word['meaning_th'],
-                'is_correct': True
-            }
-            choices.append(correct_choice)
-            
-            # Add distractors from the same group
-            distractors = vocabulary_manager.get_distractors(correct_word, 3, group_id)
-            for distractor in distractors:
-                choices.append({
-                    'text_en': distractor['meaning_en'],
-                    'text_th': distractor['meaning_th'],
-                    'is_correct': False
-                })
-            
-        else:
-            # Level 3+: Show only English meanings
-            correct_choice = {
-                'text_en': correct_word['meaning_en'],
-                'is_correct': True
-            }
-            choices.append(correct_choice)
-            
-            # Add distractors from the same group
-            distractors = vocabulary_manager.get_distractors(correct_word, 3, group_id)
-            for distractor in distractors:
-                choices.append({
-                    'text_en': distractor['meaning_en'],
-                    'is_correct': False
-                })
-        
-        # Shuffle choices
-        random.shuffle(choices)
-        
-        return choices
+        # Distractors (incorrect choices) come from the same group
+        distractors = vocabulary_manager.get_distractors(correct_word, 3, group_id)
+        return build_choices(correct_word, level, distractors)
         
     except Exception as e:
         logger.error(f"Error generating choices: {e}")
         # Fallback to simple choices
-        return [
-            {'text_en': correct_word['meaning_en'], 'text_th': correct_word['meaning_th']},
-            {'text_en': 'Incorrect meaning 1', 'text_th': 'ความหมายที่ไม่ถูกต้อง 1'},
-            {'text_en': 'Incorrect meaning 2', 'text_th': 'ความหมายที่ไม่ถูกต้อง 2'},
-            {'text_en': 'Incorrect meaning 3', 'text_th': 'ความหมายที่ไม่ถูกต้อง 3'}
-        ]
+        return fallback_choices(correct_word)
 
+@traced
 def get_group_name_for_word(word_id):
     """Get the group name for a word"""
     try:
@@ -179,6 +166,20 @@ def get_group_name_for_word(word_id):
         logger.error(f"Error getting group name for word: {e}")
         return None
 
+def answer_result(is_correct, current_level, new_level):
+    """Format the outcome of an answer for the API"""
+    # Calculate points earned (level + 1)
+    points_earned = current_level + 1 if is_correct else 0
+    
+    return {
+        'is_correct': is_correct,
+        'new_level': new_level,
+        'points_earned': points_earned,
+        'feedback': 'Correct!' if is_correct else 'Incorrect. Keep practicing!'
+    }
+
+@traced
+@read_write
 def submit_answer(user_id, word_id, selected_choice_index, correct_choice_index, time_taken, session_id=None):
     """Submit an answer and update user progress"""
     try:
@@ -203,15 +204,7 @@ def submit_answer(user_id, word_id, selected_choice_index, correct_choice_index,
                 time_taken
             )
         
-        # Calculate points earned (level + 1)
-        points_earned = current_level + 1 if is_correct else 0
-        
-        return {
-            'is_correct': is_correct,
-            'new_level': new_level,
-            'points_earned': points_earned,
-            'feedback': 'Correct!' if is_correct else 'Incorrect. Keep practicing!'
-        }
+        return answer_result(is_correct, current_level, new_level)
         
     except Exception as e:
         logger.error(f"Error submitting answer: {e}")
@@ -1,11 +1,16 @@
 import logging
-from manager.database_manager import get_db_connection
+from manager import pagination
+from manager.database_manager import get_db_connection, read_only, read_write, user_scoped
 from psycopg2.extras import RealDictCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced
+@read_write
+@user_scoped
 def create_session(user_id):
     """Create a new practice session"""
     try:
@@ -28,6 +33,9 @@ def create_session(user_id):
         logger.error(f"Error in create_session: {e}")
         raise
 
+@traced
+@read_write
+@user_scoped
 def end_session(session_id, total_score, words_attempted, words_correct):
     """End a practice session"""
     try:
@@ -54,6 +62,9 @@ def end_session(session_id, total_score, words_attempted, words_correct):
         logger.error(f"Error in end_session: {e}")
         raise
 
+@traced
+@read_only
+@user_scoped
 def get_user_sessions(user_id, limit=10):
     """Get recent practice sessions for a user"""
     try:
@@ -75,4 +86,36 @@ def get_user_sessions(user_id, limit=10):
         
     except Exception as e:
         logger.error(f"Error in get_user_sessions: {e}")
+        raise
+
+# Keyset page of a user's sessions, newest first; with a cursor the page
+# continues after the (start_time, id) it encodes
+SESSIONS_PAGE_SQL = """
+    SELECT id, user_id, start_time, end_time, total_score, words_attempted, words_correct
+    FROM practice_sessions
+    WHERE user_id = %(user_id)s {after}
+    ORDER BY start_time DESC, id DESC
+    LIMIT %(limit)s
+"""
+SESSIONS_AFTER = "AND (start_time, id) < (%(after_time)s, %(after_id)s)"
+
+@traced
+@read_only
+@user_scoped
+def get_user_sessions_page(user_id, limit=pagination.DEFAULT_PAGE_SIZE, cursor=None):
+    """Get one page of a user's practice sessions and the cursor of the next page"""
+    try:
+        params = {'user_id': user_id, 'limit': limit + 1}
+        if cursor:
+            params['after_time'], params['after_id'] = pagination.decode_cursor(cursor)
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(SESSIONS_PAGE_SQL.format(after=SESSIONS_AFTER if cursor else ''), params)
+        sessions = cur.fetchall()
+        cur.close()
+        conn.close()
+        return pagination.page(sessions, limit, 'start_time')
+        
+    except Exception as e:
+        logger.error(f"Error in get_user_sessions_page: {e}")
         raise
\ No newline at end of file
@@ -0,0 +1,136 @@
+from collections import namedtuple
+from collections.abc import Mapping
+from operator import attrgetter, itemgetter
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extensions import cursor as _cursor
+
+# Compact rows for large result sets. A Record is a namedtuple (no per-row dict
+# or key strings) that also reads like the RealDictRow it replaces:
+# row['word'], row.word, row.get('word'), 'word' in row, dict(row).
+# row.word is namedtuple's C-level field getter. row['word'] and row.get run
+# in Python (~300ns), so loops over many rows read a column with column().
+_RESERVED = frozenset(('get', 'keys', 'values', 'items', 'count', 'index'))
+_types = {}
+
+class Record(tuple):
+    """Mapping-style access mixed into the namedtuple types made by record_type"""
+
+    __slots__ = ()
+    _columns = ()
+    _positions = {}
+    # Build from one sequence of values, as cursors hand rows over, not namedtuple's one argument per field
+    __new__ = tuple.__new__
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._positions[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def get(self, key, default=None):
+        position = self._positions.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def keys(self):
+        return self._columns
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._columns, self)
+
+    def _asdict(self):
+        return dict(zip(self._columns, self))
+
+    def __repr__(self):
+        return 'Record(' + ', '.join(f"{column}={value!r}" for column, value in zip(self._columns, self)) + ')'
+
+def _attribute(position, column):
+    # Columns that are not identifiers, start with _ or shadow a Record method
+    # are only reachable by key
+    if column.isidentifier() and not column.startswith('_') and column not in _RESERVED:
+        return column
+    return f"_{position}"
+
+def record_type(columns):
+    """The Record namedtuple type for a tuple of column names (cached)"""
+    columns = tuple(columns)
+    cls = _types.get(columns)
+    if cls is None:
+        base = namedtuple('RecordBase', [_attribute(i, c) for i, c in enumerate(columns)], rename=True)
+        namespace = {'__slots__': (), '_columns': columns, '_positions': {c: i for i, c in enumerate(columns)}}
+        cls = _types[columns] = type('Record', (Record, base), namespace)
+    return cls
+
+def column(rows, name):
+    """The values of one column of a list of rows, read at C speed.
+
+    Works on Records, dicts and asyncpg rows alike.
+    """
+    if not rows:
+        return []
+    first = rows[0]
+    if isinstance(first, Record):
+        # _fields holds the namedtuple attribute name of each column
+        return list(map(attrgetter(first._fields[first._positions[name]]), rows))
+    return list(map(itemgetter(name), rows))
+
+class RecordCursor(_cursor):
+    """Cursor returning Record rows instead of RealDictRow dicts"""
+
+    def _record_type(self):
+        return record_type(column.name for column in self.description)
+
+    def fetchone(self):
+        row = super().fetchone()
+        return None if row is None else self._record_type()(row)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        return list(map(self._record_type(), rows)) if rows else rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        return list(map(self._record_type(), rows)) if rows else rows
+
+    def __iter__(self):
+        rows = super().__iter__()
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        cls = self._record_type()
+        yield cls(row)
+        for row in rows:
+            yield cls(row)
+
+def _plain(value):
+    # json would write a Record as an array, so turn Records into dicts first
+    if isinstance(value, Record):
+        return {column: _plain(item) for column, item in zip(value._columns, value)}
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes Records and other mappings (e.g. WordView, asyncpg rows) as objects"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Mapping):
+            return dict(o)
+        if hasattr(o, 'items') and hasattr(o, '__getitem__'):
+            # asyncpg.Record is not a registered Mapping but has the same interface
+            return dict(o.items())
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        return super().dumps(_plain(obj), **kwargs)
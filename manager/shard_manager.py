@@ -0,0 +1,354 @@
+import time
+import logging
+import tempfile
+from manager import database_manager
+from manager import migration_manager
+from manager.database_manager import get_db_connection, use_shard
+from psycopg2.extras import RealDictCursor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-user tables in foreign-key order: (table, rows of one user, merge clause).
+# Merge clauses make a second copy pass pick up rows written during a move.
+PER_USER_TABLES = (
+    ('practice_sessions', "user_id = %(user_id)s",
+     """ON CONFLICT (id) DO UPDATE SET end_time = EXCLUDED.end_time, total_score = EXCLUDED.total_score,
+            words_attempted = EXCLUDED.words_attempted, words_correct = EXCLUDED.words_correct
+        WHERE practice_sessions.end_time IS NULL"""),
+    ('user_progress', "user_id = %(user_id)s", "ON CONFLICT (id) DO NOTHING"),
+    # A day already on the target may have counted answers on both shards; it
+    # is recounted from the target's user_progress, which now holds them all
+    ('user_daily_activity', "user_id = %(user_id)s",
+     """ON CONFLICT (user_id, activity_date) DO UPDATE SET (attempts, correct, score, practice_seconds) = (
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE p.is_correct),
+                   COALESCE(SUM(p.level_at_time + 1) FILTER (WHERE p.is_correct), 0), COALESCE(SUM(p.time_taken), 0)
+            FROM user_progress p
+            WHERE p.user_id = EXCLUDED.user_id
+              AND p.attempted_at >= EXCLUDED.activity_date::timestamp AT TIME ZONE 'UTC'
+              AND p.attempted_at < (EXCLUDED.activity_date + 1)::timestamp AT TIME ZONE 'UTC')"""),
+    ('user_word_levels', "user_id = %(user_id)s",
+     """ON CONFLICT (user_id, word_id) DO UPDATE SET level = EXCLUDED.level, last_practiced = EXCLUDED.last_practiced
+        WHERE EXCLUDED.last_practiced > user_word_levels.last_practiced"""),
+    ('user_statistics', "user_id = %(user_id)s",
+     """ON CONFLICT (user_id, week_start) DO UPDATE SET words_correct = EXCLUDED.words_correct,
+            total_words_practiced = EXCLUDED.total_words_practiced, total_score = EXCLUDED.total_score,
+            updated_at = EXCLUDED.updated_at
+        WHERE EXCLUDED.updated_at > user_statistics.updated_at"""),
+    ('synonym_games', "user_id = %(user_id)s", "ON CONFLICT (id) DO NOTHING"),
+    ('synonym_scores', "game_id IN (SELECT id FROM synonym_games WHERE user_id = %(user_id)s)",
+     "ON CONFLICT (id) DO NOTHING"),
+)
+# Per-user tables keyed by a SERIAL id, and the column that tells whose row an id is
+ID_OWNERS = {'practice_sessions': 'user_id', 'user_progress': 'user_id', 'user_word_levels': 'user_id',
+             'user_statistics': 'user_id', 'synonym_games': 'user_id', 'synonym_scores': 'game_id'}
+# Ids left free above the primary's sequences in the shard whose range they fall
+# in, for rows the primary still creates between --init-shards and the deploy
+PRIMARY_ID_HEADROOM = 10_000_000
+CATALOG_TABLES = ('word_groups', 'words', 'synonyms')
+CATALOG_PUBLICATION = 'catalog_publication'
+USER_COLUMNS = ('id', 'google_id', 'email', 'given_name', 'family_name', 'name', 'picture_url',
+                'created_at', 'last_login')
+
+def _upsert_user(cur, user):
+    cur.execute(f"""
+        INSERT INTO users ({', '.join(USER_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(USER_COLUMNS))})
+        ON CONFLICT (id) DO UPDATE SET email = EXCLUDED.email, name = EXCLUDED.name,
+            given_name = EXCLUDED.given_name, family_name = EXCLUDED.family_name,
+            picture_url = EXCLUDED.picture_url, last_login = EXCLUDED.last_login
+    """, [user[column] for column in USER_COLUMNS])
+
+def ensure_user_on_shard(user, shard=None):
+    """Copy a users row to its shard so per-user rows there can reference it"""
+    try:
+        if shard is None:
+            shard = database_manager.shard_for_user(user['id'])
+        with use_shard(shard):
+            conn = get_db_connection()
+            cur = conn.cursor()
+            _upsert_user(cur, user)
+            conn.commit()
+            cur.close()
+            conn.close()
+
+    except Exception as e:
+        logger.error(f"Error in ensure_user_on_shard: {e}")
+        raise
+
+def _get_user(user_id):
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE id = %s", (user_id,))
+    user = cur.fetchone()
+    cur.close()
+    conn.close()
+    return user
+
+def current_shard(user_id):
+    """The shard a user is routed to, read from user_shards rather than the cache"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT shard FROM user_shards WHERE user_id = %s", (user_id,))
+    row = cur.fetchone()
+    cur.close()
+    conn.close()
+    return row[0] if row else database_manager.home_shard(user_id)
+
+def _set_override(user_id, shard, pinned=False):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    if shard == database_manager.home_shard(user_id) and not pinned:
+        cur.execute("DELETE FROM user_shards WHERE user_id = %s", (user_id,))
+    else:
+        cur.execute("""
+            INSERT INTO user_shards (user_id, shard, pinned) VALUES (%s, %s, %s)
+            ON CONFLICT (user_id) DO UPDATE
+            SET shard = EXCLUDED.shard, pinned = EXCLUDED.pinned, moved_at = CURRENT_TIMESTAMP
+        """, (user_id, shard, pinned))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def _id_range(shard):
+    return shard * database_manager.SHARD_ID_SPAN + 1, (shard + 1) * database_manager.SHARD_ID_SPAN
+
+def _sequence(cur, table):
+    cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+    return cur.fetchone()[0]
+
+def _check_id_collisions(cur, table, user_id):
+    """Refuse a merge that would overwrite or drop another owner's row with the same id"""
+    owner = ID_OWNERS[table]
+    cur.execute(f"""
+        SELECT m.id FROM shard_move_{table} m JOIN {table} t ON t.id = m.id
+        WHERE t.{owner} IS DISTINCT FROM m.{owner}
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    if row is not None:
+        raise RuntimeError(f"{table} id {row[0]} of user {user_id} is already used on the target shard "
+                           f"by another row; the shard's id range overlaps the source's ids")
+
+def advance_sequences(cur, shard):
+    """Move the shard's sequences past the copied ids that fall in its own range"""
+    low, high = _id_range(shard)
+    for table in ID_OWNERS:
+        sequence = _sequence(cur, table)
+        cur.execute(f"""
+            SELECT setval(%s, GREATEST((SELECT last_value FROM {sequence}),
+                                       (SELECT MAX(id) FROM {table} WHERE id BETWEEN %s AND %s)))
+        """, (sequence, low, high))
+
+def last_ids(cur, shard):
+    """The last id taken in each per-user table's range of a shard, by rows or by its sequence.
+
+    Loaders that write explicit ids continue after these and then call
+    advance_sequences, so the shard never hands the same ids out again.
+    """
+    low, high = _id_range(shard)
+    ids = {}
+    for table in ID_OWNERS:
+        cur.execute(f"""
+            SELECT GREATEST(%s, (SELECT MAX(id) FROM {table} WHERE id BETWEEN %s AND %s),
+                            (SELECT last_value FROM {_sequence(cur, table)}))
+        """, (low - 1, low, high))
+        ids[table] = cur.fetchone()[0]
+    return ids
+
+def _copy_user_rows(user_id, source, target):
+    """Merge one user's per-user rows from ``source`` into ``target`` in one target transaction"""
+    with use_shard(source):
+        source_conn = get_db_connection()
+    with use_shard(target):
+        target_conn = get_db_connection()
+    source_cur = source_conn.cursor()
+    target_cur = target_conn.cursor()
+    copied = {}
+    try:
+        for table, where, merge in PER_USER_TABLES:
+            with tempfile.SpooledTemporaryFile(max_size=64 << 20, mode='w+b') as spool:
+                select = source_cur.mogrify(f"SELECT * FROM {table} WHERE {where}", {'user_id': user_id}).decode()
+                source_cur.copy_expert(f"COPY ({select}) TO STDOUT", spool)
+                spool.seek(0)
+                target_cur.execute(f"CREATE TEMP TABLE shard_move_{table} (LIKE {table}) ON COMMIT DROP")
+                target_cur.copy_expert(f"COPY shard_move_{table} FROM STDIN", spool)
+                if table in ID_OWNERS:
+                    _check_id_collisions(target_cur, table, user_id)
+                target_cur.execute(f"INSERT INTO {table} SELECT * FROM shard_move_{table} {merge}")
+                copied[table] = target_cur.rowcount
+        target_conn.commit()
+        # setval is not transactional, so it follows the commit of the rows it covers
+        advance_sequences(target_cur, target)
+        target_conn.commit()
+        return copied
+    except Exception:
+        target_conn.rollback()
+        raise
+    finally:
+        source_cur.close()
+        target_cur.close()
+        source_conn.rollback()
+        source_conn.close()
+        target_conn.close()
+
+def _delete_user_rows(user_id, shard):
+    with use_shard(shard):
+        conn = get_db_connection()
+    cur = conn.cursor()
+    for table, where, _ in reversed(PER_USER_TABLES):
+        cur.execute(f"DELETE FROM {table} WHERE {where}", {'user_id': user_id})
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def move_users(moves, wait=True):
+    """Move users' per-user rows between shards and route them to the new shard.
+
+    ``moves`` is a list of (user_id, source, target); a source of None is
+    the primary (a database that predates sharding). Rows are copied, the
+    routes are switched in user_shards, and after the workers' override
+    caches expire (SHARD_OVERRIDE_TTL) a second pass merges anything written
+    to the old shard before the rows there are deleted.
+    """
+    try:
+        copied = {}
+        for user_id, source, target in moves:
+            if not 0 <= target < len(database_manager.SHARD_DSNS):
+                raise ValueError(f"Shard {target} is not configured")
+            user = _get_user(user_id)
+            if user is None:
+                raise ValueError(f"User {user_id} does not exist")
+            ensure_user_on_shard(user, target)
+            copied[user_id] = _copy_user_rows(user_id, source, target)
+            _set_override(user_id, target)
+
+        if wait and moves:
+            time.sleep(database_manager.SHARD_OVERRIDE_TTL + 1)
+
+        for user_id, source, target in moves:
+            for table, count in _copy_user_rows(user_id, source, target).items():
+                copied[user_id][table] += count
+            _delete_user_rows(user_id, source)
+            logger.info(f"Moved user {user_id} from {'primary' if source is None else f'shard {source}'} "
+                        f"to shard {target}: {copied[user_id]}")
+        return copied
+
+    except Exception as e:
+        logger.error(f"Error in move_users: {e}")
+        raise
+
+def move_user(user_id, to_shard, wait=True):
+    """Move one user from their current shard to ``to_shard``"""
+    from_shard = current_shard(user_id)
+    if from_shard == to_shard:
+        return {}
+    return move_users([(user_id, from_shard, to_shard)], wait)[user_id]
+
+def users_on_shard(shard):
+    """Ids of users with per-user rows on a shard (or on the primary when shard is None)"""
+    with use_shard(shard):
+        conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(" UNION ".join(f"SELECT user_id FROM {table}" for table, where, _ in PER_USER_TABLES
+                               if where.startswith('user_id')))
+    user_ids = sorted(row[0] for row in cur.fetchall())
+    cur.close()
+    conn.close()
+    return user_ids
+
+def misplaced_users():
+    """Return [(user_id, shard holding rows, shard the user belongs on)]; pinned users belong on their hash shard"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT user_id, shard FROM user_shards WHERE NOT pinned")
+    overrides = dict(cur.fetchall())
+    cur.close()
+    conn.close()
+
+    misplaced = []
+    for shard in range(len(database_manager.SHARD_DSNS)):
+        for user_id in users_on_shard(shard):
+            target = overrides.get(user_id, database_manager.home_shard(user_id))
+            if target != shard:
+                misplaced.append((user_id, shard, target))
+    return misplaced
+
+def pin_users(misplaced):
+    """Route misplaced users to the shard that holds their rows until they are moved"""
+    for user_id, shard, _ in misplaced:
+        _set_override(user_id, shard, pinned=True)
+
+def _primary_next_ids():
+    """The next id of each per-user sequence on the primary"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    next_ids = {}
+    for table in ID_OWNERS:
+        cur.execute(f"SELECT last_value + CASE WHEN is_called THEN 1 ELSE 0 END FROM {_sequence(cur, table)}")
+        next_ids[table] = cur.fetchone()[0]
+    cur.close()
+    conn.close()
+    return next_ids
+
+def init_shard(shard, primary_conninfo, primary_next_ids=None):
+    """Migrate a shard, give its per-user sequences their own id range and subscribe it to the catalog.
+
+    Rows moved off the primary keep their ids, so a shard whose range holds
+    the primary's ids starts its sequences PRIMARY_ID_HEADROOM above them.
+    """
+    if primary_next_ids is None:
+        primary_next_ids = _primary_next_ids()
+    with use_shard(shard):
+        migration_manager.migrate()
+        conn = get_db_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+    low, high = _id_range(shard)
+    for table in ID_OWNERS:
+        start = low
+        if low <= primary_next_ids[table] <= high:
+            start = primary_next_ids[table] + PRIMARY_ID_HEADROOM
+        if start > high:
+            raise RuntimeError(f"{table} ids on the primary leave no room in shard {shard}'s id range")
+        sequence = _sequence(cur, table)
+        cur.execute(f"ALTER SEQUENCE {sequence} MAXVALUE {high}")
+        cur.execute(f"""
+            SELECT setval(%s, GREATEST(%s, (SELECT last_value + CASE WHEN is_called THEN 1 ELSE 0 END
+                                            FROM {sequence}),
+                                       (SELECT COALESCE(MAX(id), 0) + 1 FROM {table} WHERE id BETWEEN %s AND %s)),
+                          false)
+        """, (sequence, start, low, high))
+
+    subscription = f"catalog_subscription_{shard}"
+    cur.execute("SELECT 1 FROM pg_subscription WHERE subname = %s", (subscription,))
+    if cur.fetchone() is None:
+        # The synonym seed from the migrations would clash with the initial catalog copy
+        cur.execute("DELETE FROM synonyms")
+        cur.execute(f"""
+            CREATE SUBSCRIPTION {subscription} CONNECTION %s PUBLICATION {CATALOG_PUBLICATION}
+        """, (primary_conninfo,))
+    cur.close()
+    conn.close()
+
+def init_shards(primary_conninfo):
+    """Publish the catalog tables on the primary and initialise every configured shard"""
+    try:
+        conn = get_db_connection()
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM pg_publication WHERE pubname = %s", (CATALOG_PUBLICATION,))
+        if cur.fetchone() is None:
+            cur.execute(f"CREATE PUBLICATION {CATALOG_PUBLICATION} FOR TABLE {', '.join(CATALOG_TABLES)}")
+        cur.close()
+        conn.close()
+
+        primary_next_ids = _primary_next_ids()
+        for shard in range(len(database_manager.SHARD_DSNS)):
+            init_shard(shard, primary_conninfo, primary_next_ids)
+            logger.info(f"Initialised shard {shard}")
+
+    except Exception as e:
+        logger.error(f"Error in init_shards: {e}")
+        raise
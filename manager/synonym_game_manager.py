@@ -1,10 +1,14 @@
 import logging
-from manager.database_manager import get_db_connection
+from manager import pagination
+from manager.database_manager import get_db_connection, read_only, read_write, user_scoped
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced
+@read_only
 def get_random_synonym_pairs(count=2):
     """Get random pairs of synonyms from the database"""
     try:
@@ -47,6 +51,9 @@ def get_random_synonym_pairs(count=2):
         logger.error(f"Error getting random synonym pairs: {e}")
         return []
 
+@traced
+@read_write
+@user_scoped
 def start_new_game(user_id):
     """Start a new synonym game session"""
     try:
@@ -75,6 +82,9 @@ def start_new_game(user_id):
         logger.error(f"Error starting new game: {e}")
         raise
 
+@traced
+@read_write
+@user_scoped
 def record_round_score(game_id, subgame_order, meaning, score):
     """Record the score for a round of the game"""
     try:
@@ -105,6 +115,9 @@ def record_round_score(game_id, subgame_order, meaning, score):
         logger.error(f"Error recording round score: {e}")
         raise
 
+@traced
+@read_only
+@user_scoped
 def get_game_history(user_id, limit=10):
     """Get game history for a user"""
     try:
@@ -130,21 +143,67 @@ def get_game_history(user_id, limit=10):
         cur.close()
         conn.close()
         
-        result = []
-        for game in games:
-            result.append({
-                'id': game[0],
-                'played_at': game[1],
-                'meanings': game[2].split(",") if game[2] else [],
-                'total_score': float(game[3]) if game[3] else 0.0
-            })
-        
-        return result
+        return [history_item(game) for game in games]
         
     except Exception as e:
         logger.error(f"Error getting game history: {e}")
         return []
 
+def history_item(game):
+    """Format an (id, played_at, meanings, total_score) game history row"""
+    game_id, played_at, meanings, total_score = game
+    return {
+        'id': game_id,
+        'played_at': played_at,
+        'meanings': meanings.split(",") if meanings else [],
+        'total_score': float(total_score) if total_score else 0.0
+    }
+
+# Keyset page of a user's games, newest first. The page of games is picked
+# on the (user_id, played_at, id) index before their scores are joined.
+GAMES_PAGE_SQL = """
+    SELECT 
+        sg.id,
+        sg.played_at,
+        string_agg(ss.meaning, ', '), 
+        COALESCE(SUM(ss.score), 0) as total_score
+    FROM (
+        SELECT id, played_at
+        FROM synonym_games
+        WHERE user_id = %(user_id)s {after}
+        ORDER BY played_at DESC, id DESC
+        LIMIT %(limit)s
+    ) sg
+    LEFT JOIN synonym_scores ss ON sg.id = ss.game_id
+    GROUP BY sg.id, sg.played_at
+    ORDER BY sg.played_at DESC, sg.id DESC
+"""
+GAMES_AFTER = "AND (played_at, id) < (%(after_time)s, %(after_id)s)"
+
+@traced
+@read_only
+@user_scoped
+def get_game_history_page(user_id, limit=pagination.DEFAULT_PAGE_SIZE, cursor=None):
+    """Get one page of a user's game history and the cursor of the next page"""
+    try:
+        params = {'user_id': user_id, 'limit': limit + 1}
+        if cursor:
+            params['after_time'], params['after_id'] = pagination.decode_cursor(cursor)
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(GAMES_PAGE_SQL.format(after=GAMES_AFTER if cursor else ''), params)
+        games = [history_item(game) for game in cur.fetchall()]
+        cur.close()
+        conn.close()
+        return pagination.page(games, limit, 'played_at')
+        
+    except Exception as e:
+        logger.error(f"Error getting game history page: {e}")
+        raise
+
+@traced
+@read_only
+@user_scoped
 def get_game_details(game_id):
     """Get detailed information about a specific game"""
     try:
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import queue
+import secrets
+import inspect
+import logging
+import threading
+import functools
+import contextvars
+import requests
+import psycopg2.extensions
+from flask import g, request
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# TRACE_EXPORT is "file:<path>" for JSON lines or an http(s) URL of a collector
+# (see trace_collector_script.py). Unset disables tracing entirely: @traced
+# returns the function unchanged and no request hooks are registered.
+TRACE_EXPORT = os.getenv('TRACE_EXPORT', '')
+TRACE_HEADER = 'X-Trace-Id'
+EXPORT_BATCH_SIZE = 100
+EXPORT_INTERVAL = 1.0  # seconds between HTTP export flushes
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+def is_enabled():
+    return bool(TRACE_EXPORT)
+
+class Span:
+    """One timed unit of work; DB time and rows are added by the traced cursor"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attributes', 'children',
+                 'start', 'end', 'started_at', 'db_ms', 'db_rows', 'db_queries', 'error')
+
+    def __init__(self, name, parent=None, trace_id=None, attributes=None):
+        self.trace_id = parent.trace_id if parent else (trace_id or secrets.token_hex(16))
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes or {}
+        self.children = []
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.db_ms = 0.0
+        self.db_rows = 0
+        self.db_queries = 0
+        self.error = None
+        if parent:
+            parent.children.append(self)
+
+    def finish(self, error=None):
+        self.end = time.perf_counter()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': round(((self.end or time.perf_counter()) - self.start) * 1000, 3),
+            'db_ms': round(self.db_ms, 3),
+            'db_rows': self.db_rows,
+            'db_queries': self.db_queries,
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+def current_span():
+    return _current_span.get()
+
+def start_span(name, trace_id=None, **attributes):
+    """Start a span as a child of the current one (or a new trace) and make it current"""
+    span = Span(name, _current_span.get(), trace_id, attributes)
+    return span, _current_span.set(span)
+
+def end_span(span, token, error=None):
+    span.finish(error)
+    _current_span.reset(token)
+
+def record_query(ms, rows):
+    """Add one statement's time and rows to the current span (for drivers other than psycopg2)"""
+    span = _current_span.get()
+    if span is not None:
+        span.db_ms += ms
+        span.db_queries += 1
+        span.db_rows += rows
+
+def traced(fn=None, *, name=None):
+    """Record a span for each call of the decorated function while a trace is active.
+
+    Usable as @traced or @traced(name=...). When tracing is disabled the
+    function is returned undecorated.
+    """
+    if fn is None:
+        return functools.partial(traced, name=name)
+    if not is_enabled():
+        return fn
+
+    span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await fn(*args, **kwargs)
+            span, token = start_span(span_name)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                end_span(span, token, e)
+                raise
+            end_span(span, token)
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_span.get() is None:
+            return fn(*args, **kwargs)
+        span, token = start_span(span_name)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            end_span(span, token, e)
+            raise
+        end_span(span, token)
+        return result
+    return wrapper
+
+class _TracedCursor:
+    """Cursor proxy that adds statement time and row counts to the current span"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, *args, **kwargs):
+        span = _current_span.get()
+        if span is None:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            span.db_ms += (time.perf_counter() - start) * 1000
+            span.db_queries += 1
+            span.db_rows += max(self._cursor.rowcount, 0)
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, *args, **kwargs)
+
+    def copy_expert(self, *args, **kwargs):
+        return self._timed(self._cursor.copy_expert, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+class TracedConnection(psycopg2.extensions.connection):
+    """Connection whose cursors report DB time and rows to the active span"""
+
+    def cursor(self, *args, **kwargs):
+        cursor = super().cursor(*args, **kwargs)
+        return _TracedCursor(cursor) if _current_span.get() is not None else cursor
+
+class _Exporter:
+    """Write finished traces as JSON lines to a file or POST them in batches to a collector"""
+
+    def __init__(self, target):
+        self.target = target
+        self.lock = threading.Lock()
+        self.queue = None
+        if not target.startswith('file:'):
+            self.queue = queue.Queue(maxsize=10_000)
+            threading.Thread(target=self._post_loop, name='trace-exporter', daemon=True).start()
+
+    def export(self, spans):
+        records = [span.to_dict() for span in spans]
+        if self.queue is None:
+            with self.lock, open(self.target[len('file:'):], 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + '\n')
+            return
+        for record in records:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                logger.warning("Trace export queue is full; dropping spans")
+                return
+
+    def _post_loop(self):
+        http = requests.Session()
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL
+            while len(batch) < EXPORT_BATCH_SIZE and time.monotonic() < deadline:
+                try:
+                    batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                http.post(self.target, json={'spans': batch}, timeout=5)
+            except requests.RequestException as e:
+                logger.warning(f"Error exporting {len(batch)} spans: {e}")
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+def export_trace(root):
+    """Export a finished root span and all of its descendants, root last"""
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _Exporter(TRACE_EXPORT)
+    _exporter.export(list(root.walk())[::-1])
+
+def init_tracing(app):
+    """Open a root span per request named after its view and return its id in X-Trace-Id"""
+    if not is_enabled():
+        return
+
+    @app.before_request
+    def _start_request_span():
+        incoming = request.headers.get(TRACE_HEADER, '')
+        trace_id = incoming if len(incoming) == 32 and all(c in '0123456789abcdef' for c in incoming) else None
+        g.trace_span, g.trace_token = start_span(request.endpoint or 'unknown', trace_id,
+                                                 method=request.method, path=request.path)
+
+    @app.after_request
+    def _add_trace_header(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.attributes['status'] = response.status_code
+            response.headers[TRACE_HEADER] = span.trace_id
+        return response
+
+    @app.teardown_request
+    def _finish_request_span(exc):
+        span = g.pop('trace_span', None)
+        if span is None:
+            return
+        end_span(span, g.pop('trace_token'), exc)
+        try:
+            export_trace(span)
+        except OSError as e:
+            logger.error(f"Error exporting trace {span.trace_id}: {e}")
+
+    logger.info(f"Request tracing enabled (export={TRACE_EXPORT})")
@@ -1,61 +1,52 @@
 import logging
-from manager.database_manager import get_db_connection
+from manager import database_manager
+from manager import shard_manager
+from manager.database_manager import get_db_connection, read_only, read_write
 from psycopg2.extras import RealDictCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced
+@read_write
 def get_or_create_user(google_id, email, given_name, family_name, name, picture_url):
-    """Get existing user or create a new one"""
+    """Get existing user or create a new one, updating last login in the same statement"""
     try:
+        # Parse name into given_name and family_name for new users
+        if ' ' in name:
+            given_name, family_name = name.rsplit(' ', 1)
+        else:
+            given_name, family_name = name, ''
+
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Check if user exists
         cur.execute("""
-            SELECT id, google_id, email, given_name, family_name, name, picture_url, created_at, last_login
-            FROM users 
-            WHERE google_id = %s
-        """, (google_id,))
+            INSERT INTO users (google_id, email, name, given_name, family_name, picture_url)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (google_id) DO UPDATE
+            SET last_login = CURRENT_TIMESTAMP
+            RETURNING id, google_id, email, name, given_name, family_name, picture_url, created_at, last_login
+        """, (google_id, email, name, given_name, family_name, picture_url))
         
         user = cur.fetchone()
-        
-        if user:
-            # Update last login
-            cur.execute("""
-                UPDATE users 
-                SET last_login = CURRENT_TIMESTAMP 
-                WHERE google_id = %s
-            """, (google_id,))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return user
-        else:
-            # Create new user
-            # Parse name into given_name and family_name if needed
-            if ' ' in name:
-                given_name, family_name = name.rsplit(' ', 1)
-            else:
-                given_name, family_name = name, ''
-                
-            cur.execute("""
-                INSERT INTO users (google_id, email, name, given_name, family_name, picture_url)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id, google_id, email, name, given_name, family_name, picture_url, created_at, last_login
-            """, (google_id, email, name, given_name, family_name, picture_url))
-            
-            user = cur.fetchone()
-            conn.commit()
-            cur.close()
-            conn.close()
-            return user
+        conn.commit()
+        cur.close()
+        conn.close()
+
+        # Per-user rows on the user's shard reference this row
+        if database_manager.is_sharded():
+            shard_manager.ensure_user_on_shard(user)
+        return user
             
     except Exception as e:
         logger.error(f"Error in get_or_create_user: {e}")
         raise
 
+@traced
+@read_only
 def get_user_by_id(user_id):
     """Get user by ID"""
     try:
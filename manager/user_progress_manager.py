@@ -1,23 +1,48 @@
 import logging
-from manager.database_manager import get_db_connection
+from datetime import datetime, timedelta, timezone
+from manager.database_manager import get_db_connection, read_only, read_write, user_scoped
 from psycopg2.extras import RealDictCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ACTIVITY_DAYS = 365
+
+# Inserts the progress row and adds it to the user's user_daily_activity row
+# for the (UTC) day in one statement, so the rollup never drifts from user_progress
+RECORD_PROGRESS_SQL = """
+    WITH progress AS (
+        INSERT INTO user_progress 
+        (user_id, word_id, session_id, level_at_time, is_correct, time_taken)
+        VALUES ({values})
+        RETURNING id, user_id, word_id, session_id, level_at_time, is_correct, time_taken, attempted_at
+    ), activity AS (
+        INSERT INTO user_daily_activity AS a (user_id, activity_date, attempts, correct, score, practice_seconds)
+        SELECT user_id, (attempted_at AT TIME ZONE 'UTC')::date, 1, is_correct::INTEGER,
+               CASE WHEN is_correct THEN level_at_time + 1 ELSE 0 END, COALESCE(time_taken, 0)
+        FROM progress
+        ON CONFLICT (user_id, activity_date) DO UPDATE SET
+            attempts = a.attempts + EXCLUDED.attempts,
+            correct = a.correct + EXCLUDED.correct,
+            score = a.score + EXCLUDED.score,
+            practice_seconds = a.practice_seconds + EXCLUDED.practice_seconds
+    )
+    SELECT * FROM progress
+"""
+
+@traced
+@read_write
+@user_scoped
 def record_progress(user_id, word_id, session_id, level_at_time, is_correct, time_taken):
     """Record user progress for a word"""
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        cur.execute("""
-            INSERT INTO user_progress 
-            (user_id, word_id, session_id, level_at_time, is_correct, time_taken)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id, user_id, word_id, session_id, level_at_time, is_correct, time_taken, attempted_at
-        """, (user_id, word_id, session_id, level_at_time, is_correct, time_taken))
+        cur.execute(RECORD_PROGRESS_SQL.format(values="%s, %s, %s, %s, %s, %s"),
+                    (user_id, word_id, session_id, level_at_time, is_correct, time_taken))
         
         progress = cur.fetchone()
         conn.commit()
@@ -29,6 +54,9 @@ def record_progress(user_id, word_id, session_id, level_at_time, is_correct, tim
         logger.error(f"Error in record_progress: {e}")
         raise
 
+@traced
+@read_only
+@user_scoped
 def get_user_weekly_stats(user_id):
     """Get user statistics for the past week"""
     try:
@@ -59,6 +87,9 @@ def get_user_weekly_stats(user_id):
         logger.error(f"Error in get_user_weekly_stats: {e}")
         raise
 
+@traced
+@read_only
+@user_scoped
 def get_user_group_performance(user_id):
     """Get user performance by word group"""
     try:
@@ -82,6 +113,9 @@ def get_user_group_performance(user_id):
         raise
     
 
+@traced
+@read_only
+@user_scoped
 def get_or_update_weekly_stats(user_id):
     """Get or update user statistics for the current week"""
     try:
@@ -113,4 +147,58 @@ def get_or_update_weekly_stats(user_id):
         
     except Exception as e:
         logger.error(f"Error in get_or_update_weekly_stats: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def activity_summary(rows, today, days=ACTIVITY_DAYS):
+    """Streaks and the last ``days`` days of activity from a user's daily activity rows, oldest first"""
+    longest = run = 0
+    previous = None
+    for row in rows:
+        day = row['activity_date']
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    # A streak stays current until a whole day passes without practice
+    current = run if previous is not None and (today - previous).days <= 1 else 0
+    start = today - timedelta(days=days - 1)
+    calendar = [{
+        'date': row['activity_date'].isoformat(),
+        'attempts': row['attempts'],
+        'correct': row['correct'],
+        'score': row['score'],
+        'practice_seconds': row['practice_seconds']
+    } for row in rows if row['activity_date'] >= start]
+    return {
+        'start': start.isoformat(),
+        'today': today.isoformat(),
+        'current_streak': current,
+        'longest_streak': longest,
+        'active_days': len(calendar),
+        'days': calendar
+    }
+
+@traced
+@read_only
+@user_scoped
+def get_activity_calendar(user_id, days=ACTIVITY_DAYS):
+    """Get the user's current and longest streaks and their daily activity for the last ``days`` days"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # All of the user's days in one range read of the primary key
+        cur.execute("""
+            SELECT activity_date, attempts, correct, score, practice_seconds
+            FROM user_daily_activity
+            WHERE user_id = %s
+            ORDER BY activity_date
+        """, (user_id,))
+        
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        return activity_summary(rows, datetime.now(timezone.utc).date(), days)
+        
+    except Exception as e:
+        logger.error(f"Error in get_activity_calendar: {e}")
+        raise
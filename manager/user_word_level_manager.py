@@ -1,16 +1,21 @@
 import logging
-from manager.database_manager import get_db_connection
+from manager.database_manager import get_db_connection, read_only, read_write, user_scoped
 from psycopg2.extras import RealDictCursor
+from manager.records import RecordCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced
+@read_only
+@user_scoped
 def get_user_word_level(user_id, word_id):
     """Get user's current level for a word"""
     try:
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = conn.cursor(cursor_factory=RecordCursor)
         
         cur.execute("""
             SELECT id, user_id, word_id, level, last_practiced, created_at
@@ -38,6 +43,9 @@ def get_user_word_level(user_id, word_id):
         logger.error(f"Error in get_user_word_level: {e}")
         raise
 
+@traced
+@read_write
+@user_scoped
 def update_user_word_level(user_id, word_id, is_correct):
     """Update user's level for a word based on correctness"""
     try:
@@ -58,11 +66,14 @@ def update_user_word_level(user_id, word_id, is_correct):
         logger.error(f"Error in update_user_word_level: {e}")
         raise
 
+@traced
+@read_only
+@user_scoped
 def get_user_words_with_levels(user_id, group_id=None):
     """Get all words with user's current levels"""
     try:
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = conn.cursor(cursor_factory=RecordCursor)
         
         if group_id:
             cur.execute("""
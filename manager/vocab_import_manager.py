@@ -0,0 +1,266 @@
+import hashlib
+import json
+import logging
+import time
+from manager import catalog_cache
+from manager.database_manager import get_db_connection, copy_rows
+from psycopg2.extras import RealDictCursor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD_COLUMNS = (
+    'group_name', 'word', 'part_of_speech', 'meaning_en', 'meaning_th', 'examples',
+    'synonyms', 'antonyms', 'word_forms', 'difficulty', 'frequency', 'row_hash'
+)
+
+def compute_file_hash(filepath):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compute_row_hash(row):
+    """Return the SHA-256 hex digest of a row tuple (without its hash column)"""
+    payload = json.dumps(row, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def entry_to_row(entry):
+    """Convert a vocabulary entry dict into a tuple in WORD_COLUMNS order"""
+    row = (
+        entry['group_name'],
+        entry['word'],
+        entry['part_of_speech'],
+        entry['meaning_en'],
+        entry['meaning_th'],
+        entry.get('examples') or [],
+        entry.get('synonyms') or [],
+        entry.get('antonyms') or [],
+        entry.get('word_forms') or [],
+        entry.get('difficulty'),
+        entry.get('frequency')
+    )
+    return row + (compute_row_hash(row),)
+
+def get_imported_files():
+    """Get the manifest of previously imported files as {source_path: file_hash}"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            SELECT source_path, file_hash
+            FROM vocab_import_files
+        """)
+
+        files = {row['source_path']: row['file_hash'] for row in cur.fetchall()}
+        cur.close()
+        conn.close()
+        return files
+
+    except Exception as e:
+        logger.error(f"Error in get_imported_files: {e}")
+        raise
+
+def import_words(entries, source_path=None, file_hash=None, prune=False):
+    """Bulk load vocabulary entry dicts (``group_name`` plus the ``words`` columns)"""
+    return import_rows((entry_to_row(entry) for entry in entries),
+                        source_path=source_path, file_hash=file_hash, prune=prune)
+
+def import_rows(rows, source_path=None, file_hash=None, prune=False):
+    """Bulk load vocabulary rows in a single transaction.
+
+    ``rows`` is an iterable of tuples in WORD_COLUMNS order, as produced by
+    ``entry_to_row``; it is consumed lazily so it may be a stream. Rows are
+    streamed into a temporary staging table with COPY, missing groups are
+    created in one statement and the words are merged set-based.
+
+    When ``source_path`` is given the per-row content hashes recorded for that
+    file are compared with the new ones so only added or changed rows are
+    written. Rows that disappeared from the file are deleted when ``prune`` is
+    set, otherwise they are kept in the manifest and reported as removed.
+    """
+    start = time.perf_counter()
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            CREATE TEMP TABLE staging_words (
+                group_name VARCHAR(255) NOT NULL,
+                word TEXT NOT NULL,
+                part_of_speech VARCHAR(50),
+                meaning_en TEXT NOT NULL,
+                meaning_th TEXT NOT NULL,
+                examples TEXT[],
+                synonyms TEXT[],
+                antonyms TEXT[],
+                word_forms TEXT[],
+                difficulty VARCHAR(20),
+                frequency VARCHAR(20),
+                row_hash CHAR(64) NOT NULL,
+                row_order SERIAL
+            ) ON COMMIT DROP
+        """)
+
+        row_count = copy_rows(cur, 'staging_words', WORD_COLUMNS, rows)
+
+        # Later rows for the same (group, word) win, as they would with repeated inserts
+        cur.execute("""
+            CREATE TEMP TABLE staging_latest ON COMMIT DROP AS
+            SELECT DISTINCT ON (s.group_name, s.word) s.*, m.row_hash AS previous_hash
+            FROM staging_words s
+            LEFT JOIN vocab_import_rows m
+                ON m.source_path = %s AND m.group_name = s.group_name AND m.word = s.word
+            ORDER BY s.group_name, s.word, s.row_order DESC
+        """, (source_path,))
+
+        cur.execute("""
+            SELECT COUNT(*) FILTER (WHERE previous_hash IS NULL) AS added,
+                    COUNT(*) FILTER (WHERE previous_hash <> row_hash) AS changed,
+                    COUNT(*) FILTER (WHERE previous_hash = row_hash) AS unchanged
+            FROM staging_latest
+        """)
+        summary = dict(cur.fetchone())
+
+        # Resolve every group referenced by the file in one statement
+        cur.execute("""
+            INSERT INTO word_groups (name)
+            SELECT DISTINCT group_name FROM staging_latest
+            WHERE previous_hash IS DISTINCT FROM row_hash
+            ON CONFLICT (name) DO NOTHING
+        """)
+        groups_created = cur.rowcount
+
+        cur.execute("""
+            INSERT INTO words
+            (group_id, word, part_of_speech, meaning_en, meaning_th, examples,
+                synonyms, antonyms, word_forms, difficulty, frequency)
+            SELECT wg.id, s.word, s.part_of_speech, s.meaning_en, s.meaning_th, s.examples,
+                    s.synonyms, s.antonyms, s.word_forms, s.difficulty, s.frequency
+            FROM staging_latest s
+            JOIN word_groups wg ON wg.name = s.group_name
+            WHERE s.previous_hash IS DISTINCT FROM s.row_hash
+            ON CONFLICT (group_id, word) DO UPDATE
+            SET part_of_speech = EXCLUDED.part_of_speech,
+                meaning_en = EXCLUDED.meaning_en,
+                meaning_th = EXCLUDED.meaning_th,
+                examples = EXCLUDED.examples,
+                synonyms = EXCLUDED.synonyms,
+                antonyms = EXCLUDED.antonyms,
+                word_forms = EXCLUDED.word_forms,
+                difficulty = EXCLUDED.difficulty,
+                frequency = EXCLUDED.frequency
+        """)
+        words_merged = cur.rowcount
+
+        summary['removed'] = 0
+        summary['deleted'] = 0
+        if source_path is not None:
+            cur.execute("""
+                SELECT m.group_name, m.word
+                FROM vocab_import_rows m
+                WHERE m.source_path = %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM staging_latest s
+                    WHERE s.group_name = m.group_name AND s.word = m.word
+                )
+            """, (source_path,))
+            removed = cur.fetchall()
+            summary['removed'] = len(removed)
+
+            if prune and removed:
+                summary['deleted'] = _delete_words(cur, source_path, removed)
+
+            cur.execute("""
+                INSERT INTO vocab_import_files (source_path, file_hash, row_count)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (source_path) DO UPDATE
+                SET file_hash = EXCLUDED.file_hash,
+                    row_count = EXCLUDED.row_count,
+                    imported_at = CURRENT_TIMESTAMP
+            """, (source_path, file_hash or '', row_count))
+
+            cur.execute("""
+                INSERT INTO vocab_import_rows (source_path, group_name, word, row_hash)
+                SELECT %s, group_name, word, row_hash
+                FROM staging_latest
+                WHERE previous_hash IS DISTINCT FROM row_hash
+                ON CONFLICT (source_path, group_name, word) DO UPDATE
+                SET row_hash = EXCLUDED.row_hash
+            """, (source_path,))
+
+        conn.commit()
+        cur.close()
+        conn.close()
+        if groups_created or words_merged or summary['deleted']:
+            catalog_cache.bump_catalog_version()
+
+        elapsed = time.perf_counter() - start
+        summary.update({
+            'rows': row_count,
+            'groups_created': groups_created,
+            'words_merged': words_merged,
+            'seconds': elapsed,
+            'rows_per_second': row_count / elapsed if elapsed > 0 else 0.0
+        })
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error in import_rows: {e}")
+        raise
+
+def remove_file(source_path, prune=False):
+    """Forget an imported file that no longer exists, optionally deleting its words"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            SELECT group_name, word
+            FROM vocab_import_rows
+            WHERE source_path = %s
+        """, (source_path,))
+        removed = cur.fetchall()
+
+        deleted = 0
+        if prune:
+            deleted = _delete_words(cur, source_path, removed)
+            cur.execute("""
+                DELETE FROM vocab_import_files
+                WHERE source_path = %s
+            """, (source_path,))
+
+        conn.commit()
+        cur.close()
+        conn.close()
+        if deleted:
+            catalog_cache.bump_catalog_version()
+        return {'removed': len(removed), 'deleted': deleted}
+
+    except Exception as e:
+        logger.error(f"Error in remove_file: {e}")
+        raise
+
+def _delete_words(cur, source_path, removed):
+    """Delete removed (group_name, word) rows from words and the file's manifest"""
+    group_names = [row['group_name'] for row in removed]
+    words = [row['word'] for row in removed]
+
+    cur.execute("""
+        DELETE FROM words w
+        USING word_groups wg, unnest(%s::text[], %s::text[]) AS r(group_name, word)
+        WHERE w.group_id = wg.id AND wg.name = r.group_name AND w.word = r.word
+    """, (group_names, words))
+    deleted = cur.rowcount
+
+    cur.execute("""
+        DELETE FROM vocab_import_rows m
+        USING unnest(%s::text[], %s::text[]) AS r(group_name, word)
+        WHERE m.source_path = %s AND m.group_name = r.group_name AND m.word = r.word
+    """, (group_names, words, source_path))
+
+    return deleted
@@ -1,20 +1,18 @@
 import logging
 import random
+from manager import catalog_cache
 from manager import word_manager
-from manager.database_manager import get_db_connection
+from manager.database_manager import get_db_connection, read_only, read_write
 from psycopg2.extras import RealDictCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
     
-def get_distractors(correct_word, count, group_id=None):
-    """Get distractor words from the same group with some similarity"""
-    # Use the provided group_id or fallback to the word's group_id
-    target_group_id = group_id if group_id is not None else correct_word['group_id']
-    words_in_group = word_manager.get_words_by_group(target_group_id)
-    
+def choose_distractors(correct_word, words_in_group, count):
+    """Pick distractors for a word from its group's words, preferring the same part of speech"""
     # Remove the correct word from possible distractors
     distractor_candidates = [w for w in words_in_group if w.get('word') != correct_word.get('word')]
     
@@ -39,7 +37,18 @@ def get_distractors(correct_word, count, group_id=None):
         # Fallback if no distractors found
         return []
 
+@traced
+@read_only
+def get_distractors(correct_word, count, group_id=None):
+    """Get distractor words from the same group with some similarity"""
+    # Use the provided group_id or fallback to the word's group_id
+    target_group_id = group_id if group_id is not None else correct_word['group_id']
+    words_in_group = word_manager.get_words_by_group(target_group_id)
+    return choose_distractors(correct_word, words_in_group, count)
+
 # Database-related methods for word groups
+@traced
+@read_write
 def get_or_create_group(name):
     """Get existing group or create a new one in database"""
     try:
@@ -71,12 +80,15 @@ def get_or_create_group(name):
             conn.commit()
             cur.close()
             conn.close()
+            catalog_cache.bump_catalog_version([group['id']])
             return group
             
     except Exception as e:
         logger.error(f"Error in get_or_create_group: {e}")
         raise
 
+@traced
+@read_only
 def get_all_groups():
     """Get all word groups from database"""
     try:
@@ -96,4 +108,62 @@ def get_all_groups():
         
     except Exception as e:
         logger.error(f"Error in get_all_groups: {e}")
+        raise
+
+@traced
+@read_only
+def get_catalog_updated_at():
+    """Get the time of the last write to words, word_groups or synonyms (catalog_state.updated_at)"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        
+        cur.execute("SELECT updated_at FROM catalog_state")
+        
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+        return row[0] if row else None
+        
+    except Exception as e:
+        logger.error(f"Error in get_catalog_updated_at: {e}")
+        raise
+
+@traced
+@read_only
+def get_group_summaries(group_ids=None):
+    """Get word groups (all, or only ``group_ids``) with word counts and part-of-speech breakdowns"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT wg.id, wg.name, wg.created_at,
+                    COALESCE(SUM(p.word_count), 0)::INTEGER AS word_count,
+                    COALESCE(
+                        json_object_agg(p.part_of_speech, p.word_count)
+                            FILTER (WHERE p.part_of_speech IS NOT NULL),
+                        '{}'
+                    ) AS pos_breakdown,
+                    GREATEST(wg.created_at, MAX(p.last_created)) AS last_modified
+            FROM word_groups wg
+            LEFT JOIN (
+                SELECT group_id, COALESCE(part_of_speech, 'Unknown') AS part_of_speech,
+                        COUNT(*) AS word_count, MAX(created_at) AS last_created
+                FROM words
+                WHERE %(group_ids)s::INTEGER[] IS NULL OR group_id = ANY(%(group_ids)s)
+                GROUP BY group_id, COALESCE(part_of_speech, 'Unknown')
+            ) p ON p.group_id = wg.id
+            WHERE %(group_ids)s::INTEGER[] IS NULL OR wg.id = ANY(%(group_ids)s)
+            GROUP BY wg.id, wg.name, wg.created_at
+            ORDER BY wg.name
+        """, {'group_ids': list(group_ids) if group_ids is not None else None})
+        
+        groups = cur.fetchall()
+        cur.close()
+        conn.close()
+        return groups
+        
+    except Exception as e:
+        logger.error(f"Error in get_group_summaries: {e}")
         raise
\ No newline at end of file
@@ -0,0 +1,118 @@
+import os
+import time
+import logging
+import threading
+from flask import jsonify
+from manager import catalog_cache
+from manager import metrics
+from manager import word_search_manager
+from manager import word_store
+from manager.aio import database
+from manager.aio import statements
+# Imported for the hot statements they register
+from manager.aio import practice_session_manager, user_progress_manager, user_word_level_manager, word_manager  # noqa: F401
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# WARMUP=0 skips the warm-up and reports the worker ready at once
+WARMUP_ENABLED = os.getenv('WARMUP', '1') != '0'
+WARMUP_RETRY_SECONDS = float(os.getenv('WARMUP_RETRY_SECONDS', '5'))
+
+_state = {
+    'ready': not WARMUP_ENABLED,
+    'attempts': 0,
+    'phases': {},  # phase -> milliseconds of the last successful run
+    'error': None
+}
+
+def is_ready():
+    return _state['ready']
+
+def status():
+    """Readiness and the timed phases of the last warm-up attempt"""
+    return {
+        'status': 'ready' if _state['ready'] else 'warming',
+        'attempts': _state['attempts'],
+        'phases': dict(_state['phases']),
+        'error': _state['error'],
+        'statement_hit_rates': statements.hit_rates()
+    }
+
+def _warm_database():
+    hot = statements.registered()
+    connections = database.run_sync(database.warm_up(hot))
+    return f"{connections} connections, {len(hot)} statements prepared on each"
+
+def _warm_templates(app):
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return f"{len(names)} templates"
+
+def _warm_catalog():
+    catalog = catalog_cache.get_group_catalog()
+    detail = f"{len(catalog['groups'])} groups"
+    if word_store.get_store() is not None:
+        detail += ", word store mapped"
+    return detail
+
+def _warm_search():
+    index = word_search_manager.get_index()
+    return f"{len(index.docs)} words, {len(index.terms)} terms indexed"
+
+def run_warmup(app):
+    """Run every warm-up phase once, logging and recording how long each took"""
+    _state['attempts'] += 1
+    phases = [
+        ('database', _warm_database),
+        ('templates', lambda: _warm_templates(app)),
+        ('catalog', _warm_catalog),
+        ('search', _warm_search),
+    ]
+    total = time.perf_counter()
+    for name, phase in phases:
+        start = time.perf_counter()
+        try:
+            detail = phase()
+        except Exception as e:
+            _state['error'] = f"{name}: {type(e).__name__}: {e}"
+            raise
+        elapsed = time.perf_counter() - start
+        _state['phases'][name] = round(elapsed * 1000, 1)
+        metrics.set_gauge('warmup_phase_seconds', elapsed, 'Duration of the last successful warm-up phase', phase=name)
+        logger.info(f"Warm-up phase {name}: {elapsed * 1000:.1f}ms ({detail})")
+    elapsed = time.perf_counter() - total
+    _state['error'] = None
+    _state['ready'] = True
+    metrics.set_gauge('worker_ready', 1, 'Whether this worker finished its warm-up')
+    logger.info(f"Warm-up finished in {elapsed * 1000:.1f}ms; worker is ready")
+
+def _warm_until_ready(app):
+    while True:
+        try:
+            run_warmup(app)
+            return
+        except Exception as e:
+            logger.error(f"Error in warm-up, retrying in {WARMUP_RETRY_SECONDS}s: {e}")
+            time.sleep(WARMUP_RETRY_SECONDS)
+
+def init_warmup(app):
+    """Expose /healthz and /readyz and warm the worker up in the background.
+
+    /healthz answers as soon as the process serves requests. /readyz answers
+    503 until the pools are open, hot statements prepared, templates compiled
+    and the catalog loaded, so the load balancer only routes to warm workers.
+    """
+    @app.route('/healthz')
+    def healthz():
+        return jsonify({'status': 'ok'})
+
+    @app.route('/readyz')
+    def readyz():
+        return jsonify(status()), 200 if is_ready() else 503
+
+    metrics.set_gauge('worker_ready', int(is_ready()), 'Whether this worker finished its warm-up')
+    if WARMUP_ENABLED:
+        threading.Thread(target=_warm_until_ready, args=(app,), name='warmup', daemon=True).start()
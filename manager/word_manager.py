@@ -1,11 +1,17 @@
 import logging
-from manager.database_manager import get_db_connection
+from manager import catalog_cache
+from manager import word_store
+from manager.database_manager import get_db_connection, read_only, read_write
 from psycopg2.extras import RealDictCursor
+from manager.records import RecordCursor
+from manager.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced
+@read_write
 def add_word(group_id, word, part_of_speech, meaning_en, meaning_th, 
                 examples=None, synonyms=None, antonyms=None, word_forms=None, 
                 difficulty=None, frequency=None):
@@ -30,15 +36,24 @@ def add_word(group_id, word, part_of_speech, meaning_en, meaning_th,
         conn.commit()
         cur.close()
         conn.close()
+        catalog_cache.bump_catalog_version([group_id])
         return word_record
         
     except Exception as e:
         logger.error(f"Error in add_word: {e}")
         raise
 
+@traced
+@read_only
 def get_word_by_id(word_id):
     """Get word by ID"""
     try:
+        store = word_store.get_store()
+        if store is not None:
+            word = store.get(word_id)
+            if word is not None:
+                return word
+
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
@@ -59,9 +74,15 @@ def get_word_by_id(word_id):
         logger.error(f"Error in get_word_by_id: {e}")
         raise
 
+@traced
+@read_only
 def get_words_by_group(group_id):
     """Get all words in a group"""
     try:
+        store = word_store.get_store()
+        if store is not None:
+            return store.words_in_group(group_id)
+
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
@@ -83,6 +104,32 @@ def get_words_by_group(group_id):
         logger.error(f"Error in get_words_by_group: {e}")
         raise
 
+@traced
+@read_only
+def get_all_words():
+    """Get every word with the fields used by the search index"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RecordCursor)
+        
+        cur.execute("""
+            SELECT id, group_id, word, part_of_speech, meaning_en, meaning_th,
+                    synonyms, word_forms
+            FROM words 
+            ORDER BY id
+        """)
+        
+        words = cur.fetchall()
+        cur.close()
+        conn.close()
+        return words
+        
+    except Exception as e:
+        logger.error(f"Error in get_all_words: {e}")
+        raise
+
+@traced
+@read_only
 def get_words_by_level_and_group(level, group_id, limit=None):
     """Get words at a specific level within a group"""
     try:
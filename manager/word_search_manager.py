@@ -0,0 +1,272 @@
+import re
+import time
+import bisect
+import logging
+import threading
+from collections import Counter
+from itertools import chain
+from manager import catalog_cache
+from manager import word_manager
+from manager.database_manager import use_primary
+from manager.tracing import traced
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Match tiers, searched in this order: headwords, then synonyms and word forms, then meanings
+TIER_WORD = 0
+TIER_ALIAS = 1
+TIER_MEANING = 2
+
+SEARCH_MODES = ('auto', 'prefix', 'fuzzy')
+MAX_LIMIT = 50
+
+# Fuzzy matching settings (pg_trgm-style trigram similarity)
+FUZZY_THRESHOLD = 0.3
+FUZZY_MAX_CANDIDATES = 200
+# Candidates come from the rarest query trigrams, up to this many postings in total
+FUZZY_POSTING_BUDGET = 6000
+FUZZY_MIN_TRIGRAM_LISTS = 3
+MIN_MEANING_TOKEN = 3
+
+_TOKEN_SPLIT = re.compile(r"[\s;,/()\"'.!?:]+")
+_ANNOTATION = re.compile(r"\s*\([^)]*\)")
+
+def normalize(text):
+    """Case-fold and collapse whitespace for indexing and lookups"""
+    return ' '.join(str(text).casefold().split())
+
+def trigrams(term):
+    """Get the pg_trgm-style trigram set of a term"""
+    padded = f"  {term} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def _tokens(text, min_length=1):
+    """Split text into normalized tokens"""
+    return [t for t in _TOKEN_SPLIT.split(normalize(text)) if len(t) >= min_length]
+
+def _entry_terms(word):
+    """Yield (term, field, tier) for every searchable value of a word"""
+    headword = normalize(word['word'])
+    yield headword, 'word', TIER_WORD
+    for token in _tokens(headword):
+        if token != headword:
+            yield token, 'word', TIER_WORD
+
+    for field in ('synonyms', 'word_forms'):
+        for value in word.get(field) or []:
+            value = normalize(_ANNOTATION.sub('', value))
+            if not value:
+                continue
+            yield value, field, TIER_ALIAS
+            for token in _tokens(value):
+                if token != value:
+                    yield token, field, TIER_ALIAS
+
+    for field in ('meaning_en', 'meaning_th'):
+        for token in _tokens(word.get(field) or '', MIN_MEANING_TOKEN):
+            yield token, field, TIER_MEANING
+
+class SearchIndex:
+    """Immutable in-memory prefix and trigram index over the word catalog"""
+
+    def __init__(self, words, version=None):
+        self.version = version
+        self.docs = []
+        entries = ([], [], [])
+        postings = {}
+
+        for word in words:
+            doc = len(self.docs)
+            self.docs.append((word['id'], word['group_id'], word['word'], word['part_of_speech'],
+                                word['meaning_en'], word['meaning_th']))
+            seen = set()
+            for term, field, tier in _entry_terms(word):
+                if (term, tier) in seen:
+                    continue
+                seen.add((term, tier))
+                entries[tier].append((term, doc, field))
+                postings.setdefault(term, []).append((doc, field, tier))
+
+        self.doc_by_word_id = {doc[0]: i for i, doc in enumerate(self.docs)}
+
+        # Sorted term arrays per tier for bisect-based prefix scans
+        self.prefix_keys = []
+        self.prefix_entries = []
+        for tier_entries in entries:
+            tier_entries.sort()
+            self.prefix_keys.append([term for term, _, _ in tier_entries])
+            self.prefix_entries.append([(doc, field) for _, doc, field in tier_entries])
+
+        # Term dictionary and trigram postings for fuzzy matching
+        self.terms = list(postings)
+        self.term_postings = [postings[term] for term in self.terms]
+        self.term_trigrams = [trigrams(term) for term in self.terms]
+        trigram_postings = {}
+        for term_id, term_trigrams in enumerate(self.term_trigrams):
+            for trigram in term_trigrams:
+                trigram_postings.setdefault(trigram, []).append(term_id)
+        self.trigram_postings = trigram_postings
+
+    def _result(self, doc, field, term, match, score):
+        word_id, group_id, word, part_of_speech, meaning_en, meaning_th = self.docs[doc]
+        return {
+            'word_id': word_id,
+            'group_id': group_id,
+            'word': word,
+            'part_of_speech': part_of_speech,
+            'meaning_en': meaning_en,
+            'meaning_th': meaning_th,
+            'matched_field': field,
+            'matched_term': term,
+            'match': match,
+            'score': round(score, 3)
+        }
+
+    def prefix_search(self, query, limit=10, group_id=None, exclude=None):
+        """Find words with a term starting with the query, headwords first"""
+        query = normalize(query)
+        results = []
+        seen = set(exclude or ())
+        if not query:
+            return results
+
+        for keys, entries in zip(self.prefix_keys, self.prefix_entries):
+            i = bisect.bisect_left(keys, query)
+            while i < len(keys) and keys[i].startswith(query):
+                doc, field = entries[i]
+                if doc not in seen and (group_id is None or self.docs[doc][1] == group_id):
+                    seen.add(doc)
+                    score = len(query) / len(keys[i])
+                    results.append(self._result(doc, field, keys[i], 'prefix', score))
+                    if len(results) >= limit:
+                        return results
+                i += 1
+        return results
+
+    def fuzzy_search(self, query, limit=10, group_id=None, exclude=None):
+        """Find words with a term similar to the query, tolerating typos"""
+        query = normalize(query)
+        if not query:
+            return []
+        query_trigrams = trigrams(query)
+
+        lists = sorted((self.trigram_postings[t] for t in query_trigrams if t in self.trigram_postings),
+                        key=len)
+        selective = []
+        total = 0
+        for postings in lists:
+            if len(selective) >= FUZZY_MIN_TRIGRAM_LISTS and total + len(postings) > FUZZY_POSTING_BUDGET:
+                break
+            selective.append(postings)
+            total += len(postings)
+        counts = Counter(chain.from_iterable(selective))
+
+        scored = []
+        for term_id, _ in counts.most_common(FUZZY_MAX_CANDIDATES):
+            term_trigrams = self.term_trigrams[term_id]
+            shared = len(query_trigrams & term_trigrams)
+            similarity = shared / (len(query_trigrams) + len(term_trigrams) - shared)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((similarity, term_id))
+        scored.sort(key=lambda item: (-item[0], len(self.terms[item[1]])))
+
+        results = []
+        seen = set(exclude or ())
+        for similarity, term_id in scored:
+            term = self.terms[term_id]
+            for doc, field, tier in sorted(self.term_postings[term_id], key=lambda p: p[2]):
+                if doc in seen or (group_id is not None and self.docs[doc][1] != group_id):
+                    continue
+                seen.add(doc)
+                results.append(self._result(doc, field, term, 'fuzzy', similarity))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def search(self, query, mode='auto', limit=10, group_id=None):
+        """Search the catalog; ``auto`` tops up prefix matches with fuzzy ones"""
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        if mode == 'prefix':
+            return self.prefix_search(query, limit, group_id)
+        if mode == 'fuzzy':
+            return self.fuzzy_search(query, limit, group_id)
+
+        results = self.prefix_search(query, limit, group_id)
+        if len(results) < limit:
+            docs = {self.doc_by_word_id[r['word_id']] for r in results}
+            results += self.fuzzy_search(query, limit - len(results), group_id, exclude=docs)
+        return results
+
+# Held by the thread building an index; a background rebuild releases it when done
+_lock = threading.Lock()
+_state = {
+    'index': None,
+    'built_at': 0.0
+}
+
+def build_index(words, version=None):
+    """Build a search index from word dicts (id, group_id, word, part_of_speech, meanings, synonyms, word_forms)"""
+    start = time.perf_counter()
+    index = SearchIndex(words, version)
+    logger.info(f"Built search index over {len(index.docs)} words and {len(index.terms)} terms "
+                f"in {time.perf_counter() - start:.2f}s")
+    return index
+
+def _load_index(version):
+    # Read on the primary: a notified change may not have reached a replica yet
+    with use_primary():
+        words = word_manager.get_all_words()
+    index = build_index(words, version)
+    _state['index'] = index
+    _state['built_at'] = time.monotonic()
+    return index
+
+def _rebuild_in_background(version):
+    try:
+        _load_index(version)
+    except Exception as e:
+        logger.error(f"Error rebuilding search index: {e}")
+    finally:
+        _lock.release()
+
+def _is_stale(index, version):
+    if index.version != version:
+        return True
+    # Without the NOTIFY listener changes are only noticed when the TTL expires
+    return (not catalog_cache.is_listening()
+            and time.monotonic() - _state['built_at'] >= catalog_cache.CATALOG_CACHE_TTL)
+
+def get_index():
+    """Get the search index, starting a rebuild when the catalog version changed.
+
+    The first index is built in the calling thread. Later rebuilds run in a
+    background thread while callers keep using the previous index.
+    """
+    index = _state['index']
+    version = catalog_cache.get_catalog_version()
+    if index is not None and not _is_stale(index, version):
+        return index
+
+    if index is not None:
+        if _lock.acquire(blocking=False):
+            threading.Thread(target=_rebuild_in_background, args=(version,),
+                             name='search-index-rebuild', daemon=True).start()
+        return index
+
+    with _lock:
+        if _state['index'] is not None:
+            return _state['index']
+        return _load_index(version)
+
+@traced
+def search_words(query, mode='auto', limit=10, group_id=None):
+    """Search words by headword, synonyms, word forms and meanings"""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    try:
+        return get_index().search(query, mode, limit, group_id)
+    except Exception as e:
+        logger.error(f"Error in search_words: {e}")
+        raise
@@ -0,0 +1,330 @@
+import os
+import math
+import mmap
+import time
+import fcntl
+import bisect
+import struct
+import logging
+import threading
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from manager import catalog_cache
+from manager import metrics
+from manager.database_manager import get_db_connection
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Memory-mapped snapshot of the words table shared by every worker through the
+# page cache. Disabled unless WORD_STORE_PATH is set.
+WORD_STORE_PATH = os.getenv('WORD_STORE_PATH')
+WORD_STORE_AUTO_BUILD = os.getenv('WORD_STORE_AUTO_BUILD', '1') != '0'
+STAT_INTERVAL = 1.0
+REBUILD_DELAY = 1.0  # coalesce bursts of catalog writes into one rebuild
+
+# File layout (little-endian): header, word ids (int64, ascending), records
+# (fixed width, same order as the ids), record numbers ordered by (group_id,
+# word), group ids (int64, ascending) with their (start, count) ranges in that
+# order, list items (string refs) and the UTF-8 string pool. A string ref is
+# (offset, length) into the pool, a list ref is (first item, count); NULL is
+# a length or count of NULL_REF.
+MAGIC = b'VFCWORDS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIqd8Q')
+RECORD = struct.Struct('<qd20I')
+REF = struct.Struct('<II')
+NULL_REF = 0xFFFFFFFF
+NULL_GROUP = -1
+
+FIELDS = ('id', 'group_id', 'word', 'part_of_speech', 'meaning_en', 'meaning_th', 'examples',
+          'synonyms', 'antonyms', 'word_forms', 'difficulty', 'frequency', 'created_at')
+STRING_FIELDS = ('word', 'part_of_speech', 'meaning_en', 'meaning_th', 'difficulty', 'frequency')
+LIST_FIELDS = ('examples', 'synonyms', 'antonyms', 'word_forms')
+# Position of each field in an unpacked record: group_id, created_at, then refs
+_SLOTS = {'group_id': 0, 'created_at': 1}
+_SLOTS.update({field: 2 + 2 * i for i, field in enumerate(STRING_FIELDS)})
+_SLOTS.update({field: 2 + 2 * (len(STRING_FIELDS) + i) for i, field in enumerate(LIST_FIELDS)})
+
+class WordView(Mapping):
+    """Read-only view of one word in a WordStore, usable like the RealDictRow it replaces.
+
+    Fields are decoded from the mapped file on access; nothing is copied
+    until a caller reads it.
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, field):
+        if field == 'id':
+            return self._store.ids[self._index]
+        if field not in _SLOTS:
+            raise KeyError(field)
+        return self._store.field(self._index, field)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"WordView(id={self['id']}, word={self['word']!r})"
+
+class WordStore:
+    """A memory-mapped word catalog file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.stat = os.fstat(f.fileno())
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, self.catalog_version, self.built_at, ids_at, records_at, by_group_at,
+         group_ids_at, group_count, ranges_at, items_at, strings_at) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.mm.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} word store")
+        view = memoryview(self.mm)
+        self.ids = view[ids_at:ids_at + 8 * self.count].cast('q')
+        self.by_group = view[by_group_at:by_group_at + 4 * self.count].cast('I')
+        self.group_ids = view[group_ids_at:group_ids_at + 8 * group_count].cast('q')
+        self.ranges = view[ranges_at:ranges_at + 8 * group_count].cast('I')
+        self.records_at = records_at
+        self.items_at = items_at
+        self.strings_at = strings_at
+
+    def _string(self, offset, length):
+        if length == NULL_REF:
+            return None
+        start = self.strings_at + offset
+        return self.mm[start:start + length].decode('utf-8')
+
+    def field(self, index, field):
+        """Decode one field of the record at ``index``"""
+        record = RECORD.unpack_from(self.mm, self.records_at + index * RECORD.size)
+        slot = _SLOTS[field]
+        if field == 'group_id':
+            return None if record[0] == NULL_GROUP else record[0]
+        if field == 'created_at':
+            return None if math.isnan(record[1]) else datetime.fromtimestamp(record[1], timezone.utc)
+        if field in LIST_FIELDS:
+            first, count = record[slot], record[slot + 1]
+            if count == NULL_REF:
+                return None
+            return [self._string(*REF.unpack_from(self.mm, self.items_at + (first + i) * REF.size))
+                    for i in range(count)]
+        return self._string(record[slot], record[slot + 1])
+
+    def get(self, word_id):
+        """The word with this id, or None"""
+        word_id = int(word_id)
+        index = bisect.bisect_left(self.ids, word_id)
+        if index < self.count and self.ids[index] == word_id:
+            return WordView(self, index)
+        return None
+
+    def words_in_group(self, group_id):
+        """Views of a group's words ordered by word"""
+        if group_id is None:
+            return []
+        group_id = int(group_id)
+        position = bisect.bisect_left(self.group_ids, group_id)
+        if position == len(self.group_ids) or self.group_ids[position] != group_id:
+            return []
+        start, count = self.ranges[2 * position], self.ranges[2 * position + 1]
+        return [WordView(self, self.by_group[i]) for i in range(start, start + count)]
+
+def _fetch_catalog(conn):
+    """Read the catalog version and every word in one snapshot"""
+    cur = conn.cursor()
+    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    cur.execute("SELECT version FROM catalog_state")
+    row = cur.fetchone()
+    catalog_version = row[0] if row else -1
+    cur.close()
+
+    cur = conn.cursor(name='word_store_build')
+    cur.itersize = 5000
+    cur.execute(f"SELECT {', '.join(FIELDS)} FROM words ORDER BY id")
+    return catalog_version, cur
+
+def build_store(path):
+    """Write a word store snapshot of the words table to ``path`` (atomically replaced)"""
+    try:
+        start = time.perf_counter()
+        conn = get_db_connection()
+        catalog_version, cur = _fetch_catalog(conn)
+
+        strings = {}
+        pool = bytearray()
+        items = bytearray()
+        ids = []
+        records = bytearray()
+        sort_keys = []
+
+        def string_ref(value):
+            if value is None:
+                return 0, NULL_REF
+            ref = strings.get(value)
+            if ref is None:
+                encoded = value.encode('utf-8')
+                ref = strings[value] = (len(pool), len(encoded))
+                pool.extend(encoded)
+            return ref
+
+        for row in cur:
+            row = dict(zip(FIELDS, row))
+            refs = []
+            for field in STRING_FIELDS:
+                refs.extend(string_ref(row[field]))
+            for field in LIST_FIELDS:
+                values = row[field]
+                if values is None:
+                    refs.extend((0, NULL_REF))
+                    continue
+                refs.extend((len(items) // REF.size, len(values)))
+                for value in values:
+                    items.extend(REF.pack(*string_ref(value)))
+            created_at = row['created_at'].timestamp() if row['created_at'] else float('nan')
+            group_id = row['group_id'] if row['group_id'] is not None else NULL_GROUP
+            sort_keys.append((group_id, row['word'], len(ids)))
+            ids.append(row['id'])
+            records.extend(RECORD.pack(group_id, created_at, *refs))
+        cur.close()
+        conn.rollback()
+        conn.close()
+
+        sort_keys.sort()
+        group_ranges = {}
+        for position, (group_id, _, _) in enumerate(sort_keys):
+            first, count = group_ranges.get(group_id, (position, 0))
+            group_ranges[group_id] = (first, count + 1)
+        group_ids = sorted(group_ranges)
+
+        sections = [
+            struct.pack(f'<{len(ids)}q', *ids),
+            bytes(records),
+            struct.pack(f'<{len(sort_keys)}I', *(index for _, _, index in sort_keys)),
+            struct.pack(f'<{len(group_ids)}q', *group_ids),
+            b''.join(REF.pack(*group_ranges[group_id]) for group_id in group_ids),
+            bytes(items),
+            bytes(pool),
+        ]
+        offsets = []
+        position = HEADER.size
+        for section in sections:
+            position += -position % 8
+            offsets.append(position)
+            position += len(section)
+
+        ids_at, records_at, by_group_at, group_ids_at, ranges_at, items_at, strings_at = offsets
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(ids), catalog_version, time.time(), ids_at, records_at,
+                             by_group_at, group_ids_at, len(group_ids), ranges_at, items_at, strings_at)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            for offset, section in zip(offsets, sections):
+                f.write(b'\0' * (offset - f.tell()))
+                f.write(section)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+        summary = {
+            'words': len(ids),
+            'groups': len(group_ids),
+            'strings': len(strings),
+            'bytes': position,
+            'catalog_version': catalog_version,
+            'seconds': time.perf_counter() - start
+        }
+        logger.info(f"Built word store {path}: {summary}")
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error in build_store: {e}")
+        raise
+
+_lock = threading.Lock()
+_state = {
+    'store': None,
+    'checked_at': 0.0,
+    'rebuilding': False
+}
+
+def _reopen_if_replaced(now):
+    _state['checked_at'] = now
+    try:
+        stat = os.stat(WORD_STORE_PATH)
+    except FileNotFoundError:
+        return
+    store = _state['store']
+    if store is not None and (store.stat.st_ino, store.stat.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns):
+        return
+    # Views of the previous mapping keep it alive until they are dropped
+    _state['store'] = WordStore(WORD_STORE_PATH)
+    metrics.set_gauge('word_store_catalog_version', _state['store'].catalog_version,
+                      'catalog_state version the mapped word store was built from')
+    logger.info(f"Mapped word store {WORD_STORE_PATH} ({_state['store'].count} words)")
+
+def _rebuild():
+    time.sleep(REBUILD_DELAY)
+    try:
+        # One worker rebuilds, the others pick up the new file when it is renamed into place
+        with open(f"{WORD_STORE_PATH}.lock", 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            db_version = catalog_cache.get_db_version()
+            try:
+                with open(WORD_STORE_PATH, 'rb') as f:
+                    built_version = HEADER.unpack(f.read(HEADER.size))[3]
+            except (OSError, struct.error):
+                built_version = None
+            if built_version is None or db_version is None or built_version < db_version:
+                build_store(WORD_STORE_PATH)
+    except Exception as e:
+        logger.warning(f"Word store rebuild failed: {e}")
+    finally:
+        _state['rebuilding'] = False
+
+def _schedule_rebuild():
+    with _lock:
+        if _state['rebuilding']:
+            return
+        _state['rebuilding'] = True
+    threading.Thread(target=_rebuild, name='word-store-build', daemon=True).start()
+
+def get_store():
+    """The mapped word store if it is enabled and current, otherwise None (read the database instead)"""
+    if not WORD_STORE_PATH:
+        return None
+    now = time.monotonic()
+    if now - _state['checked_at'] >= STAT_INTERVAL:
+        with _lock:
+            try:
+                _reopen_if_replaced(now)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not map word store {WORD_STORE_PATH}: {e}")
+
+    store = _state['store']
+    if store is None:
+        if WORD_STORE_AUTO_BUILD:
+            _schedule_rebuild()
+        return None
+    # The listener tracks catalog_state.version; without it the snapshot is trusted until replaced
+    db_version = catalog_cache.get_db_version()
+    if db_version is not None and store.catalog_version < db_version:
+        metrics.inc('word_store_stale_reads_total', 1, 'Word reads sent to the database because the store was stale')
+        if WORD_STORE_AUTO_BUILD:
+            _schedule_rebuild()
+        return None
+    return store
@@ -0,0 +1,29 @@
+import argparse
+import sys
+
+from manager import migration_manager
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the versioned schema migrations in migrations/")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--baseline", type=int,
+                        help="mark migrations up to this version as applied without running them "
+                             "(for databases created before migrations existed)")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations only")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.status:
+        for migration in migration_manager.get_status():
+            state = migration['applied_at'].isoformat() if migration['applied_at'] else 'pending'
+            print(f"{migration['version']:04d}_{migration['name']:40} {state}")
+        sys.exit(0)
+
+    try:
+        applied = migration_manager.migrate(args.target, args.baseline, args.dry_run)
+    except migration_manager.MigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    verb = 'pending' if args.dry_run else 'applied'
+    print(f"✅ {len(applied)} migration(s) {verb}" + (f": {', '.join(f'{v:04d}' for v in applied)}" if applied else ''))
@@ -1,11 +1,6 @@
-CREATE TABLE synonyms(
-    id serial,
-    category varchar,
-    meaning varchar,
-    words _text
-);
-
-INSERT INTO synonyms (category, meaning, words) VALUES
+-- Seed the synonym categories used by the synonym game
+INSERT INTO synonyms (category, meaning, words)
+SELECT v.category, v.meaning, v.words::TEXT[] FROM (VALUES
 ('Adjectives for Description and Evaluation','Complex/difficult','{Intricate, convoluted, sophisticated, elaborate, arduous, challenging, demanding, labyrinthine, perplexing, formidable, strenuous, troublesome, daunting, puzzling, baffling, abstruse}'),
 ('Adjectives for Description and Evaluation','Few/scarce','{Paltry, meagre, insufficient, deficient, nominal, rare, sparse, scant, inadequate, lacking, limited, few and far between, negligible, minimal, insubstantial}'),
 ('Adjectives for Description and Evaluation','Hidden/unclear','{Ambiguous, obscure, covert, clandestine, elusive, intangible, inexplicable, enigmatic, vague, cryptic, concealed, veiled, nebulous, arcane, recondite, inscrutable, mysterious}'),
@@ -42,19 +37,6 @@ INSERT INTO synonyms (category, meaning, words) VALUES
 ('Verbs for Analysis and Argument','To increase/grow','{Accelerate, proliferate, escalate, expand, surge, burgeon, augment, multiply, enhance, amplify, swell, climb, soar, skyrocket, accumulate, mushroom, snowball, intensify}'),
 ('Verbs for Analysis and Argument','To reduce/decrease','{Diminish, lessen, mitigate, curb, curtail, alleviate, erode, decline, shrink, dwindle, subside, abate, fall, plummet, compress, contract, downsize, curtail, slacken}'),
 ('Verbs for Analysis and Argument','To show/illustrate','{Demonstrate, indicate, highlight, reveal, exemplify, manifest, underscore, convey, depict, illustrate, portray, elucidate, substantiate, prove, exhibit, display, present, denote, signify}'),
-('Verbs for Analysis and Argument','To state/declare','{Assert, contend, maintain, propose, posit, claim, argue, affirm, profess, articulate, enunciate, pronounce, avow, aver, allege, submit, hold, opine}');
-
-
-CREATE TABLE synonym_games (
-    id serial PRIMARY KEY UNIQUE,
-    user_id int REFERENCING(users.id)NOT NULL,
-    played_at timestamptz NOT NULL DEFAULT NOW()
-);
-
-CREATE TABLE synonym_scores (
-    id serial PRIMARY KEY UNIQUE,
-    game_id int REFERENCING(synonym_games.id),
-    subgame_order int NOT NULL,
-    meaning varchar NOT NULL,
-    score float
-);
+('Verbs for Analysis and Argument','To state/declare','{Assert, contend, maintain, propose, posit, claim, argue, affirm, profess, articulate, enunciate, pronounce, avow, aver, allege, submit, hold, opine}')
+) AS v(category, meaning, words)
+WHERE NOT EXISTS (SELECT 1 FROM synonyms);
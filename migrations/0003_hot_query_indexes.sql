@@ -0,0 +1,20 @@
+-- migrate: no-transaction
+-- Composite indexes for the per-user history and dashboard queries, built
+-- without blocking writes. The single-column user_id indexes they replace
+-- are dropped afterwards since the composites cover the same lookups.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_progress_user_attempted
+    ON user_progress (user_id, attempted_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_synonym_games_user_played
+    ON synonym_games (user_id, played_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_practice_sessions_user_start
+    ON practice_sessions (user_id, start_time DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_synonym_scores_game_id
+    ON synonym_scores (game_id);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_progress_user_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_practice_sessions_user_id;
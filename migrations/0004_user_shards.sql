@@ -0,0 +1,7 @@
+-- Users routed to a shard other than their hash shard (see manager/shard_manager.py)
+CREATE TABLE IF NOT EXISTS user_shards (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    shard INTEGER NOT NULL CHECK (shard >= 0),
+    pinned BOOLEAN NOT NULL DEFAULT FALSE, -- kept in place during a rebalance, not moved there
+    moved_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
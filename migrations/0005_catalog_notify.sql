@@ -0,0 +1,82 @@
+-- Catalog version bumped by every write to words, word_groups or synonyms.
+-- Each write statement also sends NOTIFY catalog_changed with the new version,
+-- the table, the affected group ids (NULL when unknown or too many) and the
+-- send time, so every app worker can invalidate its cached catalog.
+CREATE TABLE IF NOT EXISTS catalog_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO catalog_state (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS TRIGGER AS $$
+DECLARE
+    changed_groups INTEGER[];
+    touched_rows INTEGER;
+    new_version BIGINT;
+BEGIN
+    -- Transition tables hold the rows touched by the statement
+    IF TG_TABLE_NAME = 'words' THEN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(DISTINCT group_id), COUNT(*) INTO changed_groups, touched_rows FROM new_rows;
+        ELSIF TG_OP = 'UPDATE' THEN
+            SELECT array_agg(DISTINCT group_id), COUNT(*) INTO changed_groups, touched_rows
+            FROM (SELECT group_id FROM new_rows UNION ALL SELECT group_id FROM old_rows) r;
+        ELSE
+            SELECT array_agg(DISTINCT group_id), COUNT(*) INTO changed_groups, touched_rows FROM old_rows;
+        END IF;
+    ELSIF TG_TABLE_NAME = 'word_groups' THEN
+        IF TG_OP = 'DELETE' THEN
+            SELECT array_agg(id), COUNT(*) INTO changed_groups, touched_rows FROM old_rows;
+        ELSE
+            SELECT array_agg(id), COUNT(*) INTO changed_groups, touched_rows FROM new_rows;
+        END IF;
+    ELSE
+        IF TG_OP = 'DELETE' THEN
+            SELECT COUNT(*) INTO touched_rows FROM old_rows;
+        ELSE
+            SELECT COUNT(*) INTO touched_rows FROM new_rows;
+        END IF;
+    END IF;
+
+    IF touched_rows = 0 THEN
+        RETURN NULL;
+    END IF;
+    IF array_length(changed_groups, 1) > 500 THEN
+        changed_groups := NULL;  -- keep the payload under NOTIFY's 8000 byte limit
+    END IF;
+
+    UPDATE catalog_state SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    RETURNING version INTO new_version;
+
+    PERFORM pg_notify('catalog_changed', json_build_object(
+        'version', new_version,
+        'table', TG_TABLE_NAME,
+        'groups', changed_groups,
+        'sent_at', EXTRACT(EPOCH FROM clock_timestamp())
+    )::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    catalog_table TEXT;
+BEGIN
+    FOREACH catalog_table IN ARRAY ARRAY['words', 'word_groups', 'synonyms'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_catalog_insert ON %1$s', catalog_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_catalog_update ON %1$s', catalog_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_catalog_delete ON %1$s', catalog_table);
+        EXECUTE format('CREATE TRIGGER %1$s_catalog_insert AFTER INSERT ON %1$s
+                        REFERENCING NEW TABLE AS new_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change()', catalog_table);
+        EXECUTE format('CREATE TRIGGER %1$s_catalog_update AFTER UPDATE ON %1$s
+                        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change()', catalog_table);
+        EXECUTE format('CREATE TRIGGER %1$s_catalog_delete AFTER DELETE ON %1$s
+                        REFERENCING OLD TABLE AS old_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change()', catalog_table);
+    END LOOP;
+END;
+$$;
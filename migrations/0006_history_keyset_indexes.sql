@@ -0,0 +1,15 @@
+-- migrate: no-transaction
+-- Keyset pagination of the session and game history reads
+-- WHERE user_id = ? AND (sort_key, id) < (?, ?) ORDER BY sort_key DESC, id DESC.
+-- With id in the index every page is a single range scan, however deep. The
+-- 0003 indexes on (user_id, sort_key) are prefixes of these and are dropped.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_practice_sessions_user_start_id
+    ON practice_sessions (user_id, start_time DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_synonym_games_user_played_id
+    ON synonym_games (user_id, played_at DESC, id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_practice_sessions_user_start;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_synonym_games_user_played;
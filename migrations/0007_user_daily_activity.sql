@@ -0,0 +1,30 @@
+-- Per-user daily rollup of user_progress for streaks and the activity calendar.
+-- record_progress upserts the day's row in the same statement as the progress
+-- row; days are UTC dates. The backfill recomputes every day from user_progress,
+-- so running it again is harmless.
+
+CREATE TABLE IF NOT EXISTS user_daily_activity (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    activity_date DATE NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    score INTEGER NOT NULL DEFAULT 0,           -- points earned: level at the time + 1 per correct answer
+    practice_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, activity_date)
+);
+
+INSERT INTO user_daily_activity (user_id, activity_date, attempts, correct, score, practice_seconds)
+SELECT user_id,
+       (attempted_at AT TIME ZONE 'UTC')::date,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE is_correct),
+       COALESCE(SUM(level_at_time + 1) FILTER (WHERE is_correct), 0),
+       COALESCE(SUM(time_taken), 0)
+FROM user_progress
+WHERE user_id IS NOT NULL AND attempted_at IS NOT NULL
+GROUP BY user_id, (attempted_at AT TIME ZONE 'UTC')::date
+ON CONFLICT (user_id, activity_date) DO UPDATE SET
+    attempts = EXCLUDED.attempts,
+    correct = EXCLUDED.correct,
+    score = EXCLUDED.score,
+    practice_seconds = EXCLUDED.practice_seconds;
@@ -0,0 +1,16 @@
+-- catalog_state.updated_at is the groups' Last-Modified. notify_catalog_change
+-- sets it to CURRENT_TIMESTAMP, the start time of the writing transaction, so a
+-- long transaction committing after a shorter one could move it backwards and
+-- earn clients a 304 for data they have not seen. Writers take the row lock in
+-- commit order, so the lock holder's clock time never goes backwards.
+
+CREATE OR REPLACE FUNCTION catalog_state_advance_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := GREATEST(OLD.updated_at, clock_timestamp());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS catalog_state_updated_at ON catalog_state;
+CREATE TRIGGER catalog_state_updated_at BEFORE UPDATE ON catalog_state
+    FOR EACH ROW EXECUTE FUNCTION catalog_state_advance_updated_at();
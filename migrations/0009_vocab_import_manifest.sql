@@ -0,0 +1,21 @@
+-- Vocabulary import manifest used by add_word_script.py for incremental
+-- re-imports of docs/vocab. Kept out of 0001 so databases baselined from the
+-- old docs/init.sql (--baseline 2) get these tables too; IF NOT EXISTS keeps
+-- it harmless where an earlier 0001 already created them.
+
+-- One row per imported file
+CREATE TABLE IF NOT EXISTS vocab_import_files (
+    source_path TEXT PRIMARY KEY,
+    file_hash CHAR(64) NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Content hash of every row imported from a file
+CREATE TABLE IF NOT EXISTS vocab_import_rows (
+    source_path TEXT NOT NULL REFERENCES vocab_import_files(source_path) ON DELETE CASCADE,
+    group_name VARCHAR(255) NOT NULL,
+    word TEXT NOT NULL,
+    row_hash CHAR(64) NOT NULL,
+    PRIMARY KEY (source_path, group_name, word)
+);
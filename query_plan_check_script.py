@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extensions
+
+from manager import database_manager
+from manager import pagination
+from manager import practice_manager
+from manager import practice_session_manager
+from manager import synonym_game_manager
+from manager import user_manager
+from manager import user_progress_manager
+from manager import user_word_level_manager
+from manager import vocabulary_manager
+from manager import word_manager
+from manager.aio import practice_session_manager as aio_practice_session_manager
+from manager.aio import user_progress_manager as aio_user_progress_manager
+from manager.aio import user_word_level_manager as aio_user_word_level_manager
+from manager.aio import word_manager as aio_word_manager
+from manager.aio.statements import registered
+from manager.database_manager import get_db_connection
+
+DEFAULT_BUDGETS = 'query_plan_budgets.json'
+DEFAULT_SNAPSHOT_DIR = 'query_plans'
+SKIPPED_MODULES = ('manager.database_manager', 'manager.tracing')
+
+def _manager_caller():
+    """Name of the innermost manager function on the current stack"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('manager.') and module not in SKIPPED_MODULES:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+class _CapturingCursor:
+    """Cursor proxy that records each statement, its template and the calling manager function"""
+
+    def __init__(self, cursor, captured):
+        self._cursor = cursor
+        self._captured = captured
+
+    def execute(self, query, params=None):
+        self._captured.append((_manager_caller(), query, self._cursor.mogrify(query, params).decode()))
+        return self._cursor.execute(query, params)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+class CapturingConnection(psycopg2.extensions.connection):
+    """Connection that captures statements and never commits, so scenarios leave no data behind"""
+
+    captured = []
+
+    def cursor(self, *args, **kwargs):
+        return _CapturingCursor(super().cursor(*args, **kwargs), CapturingConnection.captured)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.rollback()
+        super().close()
+
+def pick_fixtures():
+    """Choose the busiest user, largest group and existing rows to drive the scenarios"""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    fixtures = {}
+    queries = {
+        'user_id': "SELECT user_id FROM user_progress GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1",
+        'group_id': "SELECT group_id FROM words GROUP BY group_id ORDER BY COUNT(*) DESC LIMIT 1",
+        'google_id': "SELECT google_id FROM users ORDER BY id LIMIT 1",
+    }
+    for key, sql in queries.items():
+        cur.execute(sql)
+        row = cur.fetchone()
+        if row is None:
+            raise RuntimeError(f"No data for {key}; seed the database first (generate_data_script.py)")
+        fixtures[key] = row[0]
+
+    cur.execute("SELECT id FROM words WHERE group_id = %s ORDER BY id LIMIT 1", (fixtures['group_id'],))
+    fixtures['word_id'] = cur.fetchone()[0]
+    cur.execute("SELECT id FROM practice_sessions WHERE user_id = %s ORDER BY id DESC LIMIT 1",
+                (fixtures['user_id'],))
+    row = cur.fetchone()
+    fixtures['session_id'] = row[0] if row else None
+    cur.execute("SELECT id FROM synonym_games ORDER BY id DESC LIMIT 1")
+    row = cur.fetchone()
+    fixtures['game_id'] = row[0] if row else None
+    cur.close()
+    conn.close()
+    return fixtures
+
+def scenarios(f):
+    """Calls that exercise every request-path manager query"""
+    word = lambda: word_manager.get_word_by_id(f['word_id'])
+    cursor = pagination.encode_cursor(datetime.now(timezone.utc), 2 ** 31 - 1)
+    return [
+        ('get_user_by_id', lambda: user_manager.get_user_by_id(f['user_id'])),
+        ('get_or_create_user', lambda: user_manager.get_or_create_user(
+            f['google_id'], 'plan@example.invalid', 'Plan', 'Check', 'Plan Check', None)),
+        ('get_word_by_id', word),
+        ('get_words_by_group', lambda: word_manager.get_words_by_group(f['group_id'])),
+        ('get_words_by_level_and_group', lambda: word_manager.get_words_by_level_and_group(1, f['group_id'], 10)),
+        ('get_all_words', word_manager.get_all_words),
+        ('add_word', lambda: word_manager.add_word(f['group_id'], 'plancheckword', 'Noun', 'meaning', 'ความหมาย',
+                                                   [], [], [], [], 'basic', 'low')),
+        ('get_all_groups', vocabulary_manager.get_all_groups),
+        ('get_group_summaries', vocabulary_manager.get_group_summaries),
+        ('get_or_create_group', lambda: vocabulary_manager.get_or_create_group('Plan check group')),
+        ('get_distractors', lambda: vocabulary_manager.get_distractors(word(), 3, f['group_id'])),
+        ('get_distractors_all_groups', lambda: vocabulary_manager.get_distractors(word(), 3)),
+        ('get_user_words_with_levels', lambda: user_word_level_manager.get_user_words_with_levels(
+            f['user_id'], f['group_id'])),
+        ('get_user_words_with_levels_all_groups', lambda: user_word_level_manager.get_user_words_with_levels(
+            f['user_id'])),
+        ('get_user_word_level', lambda: user_word_level_manager.get_user_word_level(f['user_id'], f['word_id'])),
+        ('update_user_word_level', lambda: user_word_level_manager.update_user_word_level(
+            f['user_id'], f['word_id'], True)),
+        ('record_progress', lambda: user_progress_manager.record_progress(
+            f['user_id'], f['word_id'], f['session_id'], 1, True, 5)),
+        ('get_user_weekly_stats', lambda: user_progress_manager.get_user_weekly_stats(f['user_id'])),
+        ('get_user_group_performance', lambda: user_progress_manager.get_user_group_performance(f['user_id'])),
+        ('get_or_update_weekly_stats', lambda: user_progress_manager.get_or_update_weekly_stats(f['user_id'])),
+        ('get_activity_calendar', lambda: user_progress_manager.get_activity_calendar(f['user_id'])),
+        ('create_session', lambda: practice_session_manager.create_session(f['user_id'])),
+        ('end_session', lambda: practice_session_manager.end_session(f['session_id'], 10, 5, 3)),
+        ('get_user_sessions', lambda: practice_session_manager.get_user_sessions(f['user_id'])),
+        ('get_user_sessions_page', lambda: practice_session_manager.get_user_sessions_page(f['user_id'])),
+        ('get_user_sessions_page_after', lambda: practice_session_manager.get_user_sessions_page(
+            f['user_id'], cursor=cursor)),
+        ('get_next_word', lambda: practice_manager.get_next_word(f['user_id'], f['group_id'])),
+        ('get_group_name_for_word', lambda: practice_manager.get_group_name_for_word(f['word_id'])),
+        ('get_random_synonym_pairs', synonym_game_manager.get_random_synonym_pairs),
+        ('start_new_game', lambda: synonym_game_manager.start_new_game(f['user_id'])),
+        ('record_round_score', lambda: synonym_game_manager.record_round_score(f['game_id'], 1, 'meaning', 50.0)),
+        ('get_game_history', lambda: synonym_game_manager.get_game_history(f['user_id'])),
+        ('get_game_history_page', lambda: synonym_game_manager.get_game_history_page(f['user_id'])),
+        ('get_game_history_page_after', lambda: synonym_game_manager.get_game_history_page(
+            f['user_id'], cursor=cursor)),
+        ('get_game_details', lambda: synonym_game_manager.get_game_details(f['game_id'])),
+    ]
+
+def statement_args(f):
+    """Sample arguments for each registered manager/aio statement, by statement name"""
+    return {
+        aio_word_manager.WORD_BY_ID.name: (f['word_id'],),
+        aio_word_manager.WORDS_BY_GROUP.name: (f['group_id'],),
+        aio_user_word_level_manager.USER_WORD_LEVEL.name: (f['user_id'], f['word_id']),
+        aio_user_word_level_manager.UPDATE_USER_WORD_LEVEL.name: (f['user_id'], f['word_id'], True),
+        aio_user_word_level_manager.WORDS_WITH_LEVELS_IN_GROUP.name: (f['user_id'], f['group_id']),
+        aio_user_word_level_manager.WORDS_WITH_LEVELS.name: (f['user_id'],),
+        aio_user_progress_manager.RECORD_PROGRESS.name: (f['user_id'], f['word_id'], f['session_id'], 1, True, 5),
+        aio_user_progress_manager.ACTIVITY.name: (f['user_id'],),
+        aio_practice_session_manager.CREATE_SESSION.name: (f['user_id'],),
+        aio_practice_session_manager.END_SESSION.name: (10, 5, 3, f['session_id']),
+        aio_practice_session_manager.USER_SESSIONS.name: (f['user_id'], 10),
+    }
+
+def prepared_statements(fixtures):
+    """Return {statement_id: (template, EXECUTE sql, query to PREPARE)} for the registered statements.
+
+    A registered statement without sample arguments is returned as a failure,
+    so a new hot query cannot go unchecked.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    args_by_name = statement_args(fixtures)
+    statements = OrderedDict()
+    failures = []
+    for statement in registered():
+        if statement.name not in args_by_name:
+            failures.append((f"aio.{statement.name}", KeyError("no sample arguments in statement_args")))
+            continue
+        args = args_by_name[statement.name]
+        execute = cur.mogrify(f"EXECUTE plan_check({', '.join(['%s'] * len(args))})", args).decode()
+        statements[f"aio.{statement.name}"] = (' '.join(statement.query.split()), execute, statement.query)
+    cur.close()
+    conn.close()
+    return statements, failures
+
+def capture_statements(fixtures):
+    """Run the scenarios and return {statement_id: (template, sql, None)} for each distinct statement"""
+    database_manager.set_connection_factory(CapturingConnection)
+    failures = []
+    try:
+        for name, call in scenarios(fixtures):
+            try:
+                call()
+            except Exception as e:
+                failures.append((name, e))
+    finally:
+        database_manager.set_connection_factory(None)
+
+    statements = OrderedDict()
+    per_caller = {}
+    seen = set()
+    for caller, template, sql in CapturingConnection.captured:
+        key = (caller, str(template))
+        if key in seen:
+            continue
+        seen.add(key)
+        per_caller[caller] = per_caller.get(caller, 0) + 1
+        statements[f"{caller}-{per_caller[caller]}"] = (' '.join(str(template).split()), sql, None)
+    return statements, failures
+
+def plan_shape(node):
+    """Strip timings and estimates from a plan so snapshots only change when the plan does"""
+    shape = {'node': node['Node Type']}
+    for key, name in (('Relation Name', 'relation'), ('Index Name', 'index'), ('Join Type', 'join'),
+                      ('Strategy', 'strategy'), ('Parent Relationship', 'parent')):
+        if key in node:
+            shape[name] = node[key]
+    if node.get('Plans'):
+        shape['children'] = [plan_shape(child) for child in node['Plans']]
+    return shape
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+def explain(conn, sql, prepare=None):
+    """EXPLAIN ANALYZE a statement inside a transaction that is always rolled back.
+
+    With ``prepare`` that query is PREPAREd as plan_check first, for ``sql``
+    to EXECUTE the way asyncpg runs a registered statement.
+    """
+    cur = conn.cursor()
+    try:
+        if prepare:
+            cur.execute(f"PREPARE plan_check AS {prepare}")
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+        return cur.fetchone()[0][0]
+    finally:
+        conn.rollback()
+        if prepare:
+            # Prepared statements outlive the rollback
+            cur.execute("DEALLOCATE ALL")
+            conn.rollback()
+        cur.close()
+
+def table_sizes(conn):
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT relname, reltuples::BIGINT FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace
+    """)
+    sizes = dict(cur.fetchall())
+    cur.close()
+    return sizes
+
+def check(statements, budgets, sizes, args):
+    """Explain each statement and return (report rows, problems)"""
+    default = budgets.get('default', {})
+    conn = get_db_connection()
+    report = []
+    problems = []
+    for statement_id, (template, sql, prepare) in statements.items():
+        budget = dict(default, **budgets.get('statements', {}).get(statement_id, {}))
+        try:
+            result = explain(conn, sql, prepare)
+        except psycopg2.Error as e:
+            problems.append((statement_id, f"could not be explained: {e.pgerror or e}"))
+            continue
+
+        plan = result['Plan']
+        buffers = plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0)
+        row = {'id': statement_id, 'ms': result.get('Execution Time', 0.0), 'buffers': buffers,
+               'budget': budget.get('buffers'), 'issues': []}
+
+        for node in _walk(plan):
+            relation = node.get('Relation Name')
+            if (node['Node Type'] == 'Seq Scan' and sizes.get(relation, 0) >= args.large_table_rows
+                    and relation not in budget.get('allow_seq_scan', [])):
+                row['issues'].append(f"seq scan on {relation} (~{sizes[relation]} rows)")
+        if budget.get('buffers') is not None and buffers > budget['buffers']:
+            row['issues'].append(f"{buffers} buffers > budget {budget['buffers']}")
+
+        snapshot_path = os.path.join(args.snapshots, f"{statement_id}.json")
+        snapshot = {'query': template, 'plan': plan_shape(plan)}
+        if args.update_snapshots:
+            os.makedirs(args.snapshots, exist_ok=True)
+            with open(snapshot_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        elif os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored['plan'] != snapshot['plan']:
+                row['changed'] = True
+                if args.fail_on_change:
+                    row['issues'].append(f"plan differs from {snapshot_path}")
+
+        report.append(row)
+        problems.extend((statement_id, issue) for issue in row['issues'])
+    conn.close()
+    return report, problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN (ANALYZE, BUFFERS) every manager query against a seeded database")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS, help="per-statement budgets JSON")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, help="directory of plan snapshots")
+    parser.add_argument("--update-snapshots", action="store_true", help="rewrite the stored plan snapshots")
+    parser.add_argument("--fail-on-change", action="store_true", help="fail when a plan differs from its snapshot")
+    parser.add_argument("--large-table-rows", type=int, default=10_000,
+                        help="tables with at least this many rows must not be sequentially scanned")
+    args = parser.parse_args()
+
+    with open(args.budgets, encoding='utf-8') as f:
+        budgets = json.load(f)
+
+    fixtures = pick_fixtures()
+    statements, scenario_failures = capture_statements(fixtures)
+    prepared, statement_failures = prepared_statements(fixtures)
+    statements.update(prepared)
+    failures = scenario_failures + statement_failures
+    for name, error in failures:
+        print(f"❌ {name} raised {type(error).__name__}: {error}")
+
+    conn = get_db_connection()
+    sizes = table_sizes(conn)
+    conn.close()
+    report, problems = check(statements, budgets, sizes, args)
+    # A scenario that fails leaves its queries unchecked, which must not pass
+    problems = [(name, f"raised {type(error).__name__}: {error}") for name, error in failures] + problems
+
+    print(f"{'statement':64} {'ms':>9} {'buffers':>9} {'budget':>8}")
+    for row in report:
+        status = '❌' if row['issues'] else ('🔀' if row.get('changed') else '✅')
+        budget = '-' if row['budget'] is None else row['budget']
+        print(f"{status} {row['id']:62} {row['ms']:9.2f} {row['buffers']:9d} {budget:>8}")
+        for issue in row['issues']:
+            print(f"     {issue}")
+    print(f"📊 {len(statements)} statements checked, {len(problems)} problems")
+    if args.update_snapshots:
+        print(f"💾 Snapshots written to {args.snapshots}/")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import hmac
+import time
+import random
+import cProfile
+import hashlib
+import logging
+import threading
+from collections import Counter
+from flask import request, g, jsonify
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Profile-Signature'
+SIGNATURE_MAX_AGE = 300  # seconds a signed header stays valid
+PROFILE_MODES = ('sampling', 'deterministic', 'both')
+
+def sign(secret, path, timestamp=None):
+    """Build an X-Profile-Signature value for a request path"""
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    digest = hmac.new(secret.encode(), f"{timestamp}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}:{digest}"
+
+def _valid_signature(secret, value, path):
+    """Check a signature header for this path that is not older than SIGNATURE_MAX_AGE"""
+    try:
+        timestamp, _ = value.split(':', 1)
+        age = time.time() - int(timestamp)
+    except ValueError:
+        return False
+    if abs(age) > SIGNATURE_MAX_AGE:
+        return False
+    return hmac.compare_digest(sign(secret, path, timestamp), value)
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+def init_profiler(app):
+    """Register the opt-in request profiler on the app.
+
+    Nothing is registered unless PROFILE_SECRET or PROFILE_SAMPLE_RATE is set,
+    so a disabled profiler costs nothing per request. A request is profiled
+    when it carries a valid signed X-Profile-Signature header, when it is
+    picked by the sample rate, or while the admin toggle is on.
+    """
+    secret = os.getenv('PROFILE_SECRET')
+    sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    mode = os.getenv('PROFILE_MODE', 'both')
+    output_dir = os.getenv('PROFILE_DIR', 'profiles')
+    interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5')) / 1000
+
+    if not secret and sample_rate <= 0:
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"PROFILE_MODE must be one of {PROFILE_MODES}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Admin toggle: profile the next N requests handled by this process
+    toggle = {'remaining': 0}
+    toggle_lock = threading.Lock()
+
+    def _take_toggle():
+        with toggle_lock:
+            if toggle['remaining'] > 0:
+                toggle['remaining'] -= 1
+                return True
+            return False
+
+    def _should_profile():
+        if secret and SIGNATURE_HEADER in request.headers:
+            return _valid_signature(secret, request.headers[SIGNATURE_HEADER], request.path)
+        if toggle['remaining'] and _take_toggle():
+            return True
+        return sample_rate > 0 and random.random() < sample_rate
+
+    @app.before_request
+    def _start_profiling():
+        if request.endpoint == 'profiler_toggle' or not _should_profile():
+            return
+        g.profiler_started = time.perf_counter()
+        g.profiler = cProfile.Profile() if mode in ('deterministic', 'both') else None
+        g.profiler_sampler = None
+        if mode in ('sampling', 'both'):
+            g.profiler_sampler = StackSampler(threading.get_ident(), interval)
+            g.profiler_sampler.start()
+        if g.profiler:
+            g.profiler.enable()
+
+    @app.teardown_request
+    def _stop_profiling(exc):
+        if 'profiler_started' not in g:
+            return
+        if g.profiler:
+            g.profiler.disable()
+        if g.profiler_sampler:
+            g.profiler_sampler.stop()
+
+        elapsed_ms = (time.perf_counter() - g.profiler_started) * 1000
+        endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unknown')
+        base = os.path.join(output_dir, f"{time.strftime('%Y%m%dT%H%M%S')}_{endpoint}_{os.getpid()}_{int(elapsed_ms)}ms")
+        try:
+            if g.profiler:
+                g.profiler.dump_stats(base + '.pstats')
+            if g.profiler_sampler:
+                g.profiler_sampler.write(base + '.collapsed')
+            logger.info(f"Profiled {request.method} {request.path} ({elapsed_ms:.1f}ms) -> {base}.*")
+        except OSError as e:
+            logger.error(f"Error writing profile for {request.path}: {e}")
+
+    if secret:
+        @app.route('/_profiler/toggle', methods=['POST'], endpoint='profiler_toggle')
+        def profiler_toggle():
+            """Profile the next N requests in this worker (requires a signed header)"""
+            if not _valid_signature(secret, request.headers.get(SIGNATURE_HEADER, ''), request.path):
+                return jsonify({'error': 'Forbidden'}), 403
+            data = request.get_json(silent=True) or {}
+            with toggle_lock:
+                toggle['remaining'] = max(0, int(data.get('requests', 0)))
+            return jsonify({'status': 'Profiler toggled', 'remaining': toggle['remaining'], 'pid': os.getpid()})
+
+    logger.info(f"Request profiler enabled (mode={mode}, sample_rate={sample_rate}, dir={output_dir})")
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+
+from manager import database_manager
+from manager import shard_manager
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the per-user shards configured in SHARD_DSNS")
+    parser.add_argument("--init-shards", action="store_true",
+                        help="migrate every shard, set its id ranges and subscribe it to the catalog")
+    parser.add_argument("--primary-conninfo", default=os.getenv('PRIMARY_DSN'),
+                        help="conninfo the shards use to subscribe to the primary's catalog")
+    parser.add_argument("--user-id", type=int, help="move this user")
+    parser.add_argument("--to-shard", type=int, help="target shard for --user-id (default: its hash shard)")
+    parser.add_argument("--from-primary", action="store_true",
+                        help="take the rows from the primary (a database that predates sharding)")
+    parser.add_argument("--rebalance", action="store_true",
+                        help="move every user whose rows are not on the shard they are routed to")
+    parser.add_argument("--pin", action="store_true",
+                        help="with --rebalance: route misplaced users to where their rows are instead of moving them "
+                             "(run before deploying a new SHARD_DSNS, then --rebalance after)")
+    parser.add_argument("--no-wait", action="store_true",
+                        help="skip waiting for worker override caches (only when the app is stopped)")
+    args = parser.parse_args()
+
+    if not database_manager.is_sharded():
+        print("SHARD_DSNS is not set")
+        sys.exit(1)
+    wait = not args.no_wait
+
+    if args.init_shards:
+        if not args.primary_conninfo:
+            print("--primary-conninfo (or PRIMARY_DSN) is needed for the catalog subscriptions")
+            sys.exit(1)
+        shard_manager.init_shards(args.primary_conninfo)
+        print(f"✅ Initialised {len(database_manager.SHARD_DSNS)} shards")
+
+    if args.user_id is not None:
+        to_shard = args.to_shard if args.to_shard is not None else database_manager.home_shard(args.user_id)
+        if args.from_primary:
+            copied = shard_manager.move_users([(args.user_id, None, to_shard)], wait)[args.user_id]
+        else:
+            copied = shard_manager.move_user(args.user_id, to_shard, wait)
+        print(f"✅ User {args.user_id} is on shard {to_shard} ({sum(copied.values())} rows merged)")
+
+    elif args.from_primary:
+        user_ids = shard_manager.users_on_shard(None)
+        for start in range(0, len(user_ids), 500):
+            batch = user_ids[start:start + 500]
+            shard_manager.move_users([(user_id, None, database_manager.home_shard(user_id)) for user_id in batch],
+                                     wait)
+            print(f"   🚚 {start + len(batch)}/{len(user_ids)} users moved off the primary")
+        print(f"✅ Moved {len(user_ids)} users from the primary to their shards")
+
+    if args.rebalance:
+        misplaced = shard_manager.misplaced_users()
+        if args.pin:
+            shard_manager.pin_users(misplaced)
+            print(f"📌 Pinned {len(misplaced)} users to the shard holding their rows")
+        else:
+            shard_manager.move_users(misplaced, wait)
+            print(f"✅ Rebalanced {len(misplaced)} users")
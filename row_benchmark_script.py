@@ -0,0 +1,135 @@
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from psycopg2.extras import RealDictCursor, RealDictRow
+
+from manager import practice_manager
+from manager.records import RecordCursor, record_type
+
+GROUP_SIZES = (1_000, 10_000, 100_000)
+FORMATS = ('dict', 'record')
+# Columns of user_word_level_manager.get_user_words_with_levels
+COLUMNS = ('word_id', 'word', 'meaning_en', 'meaning_th', 'part_of_speech', 'difficulty', 'frequency',
+           'level', 'last_practiced')
+QUERY = """
+    SELECT w.id as word_id, w.word, w.meaning_en, w.meaning_th,
+            w.part_of_speech, w.difficulty, w.frequency,
+            COALESCE(uwl.level, 0) as level,
+            uwl.last_practiced
+    FROM words w
+    LEFT JOIN user_word_levels uwl ON w.id = uwl.word_id AND uwl.user_id = %s
+    WHERE w.group_id = %s
+    ORDER BY w.word
+"""
+
+def generate_tuples(size, seed=0):
+    """Raw row tuples as psycopg2 hands them to a cursor's row factory"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for n in range(size):
+        level = min(int(rng.expovariate(0.6)), 10) if rng.random() < 0.5 else 0
+        rows.append((n + 1, f"word{n:06d}", f"Synthetic meaning number {n}.", f"ความหมาย {n}",
+                     rng.choice(('Noun', 'Verb', 'Adjective')), 'basic', 'high', level, now if level else None))
+    return rows
+
+def build_dict_rows(tuples):
+    """Build rows the way RealDictCursor does: one RealDictRow filled column by column"""
+    rows = []
+    for values in tuples:
+        row = RealDictRow()
+        row[RealDictRow] = list(COLUMNS)
+        for position, value in enumerate(values):
+            row[position] = value
+        rows.append(row)
+    return rows
+
+def build_record_rows(tuples):
+    """Build rows the way RecordCursor does"""
+    return list(map(record_type(COLUMNS), tuples))
+
+def consume(rows):
+    """Choose a word from the rows the way practice_manager.get_next_word does"""
+    return practice_manager.select_word(rows)['word_id']
+
+def stub_fetch(tuples, row_format):
+    builder = build_dict_rows if row_format == 'dict' else build_record_rows
+    return lambda: builder(tuples)
+
+def postgres_fetch(user_id, group_id, row_format):
+    from manager.database_manager import get_db_connection
+    factory = RealDictCursor if row_format == 'dict' else RecordCursor
+
+    def fetch():
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=factory)
+        cur.execute(QUERY, (user_id, group_id))
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        return rows
+    return fetch
+
+def measure_memory(fetch):
+    """Bytes still held by the fetched rows and the peak while fetching them"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    rows = fetch()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return len(rows), retained, peak
+
+def measure_time(fetch, min_seconds, min_iterations):
+    """Per-call milliseconds of fetching the rows and choosing a word from them"""
+    consume(fetch())  # warm up
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < min_iterations or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        consume(fetch())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare RealDictCursor rows with Record rows on large groups")
+    parser.add_argument("--mode", choices=('stub', 'postgres'), default='stub',
+                        help="build rows from in-memory tuples or fetch them from the configured Postgres")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(GROUP_SIZES), help="words per group")
+    parser.add_argument("--progress", type=int, default=1_000, help="practiced words (postgres mode)")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="minimum time per case")
+    parser.add_argument("--min-iterations", type=int, default=5, help="minimum calls per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        if args.mode == 'stub':
+            tuples = generate_tuples(size, args.seed)
+            fetchers = {row_format: stub_fetch(tuples, row_format) for row_format in FORMATS}
+        else:
+            from benchmark_script import seed_postgres
+            user_id, group_id, _ = seed_postgres(size, args.progress, args.seed)
+            fetchers = {row_format: postgres_fetch(user_id, group_id, row_format) for row_format in FORMATS}
+
+        results = {}
+        for row_format, fetch in fetchers.items():
+            count, retained, peak = measure_memory(fetch)
+            median_ms = measure_time(fetch, args.min_seconds, args.min_iterations)
+            results[row_format] = (retained, peak, median_ms)
+            print(f"⏱️  {args.mode}/{row_format:6} rows={count:7} retained={retained / 1024:9.1f}KiB "
+                  f"({retained / max(count, 1):6.1f}B/row) peak={peak / 1024:9.1f}KiB median={median_ms:8.2f}ms")
+
+        (dict_retained, dict_peak, dict_ms), (record_retained, record_peak, record_ms) = results['dict'], results['record']
+        print(f"📉 rows={size}: retained -{1 - record_retained / dict_retained:.0%}, "
+              f"peak -{1 - record_peak / dict_peak:.0%}, time -{1 - record_ms / dict_ms:.0%}")
+    sys.exit(0)
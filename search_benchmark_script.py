@@ -0,0 +1,102 @@
+import argparse
+import random
+import string
+import sys
+import time
+
+from manager import word_search_manager
+
+SYLLABLES = ['ab', 'ac', 'ad', 'al', 'am', 'an', 'ar', 'as', 'at', 'be', 'ca', 'co', 'de', 'di',
+             'el', 'en', 'er', 'es', 'ex', 'fa', 'ge', 'im', 'in', 'ion', 'is', 'it', 'la', 'li',
+             'ma', 'me', 'mo', 'na', 'ne', 'no', 'or', 'pa', 'pe', 'pro', 'ra', 're', 'ri', 'ro',
+             'sa', 'se', 'si', 'st', 'ta', 'te', 'ti', 'to', 'tr', 'un', 'ur', 'va', 've', 'vi']
+PARTS_OF_SPEECH = ['Noun', 'Verb', 'Adjective', 'Adverb']
+
+def _pseudo_word(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+
+def generate_words(count, groups=20, seed=42):
+    """Generate a synthetic catalog shaped like the words table"""
+    rng = random.Random(seed)
+    vocabulary = [_pseudo_word(rng) for _ in range(max(count // 5, 1000))]
+    words = []
+    for word_id in range(1, count + 1):
+        headword = _pseudo_word(rng)
+        if rng.random() < 0.15:
+            headword += ' ' + _pseudo_word(rng)
+        words.append({
+            'id': word_id,
+            'group_id': rng.randint(1, groups),
+            'word': headword.capitalize(),
+            'part_of_speech': rng.choice(PARTS_OF_SPEECH),
+            'meaning_en': ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(5, 12))),
+            'meaning_th': 'การ' + _pseudo_word(rng),
+            'synonyms': [rng.choice(vocabulary) for _ in range(rng.randint(0, 3))],
+            'word_forms': [f"{headword}ly (adv.)"] if rng.random() < 0.3 else []
+        })
+    return words
+
+def _typo(rng, word):
+    """Apply one random edit (substitute, delete, insert or transpose)"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice('sdit')
+    if edit == 's':
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    if edit == 'd':
+        return word[:i] + word[i + 1:]
+    if edit == 'i':
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def run(word_count, queries, target_ms, seed):
+    rng = random.Random(seed)
+    words = generate_words(word_count, seed=seed)
+
+    start = time.perf_counter()
+    index = word_search_manager.build_index(words)
+    print(f"🔨 Indexed {word_count} words in {time.perf_counter() - start:.2f}s")
+
+    headwords = [w['word'].lower() for w in words]
+    workloads = {
+        'prefix': [(rng.choice(headwords)[:rng.randint(1, 5)], 'prefix') for _ in range(queries)],
+        'fuzzy': [(_typo(rng, rng.choice(headwords)), 'fuzzy') for _ in range(queries)],
+        'auto': [(_typo(rng, rng.choice(headwords))[:rng.randint(3, 8)], 'auto') for _ in range(queries)],
+    }
+
+    failed = False
+    for name, workload in workloads.items():
+        # Warm up
+        for query, mode in workload[:50]:
+            index.search(query, mode, 10)
+
+        timings = []
+        hits = 0
+        for query, mode in workload:
+            t0 = time.perf_counter()
+            results = index.search(query, mode, 10)
+            timings.append((time.perf_counter() - t0) * 1000)
+            hits += bool(results)
+
+        p50, p95, p99 = (_percentile(timings, p) for p in (50, 95, 99))
+        status = '✅' if p99 <= target_ms else '❌'
+        failed |= p99 > target_ms
+        print(f"{status} {name:6} p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms "
+              f"max={max(timings):.3f}ms hit_rate={hits / len(workload):.1%}")
+
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory word search index")
+    parser.add_argument("--words", type=int, default=100_000, help="synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=5000, help="queries per mode")
+    parser.add_argument("--target-ms", type=float, default=10.0, help="p99 latency target")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.words, args.queries, args.target_ms, args.seed) else 1)
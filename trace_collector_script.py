@@ -0,0 +1,84 @@
+import argparse
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def format_trace(spans):
+    """Render one trace's spans as an indented tree with total and DB time"""
+    children = defaultdict(list)
+    for span in spans:
+        children[span['parent_id']].append(span)
+    ids = {span['span_id'] for span in spans}
+    roots = [span for span in spans if span['parent_id'] not in ids]
+
+    lines = []
+    def render(span, depth):
+        error = f"  ❌ {span['error']}" if span.get('error') else ''
+        lines.append(f"{'  ' * depth}{span['name']:<{60 - 2 * depth}} {span['duration_ms']:9.2f}ms "
+                     f"db={span['db_ms']:8.2f}ms q={span['db_queries']:<3} rows={span['db_rows']}{error}")
+        for child in sorted(children[span['span_id']], key=lambda s: s['started_at']):
+            render(child, depth + 1)
+    for root in roots:
+        render(root, 0)
+    return '\n'.join(lines)
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Accept span batches from manager.tracing, append them to a JSONL file and print finished traces"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            spans = json.loads(body)['spans']
+        except (ValueError, KeyError):
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        server = self.server
+        with server.lock:
+            with open(server.output, 'a', encoding='utf-8') as f:
+                for span in spans:
+                    f.write(json.dumps(span) + '\n')
+            finished = []
+            for span in spans:
+                server.pending[span['trace_id']].append(span)
+                # Root spans are exported last, so they close their trace
+                if span['parent_id'] is None:
+                    finished.append(server.pending.pop(span['trace_id']))
+        if not server.quiet:
+            for trace in finished:
+                print(f"🔎 trace {trace[0]['trace_id']}\n{format_trace(trace)}\n", flush=True)
+
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for a trace collector")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="traces.jsonl", help="JSON lines file receiving every span")
+    parser.add_argument("--quiet", action="store_true", help="do not print trace trees")
+    parser.add_argument("--show", metavar="FILE", help="print the traces stored in a JSONL file and exit")
+    args = parser.parse_args()
+
+    if args.show:
+        traces = defaultdict(list)
+        with open(args.show, encoding='utf-8') as f:
+            for line in f:
+                span = json.loads(line)
+                traces[span['trace_id']].append(span)
+        for trace_id, spans in traces.items():
+            print(f"🔎 trace {trace_id}\n{format_trace(spans)}\n")
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), CollectorHandler)
+        server.output = args.output
+        server.quiet = args.quiet
+        server.lock = threading.Lock()
+        server.pending = defaultdict(list)
+        print(f"📡 Collecting spans on http://{args.host}:{args.port}/ into {args.output}")
+        server.serve_forever()
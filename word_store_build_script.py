@@ -0,0 +1,28 @@
+import argparse
+import sys
+from datetime import datetime
+
+from manager import word_store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped word store the app workers share")
+    parser.add_argument("--path", default=word_store.WORD_STORE_PATH or 'words.store',
+                        help="store file (default: WORD_STORE_PATH or words.store)")
+    parser.add_argument("--info", action="store_true", help="describe an existing store instead of building one")
+    args = parser.parse_args()
+
+    if args.info:
+        try:
+            store = word_store.WordStore(args.path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"📦 {args.path}: {store.count} words in {len(store.group_ids)} groups, "
+              f"{store.stat.st_size / 1024 / 1024:.1f} MiB, catalog version {store.catalog_version}, "
+              f"built {datetime.fromtimestamp(store.built_at).isoformat(timespec='seconds')}")
+        sys.exit(0)
+
+    summary = word_store.build_store(args.path)
+    print(f"✅ Wrote {summary['words']} words ({summary['strings']} distinct strings, "
+          f"{summary['bytes'] / 1024 / 1024:.1f} MiB) to {args.path} in {summary['seconds']:.2f}s")